@@ -1,14 +1,16 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import Group
 from django.utils.html import format_html
 from django import forms
 from unfold.admin import ModelAdmin
 from unfold.decorators import display
-from unfold.forms import AdminPasswordChangeForm, UserChangeForm, UserCreationForm
+from unfold.forms import ActionForm, AdminPasswordChangeForm, UserChangeForm, UserCreationForm
 from unfold.widgets import UnfoldAdminTextInputWidget, UnfoldAdminEmailInputWidget, UnfoldAdminTextareaWidget
 
-from .models import User, Customer, Hotel, Flight, RentalCar, HolidayPackage, Cruise, AuthUser, OTPLog, MultiCityFlight, MultiCityFlightLeg
+from .locations import clear_location_cache, normalize_location
+from .models import User, Customer, Hotel, Flight, RentalCar, HolidayPackage, Cruise, AuthUser, OTPLog, MultiCityFlight, MultiCityFlightLeg, Location
+from .resolver import location_resolver, merge_location
 
 
 
@@ -165,6 +167,59 @@ class CustomerAdmin(ModelAdmin):
 
 admin.site.register(AuthUser, CustomUserAdmin)
 
+class LocationActionForm(ActionForm):
+    merge_into = forms.CharField(
+        required=False, label="",
+        widget=UnfoldAdminTextInputWidget(attrs={'placeholder': "Merge into (location name)"}),
+    )
+
+@admin.register(Location)
+class LocationAdmin(ModelAdmin):
+    """
+    `canonical` is only set through the merge actions: merge_location also moves
+    the bookings, rollups and recommendations, and clears the intern cache.
+    `suggested` shows near misses the resolver will not merge on its own.
+    """
+    list_display = ('name', 'key', 'canonical', 'suggested')
+    search_fields = ('name', 'key')
+    readonly_fields = ('key', 'canonical')
+    list_select_related = ('canonical',)
+    action_form = LocationActionForm
+    actions = ['merge_selected', 'merge_suggested']
+
+    @display(description="Suggested merge")
+    def suggested(self, obj):
+        if obj.canonical_id:
+            return None
+        return location_resolver.get().suggestion(obj.name)
+
+    @admin.action(description="Merge selected into the location named alongside")
+    def merge_selected(self, request, queryset):
+        name = request.POST.get('merge_into', '')
+        target = Location.objects.filter(key=normalize_location(name)).select_related('canonical').first()
+        if target is None:
+            self.message_user(request, f"No location named \"{name.strip()}\".", messages.ERROR)
+            return
+        target = target.canonical or target
+        sources = list(queryset.exclude(pk=target.pk))
+        for source in sources:
+            merge_location(source, target)
+        clear_location_cache()
+        self.message_user(request, f"Merged {len(sources)} location(s) into {target.name}.", messages.SUCCESS)
+
+    @admin.action(description="Merge selected into their suggested location")
+    def merge_suggested(self, request, queryset):
+        resolver = location_resolver.get()
+        merged = 0
+        for source in queryset.filter(canonical__isnull=True):
+            name = resolver.suggestion(source.name)
+            target = name and Location.objects.filter(key=normalize_location(name)).select_related('canonical').first()
+            if target and (target.canonical or target).pk != source.pk:
+                merge_location(source, target.canonical or target)
+                merged += 1
+        clear_location_cache()
+        self.message_user(request, f"Merged {merged} location(s) into their suggestion.", messages.SUCCESS)
+
 class TripDisplayMixin:
     @display(description="User", header=True)
     def display_user_info(self, obj):
@@ -192,7 +247,9 @@ class TripDisplayMixin:
 class HotelAdmin(ModelAdmin, TripDisplayMixin):
     list_display = ('display_user_info', 'phone_number', 'place', 'checkin_date', 'display_guests', 'display_coupon')
     list_filter = ('place', 'checkin_date', 'user')
-    search_fields = ('place', 'user__email', 'phone_number')
+    search_fields = ('place__name', 'user__email', 'phone_number')
+    list_select_related = ('user', 'place')
+    autocomplete_fields = ('place',)
     fields = ('user', 'phone_number', 'place', 'checkin_date', 'checkout_date', 'adults', 'children', 'rooms', 'coupon')
 
     @display(description="Guests")
@@ -203,7 +260,9 @@ class HotelAdmin(ModelAdmin, TripDisplayMixin):
 class FlightAdmin(ModelAdmin, TripDisplayMixin):
     list_display = ('display_user_info', 'phone_number', 'display_route', 'departure_date', 'display_type', 'display_coupon')
     list_filter = ('from_location', 'to_location', 'departure_date', 'round_trip')
-    search_fields = ('from_location', 'to_location', 'user__email', 'phone_number')
+    search_fields = ('from_location__name', 'to_location__name', 'user__email', 'phone_number')
+    list_select_related = ('user', 'from_location', 'to_location')
+    autocomplete_fields = ('from_location', 'to_location')
     fields = ('user', 'phone_number', 'round_trip', 'one_way', 'from_location', 'to_location', 'departure_date', 'return_date', 'adults', 'children', 'coupon')
     
     @display(description="Route")
@@ -229,26 +288,33 @@ class FlightAdmin(ModelAdmin, TripDisplayMixin):
 class RentalCarAdmin(ModelAdmin, TripDisplayMixin):
     list_display = ('display_user_info', 'phone_number', 'location', 'pickup_time', 'dropoff_time', 'display_coupon')
     list_filter = ('location', 'pickup_time', 'dropoff_time', 'user')
-    search_fields = ('location', 'user__email', 'phone_number')
+    search_fields = ('location__name', 'user__email', 'phone_number')
+    list_select_related = ('user', 'location')
+    autocomplete_fields = ('location',)
     fields = ('user', 'phone_number', 'location', 'pickup_time', 'dropoff_time', 'coupon')
 
 @admin.register(HolidayPackage)
 class HolidayPackageAdmin(ModelAdmin, TripDisplayMixin):
     list_display = ('display_user_info', 'phone_number', 'to_location', 'duration', 'display_coupon')
     list_filter = ('to_location', 'from_location', 'duration', 'user')
-    search_fields = ('to_location', 'from_location', 'user__email', 'phone_number')
+    search_fields = ('to_location__name', 'from_location__name', 'user__email', 'phone_number')
+    list_select_related = ('user', 'to_location', 'from_location')
+    autocomplete_fields = ('to_location', 'from_location')
     fields = ('user', 'phone_number', 'from_location', 'to_location', 'duration', 'adults', 'children', 'coupon')
 
 @admin.register(Cruise)
 class CruiseAdmin(ModelAdmin, TripDisplayMixin):
     list_display = ('display_user_info', 'phone_number', 'to_location', 'duration', 'cabins', 'display_coupon')
     list_filter = ('to_location', 'from_location', 'duration', 'user')
-    search_fields = ('to_location', 'from_location', 'user__email', 'phone_number')
+    search_fields = ('to_location__name', 'from_location__name', 'user__email', 'phone_number')
+    list_select_related = ('user', 'to_location', 'from_location')
+    autocomplete_fields = ('to_location', 'from_location')
     fields = ('user', 'phone_number', 'from_location', 'to_location', 'duration', 'cabins', 'adults', 'children', 'coupon')
 
 class MultiCityFlightLegInline(admin.TabularInline):
     model = MultiCityFlightLeg
     extra = 1
+    autocomplete_fields = ('from_location', 'to_location')
 
 @admin.register(MultiCityFlight)
 class MultiCityFlightAdmin(ModelAdmin, TripDisplayMixin):
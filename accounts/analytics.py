@@ -0,0 +1,166 @@
+"""
+Search-demand heatmaps built with NumPy.
+
+Location ids and dates are read straight from a database cursor in chunks of
+ANALYTICS_FETCH_SIZE rows, each chunk going into typed column arrays, so no
+Python object per row outlives its chunk. Ids and dates become integer codes
+and day numbers; counting happens in `np.bincount` and hotel stays are
+expanded with a difference array + cumsum. Names are only looked up for the
+rows that make it into the result.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import connections
+
+from .locations import location_names
+from .models import Flight, MultiCityFlightLeg, Hotel
+
+
+def _encode(ids):
+    """Map location ids (or id pairs) to dense codes; returns (codes, unique keys)."""
+    keys, codes = np.unique(np.asarray(ids, dtype=np.int64), axis=0, return_inverse=True)
+    return codes.reshape(-1), keys
+
+
+# datetime64[D] turns None into NaT, which compares as "invalid" below; it
+# parses the ISO strings some backends return for dates as well.
+DAY = 'datetime64[D]'
+
+
+def _columns(queryset, fields, dtypes):
+    """One array per field of `queryset`, read with a single query."""
+    sql, params = queryset.order_by().values_list(*fields).query.sql_with_params()
+    size = getattr(settings, 'ANALYTICS_FETCH_SIZE', 10000)
+    chunks = []
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(size):
+            chunks.append([np.array(column, dtype=dtype) for column, dtype in zip(zip(*rows), dtypes)])
+    if not chunks:
+        return [np.zeros(0, dtype=dtype) for dtype in dtypes]
+    return [np.concatenate(column) for column in zip(*chunks)]
+
+
+def _window(days, start, end):
+    valid = days[~np.isnat(days)]
+    if start is None:
+        start = valid.min().item() if valid.size else None
+    if end is None:
+        end = valid.max().item() if valid.size else None
+    if start is None or end is None or end < start:
+        return None, None
+    max_days = getattr(settings, 'ANALYTICS_MAX_DAYS', 366)
+    if (end - start).days >= max_days:
+        end = start + timedelta(days=max_days - 1)
+    return start, end
+
+
+def _heatmap(start, end, keys, matrix, top, label):
+    totals = matrix.sum(axis=1)
+    order = np.argsort(-totals, kind='stable')
+    if top:
+        order = order[:top]
+    order = order[totals[order] > 0]
+    n_days = matrix.shape[1]
+    names = location_names(keys[order].reshape(-1).tolist())
+    return {
+        'start': start,
+        'end': end,
+        'days': [start + timedelta(days=offset) for offset in range(n_days)],
+        'labels': [label(keys[i], names) for i in order],
+        'totals': totals[order],
+        'matrix': matrix[order],
+    }
+
+
+def _empty(start=None, end=None):
+    return {
+        'start': start, 'end': end, 'days': [], 'labels': [],
+        'totals': np.zeros(0, dtype=np.int64), 'matrix': np.zeros((0, 0), dtype=np.int64),
+    }
+
+
+def _route_label(key, names):
+    return f"{names.get(key[0], '?')} - {names.get(key[1], '?')}"
+
+
+def _place_label(key, names):
+    return names.get(int(key), '?')
+
+
+def route_demand(start=None, end=None, top=None):
+    """Searches per (from, to) route per departure day, across flights and multi-city legs."""
+    fields, dtypes = ('from_location_id', 'to_location_id', 'departure_date'), (np.int64, np.int64, DAY)
+    sources = [_columns(model.objects.all(), fields, dtypes) for model in (Flight, MultiCityFlightLeg)]
+    origins, destinations, days = (np.concatenate(column) for column in zip(*sources))
+    if not origins.size:
+        return _empty(start, end)
+
+    start, end = _window(days, start, end)
+    if start is None:
+        return _empty()
+
+    route_codes, routes = _encode(np.column_stack([origins, destinations]))
+    offsets = (days - np.datetime64(start, 'D')).astype(np.int64)
+    n_days = (end - start).days + 1
+    keep = ~np.isnat(days) & (offsets >= 0) & (offsets < n_days)
+
+    flat = route_codes[keep] * n_days + offsets[keep]
+    matrix = np.bincount(flat, minlength=len(routes) * n_days).reshape(len(routes), n_days)
+    return _heatmap(start, end, routes, matrix, top, _route_label)
+
+
+def hotel_night_demand(start=None, end=None, top=None):
+    """Nights in demand per hotel place per day, each stay covering checkin..checkout-1."""
+    places, checkin_days, checkout_days = _columns(
+        Hotel.objects.all(), ('place_id', 'checkin_date', 'checkout_date'), (np.int64, DAY, DAY),
+    )
+    if not places.size:
+        return _empty(start, end)
+
+    # A missing checkout counts as a single night.
+    checkout_days = np.where(np.isnat(checkout_days), checkin_days + 1, checkout_days)
+
+    start, end = _window(np.concatenate([checkin_days, checkout_days - 1]), start, end)
+    if start is None:
+        return _empty()
+
+    place_codes, keys = _encode(places)
+    origin = np.datetime64(start, 'D')
+    n_days = (end - start).days + 1
+    valid = ~np.isnat(checkin_days) & (checkout_days > checkin_days)
+    first = np.clip((checkin_days[valid] - origin).astype(np.int64), 0, n_days)
+    last = np.clip((checkout_days[valid] - origin).astype(np.int64), 0, n_days)
+    place_codes = place_codes[valid]
+    overlaps = first < last
+
+    # Difference array with one spare column, so a stay running past the window adds nothing.
+    width = n_days + 1
+    size = len(keys) * width
+    diff = np.bincount(place_codes[overlaps] * width + first[overlaps], minlength=size)
+    diff -= np.bincount(place_codes[overlaps] * width + last[overlaps], minlength=size)
+    matrix = np.cumsum(diff.reshape(len(keys), width), axis=1)[:, :n_days]
+    return _heatmap(start, end, keys, matrix, top, _place_label)
+
+
+DEMAND_REPORTS = {
+    'routes': route_demand,
+    'hotels': hotel_night_demand,
+}
+
+
+def demand_heatmap(kind, start=None, end=None, top=None):
+    return DEMAND_REPORTS[kind](start=start, end=end, top=top)
+
+
+def heatmap_as_json(heatmap):
+    return {
+        'start': heatmap['start'],
+        'end': heatmap['end'],
+        'days': heatmap['days'],
+        'labels': heatmap['labels'],
+        'totals': heatmap['totals'].tolist(),
+        'matrix': heatmap['matrix'].tolist(),
+    }
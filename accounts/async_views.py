@@ -0,0 +1,324 @@
+"""
+Async versions of the auth and booking views, for the ASGI entry point.
+
+traveling/asgi.py turns on API_ASYNC_VIEWS and accounts/urls.py then routes
+the same paths to these classes instead of their counterparts in views.py,
+which keep serving gunicorn over WSGI. Requests and responses are identical.
+
+AsyncAPIView runs DRF's request cycle as a coroutine. Authentication is
+awaited first: AsyncJWTAuthentication loads the user with the async ORM and
+any other authenticator runs in a thread. DRF's own `initial` then finds the
+user already set and only negotiates, checks permissions and throttles, none
+of which do I/O here. Serializer validation, saving (which creates any new
+Location in the same transaction as the row) and supplier searches run in
+threads, and confirmation emails go out from a background pool.
+"""
+import asyncio
+import random
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from drf_spectacular.utils import extend_schema
+from rest_framework import exceptions, permissions, status, views
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .dedup import aexisting_search, remember
+from .models import Hotel, Flight, RentalCar, HolidayPackage, Cruise, OTPLog, MultiCityFlight
+from .notifications import send_booking_confirmation_later
+from .projection import ProjectionMixin, project_queryset
+from .representations import represent
+from .search import search_offers, search_legs
+from .serializers import (
+    UserProfileSerializer, VerifyOTPSerializer, OTPSerializer,
+    HotelListSerializer, FlightListSerializer, RentalCarListSerializer, HolidayPackageListSerializer,
+    CruiseListSerializer, MultiCityFlightSerializer,
+)
+from .views import IsOnboardingCompletedPermission, get_tokens_for_user, wants_availability
+
+
+User = get_user_model()
+
+
+class AsyncJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication whose user lookup is awaited instead of blocking."""
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token):
+        try:
+            user_id = validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        try:
+            user = await self.user_model.objects.aget(**{jwt_settings.USER_ID_FIELD: user_id})
+        except self.user_model.DoesNotExist:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if jwt_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(jwt_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+        return user
+
+
+class AsyncAPIView(ProjectionMixin, views.APIView):
+    authentication_classes = [AsyncJWTAuthentication, SessionAuthentication]
+
+    async def authenticate(self, request):
+        for authenticator in request.authenticators:
+            try:
+                if hasattr(authenticator, 'aauthenticate'):
+                    user_auth = await authenticator.aauthenticate(request)
+                else:
+                    user_auth = await sync_to_async(authenticator.authenticate)(request)
+            except exceptions.APIException:
+                request._not_authenticated()
+                raise
+            if user_auth is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = user_auth
+                return
+        request._not_authenticated()
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.authenticate(request)
+            self.initial(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if asyncio.iscoroutine(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+async def is_valid(serializer):
+    return await sync_to_async(serializer.is_valid)()
+
+
+# --- Authentication Views ---
+
+class AsyncSendOTPView(AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(request=OTPSerializer, responses={200: dict})
+    async def post(self, request):
+        serializer = OTPSerializer(data=request.data)
+        if serializer.is_valid():
+            email = serializer.validated_data['email']
+            otp = str(random.randint(100000, 999999))
+
+            user, created = await User.objects.aget_or_create(email=email)
+            user.otp = otp
+            user.otp_created_at = timezone.now()
+            await user.asave()
+
+            # As in the sync view: a failed send fails the request before anything is logged.
+            await sync_to_async(send_mail, thread_sensitive=False)(
+                'Your OTP Code', f'Your OTP code is {otp}', settings.EMAIL_HOST_USER, [email], fail_silently=False,
+            )
+            await OTPLog.objects.acreate(user=user, phone_number=email, otp_code=otp, is_successful=False)
+            return Response({'message': 'OTP sent successfully'}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncVerifyOTPView(AsyncAPIView):
+    permission_classes = [permissions.AllowAny]
+    minimal_fields = ('message', 'tokens', 'is_onboarding_completed')
+
+    @extend_schema(request=VerifyOTPSerializer, responses={200: dict})
+    async def post(self, request):
+        serializer = VerifyOTPSerializer(data=request.data)
+        if serializer.is_valid():
+            email = serializer.validated_data['email']
+            otp = serializer.validated_data['otp']
+            try:
+                user = await User.objects.aget(email=email, otp=otp)
+            except User.DoesNotExist:
+                return Response({'error': 'Invalid OTP or Email'}, status=status.HTTP_400_BAD_REQUEST)
+
+            if user.otp_created_at and timezone.now() > user.otp_created_at + timedelta(minutes=2):
+                return Response({'error': 'OTP has expired'}, status=status.HTTP_400_BAD_REQUEST)
+
+            user.is_email_verified = True
+            user.otp = None
+            user.otp_created_at = None
+            if not user.is_active:
+                user.is_active = True
+            await user.asave()
+            await OTPLog.objects.filter(user=user, otp_code=otp).aupdate(is_successful=True)
+
+            response_data = {
+                'message': 'OTP verified successfully.',
+                'tokens': get_tokens_for_user(user),
+                'is_onboarding_completed': user.is_onboarding_completed
+            }
+            if user.is_onboarding_completed:
+                if self.projection.wants('user_details'):
+                    response_data['user_details'] = {
+                        'first_name': user.first_name,
+                        'last_name': user.last_name,
+                        'phone_number': user.phone_number,
+                        'address': user.address,
+                        'email': user.email
+                    }
+            else:
+                response_data['message'] = 'OTP verified. Please complete onboarding to gain full access.'
+            return Response(response_data, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncCompleteOnboardingView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated]
+    minimal_fields = ('message',)
+
+    @extend_schema(request=UserProfileSerializer, responses={200: dict})
+    async def post(self, request):
+        user = request.user
+        if user.is_onboarding_completed:
+            return Response({'error': 'Onboarding already complete'}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = UserProfileSerializer(data=request.data)
+        if serializer.is_valid():
+            user.first_name = serializer.validated_data['first_name']
+            user.last_name = serializer.validated_data['last_name']
+            user.phone_number = serializer.validated_data['phone_number']
+            user.address = serializer.validated_data.get('address', user.address)
+            user.is_onboarding_completed = True
+            await user.asave()
+
+            return Response({
+                'message': 'Onboarding complete. You now have full access.',
+                'user_details': {
+                    'first_name': user.first_name,
+                    'last_name': user.last_name,
+                    'phone_number': user.phone_number,
+                    'address': user.address,
+                    'email': user.email
+                }
+            }, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# --- Booking APIs (Gated by Onboarding) ---
+
+class AsyncBookingView(AsyncAPIView):
+    permission_classes = [permissions.IsAuthenticated, IsOnboardingCompletedPermission]
+    minimal_fields = ('message', 'data.coupon')
+
+    model = None
+    serializer_class = None
+    label = None
+    # Supplier search kind for the 'availability' block; None for no block.
+    search_kind = None
+
+    async def availability(self, data):
+        # A thread of its own: the fan-out may wait up to SEARCH_DEADLINE.
+        return await sync_to_async(search_offers, thread_sensitive=False)(self.search_kind, data)
+
+    async def post(self, request):
+        serializer = self.serializer_class(data=request.data)
+        if not await is_valid(serializer):
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        fields = self.projection.fields('data')
+        dedup_key, duplicate = await aexisting_search(
+            self.model, request.user, data, project_queryset(self.model.objects.all(), self.serializer_class, fields),
+        )
+        if duplicate is not None:
+            body = {'message': f'{self.label} search already saved', 'data': represent(self.serializer_class, duplicate, fields)}
+            status_code = status.HTTP_200_OK
+        else:
+            # One thread for the whole save: the row and any new Location commit together.
+            instance = await sync_to_async(serializer.save)(user=request.user)
+            await sync_to_async(remember)(dedup_key, instance)
+            send_booking_confirmation_later(instance)
+            body = {'message': f'{self.label} search saved successfully', 'data': represent(self.serializer_class, instance, fields)}
+            status_code = status.HTTP_201_CREATED
+
+        if self.search_kind is not None and wants_availability(self.projection, self.search_kind):
+            body['availability'] = await self.availability(data)
+        return Response(body, status=status_code)
+
+
+class AsyncHotelListView(AsyncBookingView):
+    model, serializer_class, label, search_kind = Hotel, HotelListSerializer, 'Hotel', 'hotel'
+
+    @extend_schema(request=HotelListSerializer, responses={201: dict})
+    async def post(self, request):
+        return await super().post(request)
+
+
+class AsyncFlightListView(AsyncBookingView):
+    model, serializer_class, label, search_kind = Flight, FlightListSerializer, 'Flight', 'flight'
+
+    @extend_schema(request=FlightListSerializer, responses={201: dict})
+    async def post(self, request):
+        return await super().post(request)
+
+
+class AsyncRentalCarListView(AsyncBookingView):
+    model, serializer_class, label, search_kind = RentalCar, RentalCarListSerializer, 'Rental Car', 'rental_car'
+
+    @extend_schema(request=RentalCarListSerializer, responses={201: dict})
+    async def post(self, request):
+        return await super().post(request)
+
+
+class AsyncHolidayPackageListView(AsyncBookingView):
+    model, serializer_class, label = HolidayPackage, HolidayPackageListSerializer, 'Holiday Package'
+
+    @extend_schema(request=HolidayPackageListSerializer, responses={201: dict})
+    async def post(self, request):
+        return await super().post(request)
+
+
+class AsyncCruiseListView(AsyncBookingView):
+    model, serializer_class, label, search_kind = Cruise, CruiseListSerializer, 'Cruise', 'cruise'
+
+    @extend_schema(request=CruiseListSerializer, responses={201: dict})
+    async def post(self, request):
+        return await super().post(request)
+
+
+class AsyncMultiCityFlightListView(AsyncBookingView):
+    model, serializer_class, label, search_kind = MultiCityFlight, MultiCityFlightSerializer, 'Multi-city flight', 'flight'
+
+    async def availability(self, data):
+        travellers = {'adults': data.get('adults', 0), 'children': data.get('children', 0)}
+        return await sync_to_async(search_legs, thread_sensitive=False)(data['legs'], travellers)
+
+    @extend_schema(request=MultiCityFlightSerializer, responses={201: dict})
+    async def post(self, request):
+        return await super().post(request)
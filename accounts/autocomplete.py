@@ -0,0 +1,129 @@
+"""
+In-memory prefix index for location type-ahead.
+
+Each scope (hotel places, flight/cruise/package origins and destinations, ...)
+gets a sorted array of normalized keys ranked by how often the location was
+searched, taken from the daily route rollups. Lookups are a bisect plus a
+small top-K, with the shortest prefixes precomputed, so requests never touch
+the database. The indexes are rebuilt in the background (see indexing.py).
+"""
+import heapq
+from bisect import bisect_left
+from collections import Counter
+
+from django.db.models import Sum
+
+from .indexing import BackgroundIndex
+from .locations import normalize_location
+from .models import Location, DailyRouteStat
+
+
+# Which rollup columns feed each autocomplete scope.
+SCOPES = {
+    'hotel': [('hotel', 'destination')],
+    'flight': [
+        ('flight', 'origin'), ('flight', 'destination'),
+        ('multi_city_flight', 'origin'), ('multi_city_flight', 'destination'),
+    ],
+    'cruise': [('cruise', 'origin'), ('cruise', 'destination')],
+    'package': [('holiday_package', 'origin'), ('holiday_package', 'destination')],
+    'rental_car': [('rental_car', 'destination')],
+}
+ALL_SCOPES = 'all'
+
+MAX_RESULTS = 20
+PRECOMPUTED_PREFIX_LENGTH = 2
+
+
+class PrefixIndex:
+    """Sorted-array prefix index over one scope's locations."""
+
+    def __init__(self, locations, weights):
+        self.ids = []
+        self.names = []
+        self.weights = []
+        entries = []
+        for location_id, name, key in locations:
+            # Only places that were actually searched; stray or unused rows are never offered.
+            weight = weights.get(location_id, 0)
+            if weight <= 0:
+                continue
+            position = len(self.ids)
+            self.ids.append(location_id)
+            self.names.append(name)
+            self.weights.append(weight)
+            # Every word start is searchable, so "york" finds "New York".
+            words = key.split(' ')
+            for start in range(len(words)):
+                entries.append((' '.join(words[start:]), position))
+
+        entries.sort()
+        self.keys = [key for key, _ in entries]
+        self.positions = [position for _, position in entries]
+        self.top = self._precompute()
+
+    def _rank(self, position):
+        return (self.weights[position], -len(self.names[position]))
+
+    def _best(self, positions, limit):
+        return heapq.nlargest(limit, set(positions), key=self._rank)
+
+    def _precompute(self):
+        buckets = {}
+        for key, position in zip(self.keys, self.positions):
+            for length in range(1, min(len(key), PRECOMPUTED_PREFIX_LENGTH) + 1):
+                buckets.setdefault(key[:length], []).append(position)
+        return {prefix: self._best(positions, MAX_RESULTS) for prefix, positions in buckets.items()}
+
+    def search(self, prefix, limit=10):
+        prefix = normalize_location(prefix)
+        if not prefix:
+            return []
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            best = self.top.get(prefix, [])[:limit]
+        else:
+            low = bisect_left(self.keys, prefix)
+            high = bisect_left(self.keys, prefix + '\U0010ffff', low)
+            best = self._best(self.positions[low:high], limit)
+        return [
+            {'id': self.ids[position], 'name': self.names[position], 'count': self.weights[position]}
+            for position in best
+        ]
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def scope_weights():
+    """Search counts per location id for every scope, summed from the route rollups."""
+    by_type = {}
+    for column in ('origin', 'destination'):
+        rows = (
+            DailyRouteStat.objects.filter(**{f'{column}__isnull': False})
+            .values_list('booking_type', column)
+            .annotate(total=Sum('count'))
+        )
+        for booking_type, location_id, total in rows:
+            by_type.setdefault((booking_type, column), Counter())[location_id] += total
+
+    weights = {}
+    for scope, sources in SCOPES.items():
+        weights[scope] = Counter()
+        for source in sources:
+            weights[scope].update(by_type.get(source, {}))
+    weights[ALL_SCOPES] = sum(weights.values(), Counter())
+    return weights
+
+
+def build_indexes():
+    # Locations merged into a canonical one are not offered.
+    locations = list(Location.objects.filter(canonical__isnull=True).values_list('id', 'name', 'key'))
+    weights = scope_weights()
+    return {scope: PrefixIndex(locations, weights[scope]) for scope in [*SCOPES, ALL_SCOPES]}
+
+
+autocomplete_indexes = BackgroundIndex('location-autocomplete', build_indexes, 'AUTOCOMPLETE_REFRESH_SECONDS')
+
+
+def autocomplete(prefix, scope=ALL_SCOPES, limit=10):
+    return autocomplete_indexes.get()[scope].search(prefix, limit)
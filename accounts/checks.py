@@ -0,0 +1,20 @@
+"""
+Deployment checks for settings the app depends on at runtime.
+"""
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend.endswith('LocMemCache'):
+        return [Warning(
+            "The default cache is local to each process.",
+            hint=(
+                "Set REDIS_URL so gunicorn workers share search results, dedup "
+                "fingerprints, profile invalidation and the trending and /metrics snapshots."
+            ),
+            id='accounts.W001',
+        )]
+    return []
@@ -0,0 +1,94 @@
+"""
+Suppression of repeated booking searches.
+
+Double taps and re-submits of the same search by the same user within
+SEARCH_DEDUP_WINDOW seconds get the row saved the first time (and so the same
+coupon) instead of a new row. Searches are matched on a fingerprint of the
+canonical validated payload, held in the cache. A request that finds the first
+one still being saved waits briefly for its row.
+"""
+import asyncio
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+from .search import canonical_query
+
+
+PENDING = 'pending'
+PENDING_TTL = 10
+
+
+def fingerprint(model, user, data):
+    text = json.dumps(canonical_query(data), sort_keys=True, separators=(',', ':'), default=str)
+    digest = hashlib.sha256(text.encode()).hexdigest()
+    return f'dedup:{model._meta.model_name}:{user.pk}:{digest}'
+
+
+def _window():
+    return getattr(settings, 'SEARCH_DEDUP_WINDOW', 60)
+
+
+def _poll():
+    """(deadline, interval) for waiting on a fingerprint that is still PENDING."""
+    return time.monotonic() + getattr(settings, 'SEARCH_DEDUP_WAIT', 2.0), 0.05
+
+
+def _found(key, row):
+    if row is None:
+        return key, None
+    metrics.increment('search.duplicates_suppressed')
+    return key, row
+
+
+def existing_search(model, user, data, queryset=None):
+    """
+    Returns (fingerprint, earlier row or None). When the row is None the caller
+    saves a new one and passes it to `remember`. The earlier row is loaded
+    through `queryset` when given, e.g. to fetch only the columns shown.
+    """
+    window = _window()
+    if not window or not user.is_authenticated:
+        return None, None
+
+    key = fingerprint(model, user, data)
+    if cache.add(key, PENDING, min(window, PENDING_TTL)):
+        return key, None
+
+    deadline, interval = _poll()
+    value = cache.get(key)
+    while value == PENDING and time.monotonic() < deadline:
+        time.sleep(interval)
+        value = cache.get(key)
+
+    rows = queryset if queryset is not None else model.objects.all()
+    return _found(key, rows.filter(pk=value, user=user).first() if isinstance(value, int) else None)
+
+
+async def aexisting_search(model, user, data, queryset=None):
+    """existing_search for the async views: waits with asyncio.sleep, so no thread is held while it polls."""
+    window = _window()
+    if not window or not user.is_authenticated:
+        return None, None
+
+    key = fingerprint(model, user, data)
+    if await cache.aadd(key, PENDING, min(window, PENDING_TTL)):
+        return key, None
+
+    deadline, interval = _poll()
+    value = await cache.aget(key)
+    while value == PENDING and time.monotonic() < deadline:
+        await asyncio.sleep(interval)
+        value = await cache.aget(key)
+
+    rows = queryset if queryset is not None else model.objects.all()
+    return _found(key, await rows.filter(pk=value, user=user).afirst() if isinstance(value, int) else None)
+
+
+def remember(key, instance):
+    if key is not None:
+        cache.set(key, instance.pk, getattr(settings, 'SEARCH_DEDUP_WINDOW', 60))
@@ -0,0 +1,141 @@
+"""
+Concurrent supplier fan-out.
+
+All suppliers for a search are queried at once on an asyncio loop that lives
+in a background thread and owns one pooled httpx.AsyncClient, so connections
+to a provider are reused across requests. Each supplier gets its own timeout
+and the whole fan-out a deadline; whatever has answered by then is returned
+and the rest are reported as unavailable. A per-provider circuit breaker stops
+calling a provider that keeps failing until it has had time to recover.
+"""
+import asyncio
+import logging
+import threading
+import time
+
+import httpx
+from django.conf import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Opens after `failures` consecutive failures; after `reset_after` seconds one probe call is let through."""
+
+    def __init__(self, failures=5, reset_after=30):
+        self.failures = failures
+        self.reset_after = reset_after
+        self._failed = 0
+        self._opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return 'closed'
+        if time.monotonic() - self._opened_at >= self.reset_after:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            self._failed = 0
+            self._opened_at = None
+            self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self._failed += 1
+            if self._probing or self._failed >= self.failures:
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+
+class FanOut:
+    def __init__(self):
+        self._loop = None
+        self._client = None
+        self._lock = threading.Lock()
+        self._breakers = {}
+
+    def breaker(self, name):
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = self._breakers.setdefault(name, CircuitBreaker(
+                getattr(settings, 'SEARCH_BREAKER_FAILURES', 5),
+                getattr(settings, 'SEARCH_BREAKER_RESET_SECONDS', 30),
+            ))
+        return breaker
+
+    def _start(self):
+        with self._lock:
+            if self._loop is not None:
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='supplier-fanout', daemon=True).start()
+            self._client = asyncio.run_coroutine_threadsafe(self._make_client(), loop).result()
+            self._loop = loop
+
+    async def _make_client(self):
+        connections = getattr(settings, 'SEARCH_HTTP_MAX_CONNECTIONS', 100)
+        # Timeouts are enforced per supplier around each call instead.
+        return httpx.AsyncClient(
+            timeout=None,
+            limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+        )
+
+    async def _call(self, supplier, kind, query):
+        timeout = supplier.timeout or getattr(settings, 'SEARCH_SUPPLIER_TIMEOUT', 1.5)
+        return await asyncio.wait_for(supplier.asearch(self._client, kind, query), timeout)
+
+    async def _gather(self, suppliers, kind, query, deadline):
+        tasks = {asyncio.ensure_future(self._call(supplier, kind, query)): supplier for supplier in suppliers}
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for task in pending:
+            task.cancel()
+
+        offers, unavailable = [], []
+        for task, supplier in tasks.items():
+            breaker = self.breaker(supplier.name)
+            if task in done and task.exception() is None:
+                offers.extend(task.result())
+                breaker.success()
+                continue
+            if task in done:
+                error = task.exception()
+                logger.warning("Supplier %s failed on a %s search: %r", supplier.name, kind, error)
+            else:
+                logger.warning("Supplier %s missed the %s search deadline", supplier.name, kind)
+            breaker.failure()
+            unavailable.append(supplier.name)
+        return offers, unavailable
+
+    def search(self, suppliers, kind, query):
+        """Returns (offers, names of suppliers that were skipped, failed or too slow)."""
+        allowed, unavailable = [], []
+        for supplier in suppliers:
+            (allowed if self.breaker(supplier.name).allow() else unavailable).append(supplier)
+        unavailable = [supplier.name for supplier in unavailable]
+        if not allowed:
+            return [], unavailable
+
+        self._start()
+        deadline = getattr(settings, 'SEARCH_DEADLINE', 2.0)
+        future = asyncio.run_coroutine_threadsafe(self._gather(allowed, kind, query, deadline), self._loop)
+        offers, failed = future.result()
+        return offers, unavailable + failed
+
+
+fan_out = FanOut()
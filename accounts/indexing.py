@@ -0,0 +1,69 @@
+"""
+Per-process in-memory indexes that rebuild themselves in the background.
+
+The first `get()` builds the index synchronously and starts a daemon thread
+that rebuilds it every `interval` seconds. A rebuild replaces the index with
+a single attribute assignment, so readers always see a complete index.
+Indexes that can be brought up to date cheaply pass an `updater`, which is
+given the current index and returns its successor instead of a full rebuild.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundIndex:
+    def __init__(self, name, builder, interval_setting, default_interval=300, updater=None):
+        self.name = name
+        self.builder = builder
+        self.updater = updater
+        self.interval_setting = interval_setting
+        self.default_interval = default_interval
+        self._index = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def interval(self):
+        return getattr(settings, self.interval_setting, self.default_interval)
+
+    def rebuild(self):
+        index = self.builder()
+        self._index = index
+        return index
+
+    def refresh(self):
+        if self.updater is None or self._index is None:
+            return self.rebuild()
+        index = self.updater(self._index)
+        self._index = index
+        return index
+
+    def get(self):
+        if self._index is None:
+            with self._lock:
+                if self._index is None:
+                    self.rebuild()
+                    self._start()
+        return self._index
+
+    def _start(self):
+        if self._thread is None and self.interval:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Rebuilding %s failed", self.name)
+            finally:
+                close_old_connections()
@@ -0,0 +1,228 @@
+"""
+Multi-city itinerary ordering.
+
+The route graph prices a hop a -> b as a stub fare for the city pair,
+discounted by how often that route has been searched (busy routes are better
+served). Search counts come from Flight and MultiCityFlightLeg rows; the graph
+is kept in memory and brought up to date in the background by reading only
+rows past the last primary key it has seen.
+
+The first city stays first (and last, for trips that return home) and the
+travel dates keep their order; only the cities in between are reordered.
+Only a connected chain of legs, each leaving from where the last one landed,
+is one tour; open-jaw trips (travelling overland between two legs) are
+returned in their own order.
+Up to ITINERARY_EXACT_MAX_CITIES cities are solved exactly with Held-Karp
+dynamic programming, longer trips with nearest neighbour followed by 2-opt.
+"""
+import hashlib
+import math
+import time
+
+from django.conf import settings
+
+from .indexing import BackgroundIndex
+from .models import Flight, MultiCityFlightLeg
+
+
+ROUTE_SOURCES = [Flight, MultiCityFlightLeg]
+
+
+def stub_fare(origin_id, destination_id):
+    """Stand-in fare for a city pair until real fares are stored: stable, symmetric, 80-900."""
+    low, high = sorted((origin_id, destination_id), key=lambda city: (isinstance(city, str), city))
+    pair = f'{low}-{high}'
+    digest = int.from_bytes(hashlib.blake2b(pair.encode(), digest_size=4).digest(), 'big')
+    return 80 + digest % 821
+
+
+class RouteGraph:
+    def __init__(self, counts, cursors):
+        self.counts = counts    # {(origin_id, destination_id): searches}
+        self.cursors = cursors  # {model name: last primary key counted}
+
+    def cost(self, origin_id, destination_id):
+        searches = self.counts.get((origin_id, destination_id), 0)
+        return stub_fare(origin_id, destination_id) / (1 + math.log1p(searches))
+
+
+def _count_new_rows(counts, cursors):
+    for model in ROUTE_SOURCES:
+        name = model._meta.model_name
+        rows = (
+            model.objects.filter(pk__gt=cursors.get(name, 0))
+            .order_by('pk')
+            .values_list('pk', 'from_location_id', 'to_location_id')
+        )
+        for pk, origin_id, destination_id in rows.iterator(chunk_size=5000):
+            counts[(origin_id, destination_id)] = counts.get((origin_id, destination_id), 0) + 1
+            cursors[name] = pk
+
+
+def build_route_graph():
+    counts, cursors = {}, {}
+    _count_new_rows(counts, cursors)
+    return RouteGraph(counts, cursors)
+
+
+def update_route_graph(graph):
+    counts, cursors = dict(graph.counts), dict(graph.cursors)
+    _count_new_rows(counts, cursors)
+    return RouteGraph(counts, cursors)
+
+
+route_graph = BackgroundIndex(
+    'route-graph', build_route_graph, 'ROUTE_GRAPH_REFRESH_SECONDS', default_interval=60,
+    updater=update_route_graph,
+)
+
+
+# --- Solvers ---
+# `cost` is a square matrix over the trip's cities with index 0 the starting city.
+
+def tour_cost(cost, order, round_trip):
+    total = sum(cost[a][b] for a, b in zip(order, order[1:]))
+    return total + cost[order[-1]][0] if round_trip else total
+
+
+def held_karp(cost, round_trip):
+    """Exact cheapest order, O(2^n n^2)."""
+    n = len(cost)
+    if n <= 2:
+        return list(range(n))
+    m = n - 1  # cities other than the start, as bits 0..m-1
+    full = (1 << m) - 1
+    best = [[math.inf] * m for _ in range(1 << m)]
+    parent = [[-1] * m for _ in range(1 << m)]
+    for j in range(m):
+        best[1 << j][j] = cost[0][j + 1]
+
+    for mask in range(1, full + 1):
+        row = best[mask]
+        for j in range(m):
+            so_far = row[j]
+            if so_far == math.inf:
+                continue
+            hops = cost[j + 1]
+            for k in range(m):
+                if mask & (1 << k):
+                    continue
+                extended = mask | (1 << k)
+                value = so_far + hops[k + 1]
+                if value < best[extended][k]:
+                    best[extended][k] = value
+                    parent[extended][k] = j
+
+    closing = [best[full][j] + (cost[j + 1][0] if round_trip else 0) for j in range(m)]
+    last = min(range(m), key=closing.__getitem__)
+    order, mask = [], full
+    while last != -1:
+        order.append(last + 1)
+        last, mask = parent[mask][last], mask & ~(1 << last)
+    return [0] + order[::-1]
+
+
+def nearest_neighbour(cost):
+    order = [0]
+    remaining = set(range(1, len(cost)))
+    while remaining:
+        hops = cost[order[-1]]
+        nearest = min(remaining, key=hops.__getitem__)
+        order.append(nearest)
+        remaining.remove(nearest)
+    return order
+
+
+def two_opt(cost, order, round_trip, deadline):
+    """Reverse segments while that makes the trip cheaper, or until `deadline` (perf_counter)."""
+    current = tour_cost(cost, order, round_trip)
+    improved = True
+    while improved and time.perf_counter() < deadline:
+        improved = False
+        for i in range(1, len(order) - 1):
+            for k in range(i + 1, len(order)):
+                candidate = order[:i] + order[i:k + 1][::-1] + order[k + 1:]
+                candidate_cost = tour_cost(cost, candidate, round_trip)
+                if candidate_cost < current - 1e-9:
+                    order, current, improved = candidate, candidate_cost, True
+            if time.perf_counter() >= deadline:
+                break
+    return order
+
+
+def best_order(cost, round_trip):
+    """Returns (order, method)."""
+    if len(cost) <= getattr(settings, 'ITINERARY_EXACT_MAX_CITIES', 10):
+        return held_karp(cost, round_trip), 'exact'
+    budget = getattr(settings, 'ITINERARY_HEURISTIC_BUDGET_MS', 30) / 1000
+    order = two_opt(cost, nearest_neighbour(cost), round_trip, time.perf_counter() + budget)
+    return order, 'heuristic'
+
+
+# --- API ---
+
+def _city_id(location):
+    # A place first named in this request is not stored yet (see LocationField);
+    # nobody has searched a route to it, so its key stands in for the id.
+    return location.pk if location.pk is not None else location.key
+
+
+def _as_given(graph, legs):
+    original = round(sum(graph.cost(_city_id(leg['from_location']), _city_id(leg['to_location'])) for leg in legs), 2)
+    return {
+        'method': 'unchanged',
+        'estimated_cost': original,
+        'original_cost': original,
+        'legs': [
+            {
+                'from_location': leg['from_location'].name,
+                'to_location': leg['to_location'].name,
+                'departure_date': leg['departure_date'],
+            }
+            for leg in legs
+        ],
+    }
+
+
+def optimize_itinerary(legs):
+    """
+    Suggest a cheaper order for validated multi-city legs (dicts with Location
+    from/to and departure_date). Cities repeated mid-trip are visited once.
+    Legs that do not form a connected chain come back unchanged.
+    """
+    graph = route_graph.get()
+    if any(_city_id(leg['to_location']) != _city_id(following['from_location'])
+           for leg, following in zip(legs, legs[1:])):
+        return _as_given(graph, legs)
+
+    start = legs[0]['from_location']
+    round_trip = len(legs) > 1 and _city_id(legs[-1]['to_location']) == _city_id(start)
+
+    cities, seen = [], set()
+    for leg in legs:
+        for location in (leg['from_location'], leg['to_location']):
+            if _city_id(location) not in seen:
+                seen.add(_city_id(location))
+                cities.append(location)
+
+    cost = [[0 if a is b else graph.cost(_city_id(a), _city_id(b)) for b in cities] for a in cities]
+    order, method = best_order(cost, round_trip)
+
+    stops = [cities[i] for i in order] + ([start] if round_trip else [])
+    dates = sorted(leg['departure_date'] for leg in legs)
+    suggested = [
+        {
+            'from_location': origin.name,
+            'to_location': destination.name,
+            'departure_date': dates[i] if i < len(dates) else dates[-1],
+        }
+        for i, (origin, destination) in enumerate(zip(stops, stops[1:]))
+    ]
+    estimated = tour_cost(cost, order, round_trip)
+    original = sum(graph.cost(_city_id(leg['from_location']), _city_id(leg['to_location'])) for leg in legs)
+    return {
+        'method': method,
+        'estimated_cost': round(estimated, 2),
+        'original_cost': round(original, 2),
+        'legs': suggested,
+    }
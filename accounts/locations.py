@@ -0,0 +1,133 @@
+"""
+Location interning.
+
+Booking rows point at a shared Location row instead of repeating the place
+name. `intern_location` maps free text to that row through a per-process
+cache, so the common case costs a dictionary lookup and no database query.
+Spellings that were merged into another location resolve to the canonical row.
+`lookup_location` does the same without creating anything, for request
+validation; the row is interned when the booking that names it is saved.
+
+Merges change which row a key resolves to in every worker, so the cache is
+tagged with the shared LOCATION_CACHE_VERSION_KEY: clear_location_cache
+bumps it, and each lookup drops this worker's entries once it has moved.
+"""
+import threading
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from .models import Location
+
+
+LOCATION_CACHE_VERSION_KEY = 'locations:version'
+
+_cache = {}
+_cache_lock = threading.Lock()
+_cache_version = None
+
+
+def normalize_location(name):
+    """Lookup key for a location: whitespace collapsed and case folded."""
+    return ' '.join(str(name).split()).casefold()
+
+
+def display_location(name):
+    return ' '.join(str(name).split())
+
+
+def _remember(key, location):
+    with _cache_lock:
+        if len(_cache) >= getattr(settings, 'LOCATION_CACHE_SIZE', 100000):
+            _cache.clear()
+        _cache[key] = (location.id, location.name, location.key)
+
+
+def _check_version():
+    global _cache_version
+    version = cache.get(LOCATION_CACHE_VERSION_KEY)
+    if version != _cache_version:
+        with _cache_lock:
+            _cache.clear()
+            _cache_version = version
+
+
+def _instance(location_id, name, key):
+    return Location(id=location_id, name=name, key=key)
+
+
+def lookup_location(name):
+    """
+    Return the Location for `name` without writing anything: the stored row
+    (or its canonical) when there is one, else an unsaved Location that
+    `intern_location` will create.
+    """
+    key = normalize_location(name)
+    _check_version()
+    cached = _cache.get(key)
+    if cached is not None:
+        return _instance(*cached)
+
+    location = Location.objects.filter(key=key).select_related('canonical').first()
+    if location is None:
+        return Location(key=key, name=display_location(name))
+    if location.canonical_id:
+        location = location.canonical
+    _remember(key, location)
+    return location
+
+
+def intern_location(name):
+    """Return the Location for `name`, creating it on first sight."""
+    location = lookup_location(name)
+    if location.pk is not None:
+        return location
+
+    key = location.key
+    try:
+        with transaction.atomic():
+            location.save()
+    except IntegrityError:
+        location = Location.objects.get(key=key)
+        _remember(key, location)
+    else:
+        # Only cache ids that survive the surrounding transaction.
+        transaction.on_commit(lambda: _remember(key, location))
+    return location
+
+
+def intern_locations(names):
+    """Bulk variant for backfills; returns {name: location_id}."""
+    keys = {name: normalize_location(name) for name in names}
+    known = {
+        key: canonical_id or location_id
+        for key, location_id, canonical_id in
+        Location.objects.filter(key__in=set(keys.values())).values_list('key', 'id', 'canonical_id')
+    }
+    missing = {}
+    for name, key in keys.items():
+        if key not in known and key not in missing:
+            missing[key] = Location(key=key, name=display_location(name))
+    if missing:
+        Location.objects.bulk_create(missing.values(), ignore_conflicts=True)
+        known.update(Location.objects.filter(key__in=missing).values_list('key', 'id'))
+    return {name: known[key] for name, key in keys.items()}
+
+
+def location_names(ids):
+    """{id: name} for a set of location ids, in one query."""
+    return dict(Location.objects.filter(id__in=set(ids)).values_list('id', 'name'))
+
+
+def _bump_version():
+    # Only compared for equality, so a fresh token is as good as a counter.
+    cache.set(LOCATION_CACHE_VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def clear_location_cache():
+    """Forget interned ids here now, and in every other worker once the merge commits."""
+    with _cache_lock:
+        _cache.clear()
+    transaction.on_commit(_bump_version)
@@ -0,0 +1,21 @@
+"""
+Django's SMTP email backend, with the time spent sending charged to the
+current request for /metrics (see metrics.py).
+"""
+import time
+
+from django.core.mail.backends import smtp
+
+from . import metrics
+
+
+class EmailBackend(smtp.EmailBackend):
+    def send_messages(self, email_messages):
+        stats = metrics.current_request.get()
+        if stats is None:
+            return super().send_messages(email_messages)
+        started = time.perf_counter()
+        try:
+            return super().send_messages(email_messages)
+        finally:
+            stats.smtp_seconds += time.perf_counter() - started
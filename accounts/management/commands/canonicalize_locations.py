@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from accounts.resolver import canonicalize_locations
+
+
+class Command(BaseCommand):
+    help = "Merge misspelled or aliased locations into their canonical location across all booking rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only list the merges that would be made.")
+
+    def handle(self, *args, **options):
+        merges, suggestions = canonicalize_locations(dry_run=options['dry_run'])
+        for source, target in merges:
+            self.stdout.write(f"{source.name} -> {target.name}")
+        verb = "Would merge" if options['dry_run'] else "Merged"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(merges)} locations."))
+        if suggestions:
+            self.stdout.write("Too close to call; merge from the Location admin if they are the same place:")
+            for source, target in suggestions:
+                self.stdout.write(f"  {source.name} -> {target.name}?")
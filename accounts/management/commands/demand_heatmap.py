@@ -0,0 +1,64 @@
+import csv
+import json
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from accounts.analytics import DEMAND_REPORTS, demand_heatmap, heatmap_as_json
+from accounts.serializers import DemandHeatmapQuerySerializer
+
+
+class Command(BaseCommand):
+    help = "Build a search-demand heatmap (routes per departure day, or hotel nights per place)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(DEMAND_REPORTS))
+        parser.add_argument('--start', help="First day, YYYY-MM-DD (default: earliest in data).")
+        parser.add_argument('--end', help="Last day, YYYY-MM-DD (default: latest in data).")
+        parser.add_argument('--top', type=int, default=50, help="Keep only the N busiest rows.")
+        parser.add_argument('--output', help="Write to a .json, .csv or .npz file instead of printing a summary.")
+
+    def handle(self, *args, **options):
+        query = {key: options[key] for key in ('kind', 'start', 'end', 'top') if options[key] is not None}
+        serializer = DemandHeatmapQuerySerializer(data=query)
+        if not serializer.is_valid():
+            raise CommandError(serializer.errors)
+
+        started = time.perf_counter()
+        heatmap = demand_heatmap(**serializer.validated_data)
+        elapsed = time.perf_counter() - started
+
+        output = options['output']
+        if output:
+            self._write(heatmap, output)
+            self.stdout.write(f"Wrote {output}")
+        else:
+            for label, total in zip(heatmap['labels'], heatmap['totals']):
+                self.stdout.write(f"{total:>8}  {label}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(heatmap['labels'])} rows x {len(heatmap['days'])} days in {elapsed:.2f}s"
+        ))
+
+    def _write(self, heatmap, output):
+        if output.endswith('.npz'):
+            np.savez_compressed(
+                output,
+                matrix=heatmap['matrix'],
+                totals=heatmap['totals'],
+                labels=np.array(heatmap['labels']),
+                days=np.array(heatmap['days'], dtype='datetime64[D]'),
+            )
+        elif output.endswith('.csv'):
+            with open(output, 'w', newline='') as handle:
+                writer = csv.writer(handle)
+                writer.writerow(['label'] + [day.isoformat() for day in heatmap['days']])
+                for label, row in zip(heatmap['labels'], heatmap['matrix'].tolist()):
+                    writer.writerow([label] + row)
+        elif output.endswith('.json'):
+            with open(output, 'w') as handle:
+                json.dump(heatmap_as_json(heatmap), handle, cls=DjangoJSONEncoder)
+        else:
+            raise CommandError("Output must end in .json, .csv or .npz")
@@ -0,0 +1,24 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from accounts.snapshot import SNAPSHOT_TABLES, export_snapshot
+
+
+class Command(BaseCommand):
+    help = "Append new booking rows to the columnar NumPy snapshot used for offline analytics."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default=None, help="Snapshot directory (default: SNAPSHOT_DIR).")
+        parser.add_argument('--tables', nargs='+', choices=sorted(SNAPSHOT_TABLES), help="Only export these tables.")
+        parser.add_argument('--chunk-size', type=int, default=50000, help="Rows fetched per query.")
+        parser.add_argument('--database', default='default', help="Database alias to read from.")
+
+    def handle(self, *args, **options):
+        path = options['path'] or settings.SNAPSHOT_DIR
+        started = time.perf_counter()
+        results = export_snapshot(path, options['tables'], options['chunk_size'], options['database'])
+        for table, rows in results.items():
+            self.stdout.write(f"{table}: {rows} new rows")
+        self.stdout.write(self.style.SUCCESS(f"Snapshot written to {path} in {time.perf_counter() - started:.2f}s"))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.openapi import code_version, generate_schema, prune_schemas, schema_path
+
+
+class Command(BaseCommand):
+    help = "Generate the OpenAPI schema served at api/schema/ for the current code version."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerate even if this version exists.")
+        parser.add_argument('--keep', type=int, default=3, help="Versions to keep, including this one.")
+
+    def handle(self, *args, **options):
+        version = code_version()
+        if schema_path(version, 'yaml').exists() and schema_path(version, 'json').exists() and not options['force']:
+            self.stdout.write(f"Schema for version {version} already generated")
+        else:
+            started = time.perf_counter()
+            generate_schema(version)
+            self.stdout.write(self.style.SUCCESS(
+                f"Schema for version {version} written to {schema_path(version, 'yaml').parent} "
+                f"in {time.perf_counter() - started:.2f}s"
+            ))
+        for stale in prune_schemas(options['keep']):
+            self.stdout.write(f"Removed schema version {stale}")
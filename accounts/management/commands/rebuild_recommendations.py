@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from accounts.recommendations import rebuild_recommendations
+
+
+class Command(BaseCommand):
+    help = "Recount the destination co-occurrence tables from the full search history."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per insert batch.")
+
+    def handle(self, *args, **options):
+        users, pairs = rebuild_recommendations(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Counted {pairs} destination pairs across {users} users."))
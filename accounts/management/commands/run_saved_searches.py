@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from accounts.scheduler import SavedSearchScheduler, send_pending_notifications
+
+
+class Command(BaseCommand):
+    help = "Re-run watched flight and hotel searches as they fall due and email customers whose results changed. Run one instance."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Run a single cycle and exit.")
+        parser.add_argument('--poll', type=float, default=30, help="Seconds between cycles.")
+        parser.add_argument('--workers', type=int, default=None, help="Parallel supplier queries (default: SAVED_SEARCH_WORKERS).")
+
+    def handle(self, *args, **options):
+        scheduler = SavedSearchScheduler(options['workers'])
+        while True:
+            stats = scheduler.run_cycle()
+            stats['sent'] = send_pending_notifications()
+            if stats['watches'] or options['once']:
+                self.stdout.write(
+                    f"{stats['watches']} searches re-run as {stats['queries']} queries, "
+                    f"{stats['notifications']} changed, {stats['sent']} emails sent"
+                )
+            if options['once']:
+                break
+            close_old_connections()
+            time.sleep(options['poll'])
@@ -0,0 +1,56 @@
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+from accounts.suppliers import SEARCH_KINDS, StubSupplier, SupplierError
+
+
+class Command(BaseCommand):
+    help = "Serve a stub inventory provider over HTTP, for pointing an HttpSupplier at during local testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--name', default='stub', help="Supplier name reported in each offer.")
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8101)
+        parser.add_argument('--latency', type=float, default=0.2, help="Seconds to wait before answering.")
+        parser.add_argument('--failure-rate', type=float, default=0.0, help="Share of requests answered with a 503.")
+
+    def handle(self, *args, **options):
+        supplier = StubSupplier(options['name'], latency=options['latency'], failure_rate=options['failure_rate'])
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                kind = self.path.strip('/')
+                if kind not in SEARCH_KINDS:
+                    return self._reply(404, {'error': f"Unknown search kind {kind!r}"})
+                length = int(self.headers.get('Content-Length') or 0)
+                query = json.loads(self.rfile.read(length) or b'{}')
+                try:
+                    self._reply(200, {'offers': supplier.search(kind, query)})
+                except SupplierError as error:
+                    self._reply(503, {'error': str(error)})
+
+            def _reply(self, code, body):
+                payload = json.dumps(body).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                try:
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The caller gave up waiting, which is the point of a slow stub.
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((options['host'], options['port']), Handler)
+        self.stdout.write(f"Stub supplier {supplier.name} on http://{options['host']}:{options['port']}/<kind>/")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.rollups import rebuild_rollups, update_rollups
+
+
+class Command(BaseCommand):
+    help = "Roll new booking rows into the daily dashboard stats (run periodically when ROLLUP_UPDATE_ON_SAVE is off)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help="Drop all rollups and recount the full history.")
+        parser.add_argument('--chunk-size', type=int, default=None, help="Rows per transaction (default: ROLLUP_CHUNK_SIZE).")
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            results = rebuild_rollups(options['chunk_size'])
+        elif getattr(settings, 'ROLLUP_UPDATE_ON_SAVE', True):
+            raise CommandError(
+                "Rollups are already updated on save; a delta run would count those rows twice. "
+                "Use --rebuild to recount from scratch."
+            )
+        else:
+            results = update_rollups(options['chunk_size'])
+
+        for source, processed in results.items():
+            self.stdout.write(f"{source}: {processed} rows")
+        self.stdout.write(self.style.SUCCESS("Rollups updated."))
@@ -0,0 +1,266 @@
+"""
+Process-local counters and request histograms for operational metrics.
+
+Each worker keeps its own counts; they are cheap to bump on the request path
+and are read by the staff metrics endpoints.
+
+RequestMetricsMiddleware (accounts/middleware.py) files every request under
+its URL name into fixed-bucket histograms of wall time, database time, query
+count and SMTP time, and counts it per status code. Queries are timed by an
+execute wrapper installed on every database connection and mail by
+accounts.mail.EmailBackend; both add to the current request's RequestStats
+through a context variable, which follows the request into sync_to_async
+threads.
+
+`/metrics` serves all of it in the Prometheus text format. Every
+METRICS_SYNC_SECONDS a daemon thread in each worker publishes its numbers to
+a slot of its own in the shared cache, busy or idle, and `/metrics` lists
+every live slot as series labelled with the `worker`, rather than a sum that
+would drop when one of them stops publishing. Scrapers authenticate with
+METRICS_TOKEN; without one configured, only logged-in staff can read it.
+"""
+import bisect
+import contextvars
+import logging
+import os
+import socket
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+
+logger = logging.getLogger(__name__)
+
+_counters = Counter()
+_lock = threading.Lock()
+
+
+def increment(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def counters(prefix=''):
+    with _lock:
+        return {name: value for name, value in _counters.items() if name.startswith(prefix)}
+
+
+def reset_counters():
+    with _lock:
+        _counters.clear()
+
+
+# Bucket upper bounds; every histogram also has a +Inf bucket.
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# In the order observe_request passes the values.
+REQUEST_HISTOGRAMS = {
+    'http_request_duration_seconds': ('Wall time of the request.', SECONDS_BUCKETS),
+    'http_request_db_seconds': ('Time spent running database queries.', SECONDS_BUCKETS),
+    'http_request_db_queries': ('Database queries run.', QUERY_BUCKETS),
+    'http_request_smtp_seconds': ('Time spent sending mail over SMTP.', SECONDS_BUCKETS),
+}
+
+_histograms = {}  # (metric, route) -> [count per bucket..., +Inf count, sum]
+_requests = Counter()  # (route, status) -> requests
+
+
+class RequestStats:
+    __slots__ = ('db_seconds', 'queries', 'smtp_seconds')
+
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.smtp_seconds = 0.0
+
+
+current_request = contextvars.ContextVar('request_stats', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper charging each query to the current request, if any."""
+    stats = current_request.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_seconds += time.perf_counter() - started
+        stats.queries += 1
+
+
+def install_query_wrapper(connection, **kwargs):
+    # connection_created fires on every reconnect of the same wrapper.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def observe_request(route, status, seconds, stats):
+    values = (seconds, stats.db_seconds, stats.queries, stats.smtp_seconds)
+    with _lock:
+        for (metric, (_, buckets)), value in zip(REQUEST_HISTOGRAMS.items(), values):
+            histogram = _histograms.get((metric, route))
+            if histogram is None:
+                histogram = _histograms[metric, route] = [0] * (len(buckets) + 1) + [0.0]
+            histogram[bisect.bisect_left(buckets, value)] += 1
+            histogram[-1] += value
+        _requests[route, status] += 1
+
+
+def snapshot():
+    with _lock:
+        return {
+            'histograms': {key: list(histogram) for key, histogram in _histograms.items()},
+            'requests': dict(_requests),
+            'counters': dict(_counters),
+        }
+
+
+class MetricsPublisher:
+    """
+    Keeps this worker's snapshot in a numbered slot of the shared cache. Slots
+    are taken with cache.add, so no two live workers share one, and a slot
+    whose worker stopped refreshing it expires and is reused.
+    """
+    SLOTS_KEY = 'metrics:slots'
+
+    def __init__(self):
+        # Named on first publish, in the worker process rather than a preloading parent.
+        self.worker = None
+        self.slot = None
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _sync_seconds(self):
+        return getattr(settings, 'METRICS_SYNC_SECONDS', 10)
+
+    def _ttl(self):
+        return self._sync_seconds() * 6
+
+    @staticmethod
+    def _slot_key(slot):
+        return f'metrics:slot:{slot}'
+
+    def _claim_slot(self, entry):
+        cache.add(self.SLOTS_KEY, 0, None)
+        for slot in range(1, (cache.get(self.SLOTS_KEY) or 0) + 1):
+            if cache.add(self._slot_key(slot), entry, self._ttl()):
+                return slot
+        while True:
+            try:
+                slot = cache.incr(self.SLOTS_KEY)
+            except ValueError:
+                # The counter was evicted; held slots are skipped by the add below.
+                cache.add(self.SLOTS_KEY, 0, None)
+                continue
+            if cache.add(self._slot_key(slot), entry, self._ttl()):
+                return slot
+
+    def publish(self):
+        with self._lock:
+            if self.worker is None:
+                self.worker = f'{socket.gethostname()}:{os.getpid()}'
+            entry = {'worker': self.worker, 'snapshot': snapshot()}
+            if self.slot is not None:
+                # Restores the slot count if it was evicted, so collect() still reaches us.
+                cache.add(self.SLOTS_KEY, self.slot, None)
+                key = self._slot_key(self.slot)
+                held = cache.get(key)
+                if held is None:
+                    # Expired while this worker stalled; keep it unless another took it.
+                    if cache.add(key, entry, self._ttl()):
+                        return
+                elif held['worker'] == self.worker:
+                    cache.set(key, entry, self._ttl())
+                    return
+            self.slot = self._claim_slot(entry)
+
+    def start(self):
+        """Publish from a daemon thread from now on; cheap to call on every request."""
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='metrics-publisher', daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self.publish()
+            except Exception:
+                logger.exception("Publishing metrics failed")
+            time.sleep(self._sync_seconds())
+
+    def collect(self):
+        """{worker: snapshot} for every worker holding a slot, this one up to date."""
+        self.publish()
+        slots = cache.get(self.SLOTS_KEY) or 0
+        entries = cache.get_many([self._slot_key(slot) for slot in range(1, slots + 1)])
+        return {entry['worker']: entry['snapshot'] for entry in entries.values()}
+
+
+publisher = MetricsPublisher()
+
+
+def _label(value):
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def prometheus_text(workers):
+    """Every worker's series, labelled with the worker that produced them."""
+    lines = []
+    by_metric = {}
+    for worker, published in sorted(workers.items()):
+        for (metric, route), histogram in sorted(published['histograms'].items()):
+            by_metric.setdefault(metric, []).append((f'route="{_label(route)}",worker="{_label(worker)}"', histogram))
+    for metric, (help_text, buckets) in REQUEST_HISTOGRAMS.items():
+        lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} histogram']
+        for labels, histogram in by_metric.get(metric, ()):
+            cumulative = 0
+            for bound, count in zip((*buckets, '+Inf'), histogram):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{{labels},le="{_number(bound)}"}} {cumulative}')
+            lines.append(f'{metric}_sum{{{labels}}} {_number(histogram[-1])}')
+            lines.append(f'{metric}_count{{{labels}}} {cumulative}')
+
+    lines += ['# HELP http_requests_total Requests answered, by URL name and status.', '# TYPE http_requests_total counter']
+    for worker, published in sorted(workers.items()):
+        for (route, status), count in sorted(published['requests'].items()):
+            lines.append(f'http_requests_total{{route="{_label(route)}",status="{status}",worker="{_label(worker)}"}} {count}')
+
+    lines += ['# HELP traveling_events_total Application counters (see metrics.increment).', '# TYPE traveling_events_total counter']
+    for worker, published in sorted(workers.items()):
+        for name, count in sorted(published['counters'].items()):
+            lines.append(f'traveling_events_total{{name="{_label(name)}",worker="{_label(worker)}"}} {count}')
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    GET /metrics for Prometheus with `Authorization: Bearer <METRICS_TOKEN>`.
+    With no token configured it is staff-only, and a 404 for everyone else.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', None)
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponse(status=401, headers={'WWW-Authenticate': 'Bearer realm="metrics"'})
+    else:
+        # The API-only settings have no session middleware, so no request.user.
+        user = getattr(request, 'user', None)
+        if user is None or not (user.is_active and user.is_staff):
+            return HttpResponse(status=404)
+    return HttpResponse(
+        prometheus_text(publisher.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -0,0 +1,146 @@
+"""
+Project middleware.
+
+WhiteNoiseMiddleware is WhiteNoise's, made async-capable. Django runs a
+sync-only middleware on its single sync thread under ASGI, and the views
+beneath it with it, so one sync middleware is enough to serialize every
+request. Here only static files are served from a thread.
+
+APIRouteMiddleware sends token-authenticated calls to the API straight to
+their view, past every middleware listed after it (see its docstring).
+
+RequestMetricsMiddleware times every request for /metrics (see metrics.py).
+"""
+import time
+
+from asgiref.sync import async_to_sync, iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.urls import get_resolver
+from whitenoise import middleware as whitenoise
+
+from . import metrics
+
+
+class WhiteNoiseMiddleware(whitenoise.WhiteNoiseMiddleware):
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # Only touches the disk for paths under the static prefix.
+            static_file = self.find_file(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve, thread_sensitive=False)(static_file, request)
+        return await self.get_response(request)
+
+
+class APIRouteMiddleware:
+    """
+    Calls to API_ROUTE_PREFIXES without a session cookie are resolved and
+    handed to their view here, so the middleware below this one (static files,
+    sessions, CSRF, the session user, messages, X-Frame-Options) never runs
+    for them; token clients need none of it and DRF views are CSRF-exempt.
+    Everything else, including the admin and browser sessions on API routes,
+    goes down the full chain. Middleware above this one applies to both.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(settings.API_ROUTE_PREFIXES)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _route(self, request):
+        """The view for a slim-chain request, or None to take the full chain."""
+        if not request.path_info.startswith(self.prefixes) or settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return None
+        match = get_resolver().resolve(request.path_info)
+        request.resolver_match = match
+        return match
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        match = self._route(request)
+        if match is None:
+            return self.get_response(request)
+        callback = match.func
+        if iscoroutinefunction(callback):
+            callback = async_to_sync(callback)
+        return self._rendered(callback(request, *match.args, **match.kwargs))
+
+    async def __acall__(self, request):
+        match = self._route(request)
+        if match is None:
+            return await self.get_response(request)
+        callback = match.func
+        if not iscoroutinefunction(callback):
+            callback = sync_to_async(callback, thread_sensitive=True)
+        # Rendering DRF's Response is only encoding, so it stays on the event loop.
+        return self._rendered(await callback(request, *match.args, **match.kwargs))
+
+    @staticmethod
+    def _rendered(response):
+        # As the handler does for DRF's Response and other template responses.
+        if hasattr(response, 'render') and callable(response.render):
+            response = response.render()
+        return response
+
+
+class RequestMetricsMiddleware:
+    """
+    Records each request under its URL name; first in MIDDLEWARE, so the wall
+    time covers the whole chain.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @staticmethod
+    def _observe(request, response, started, stats):
+        match = getattr(request, 'resolver_match', None)
+        route = match.view_name if match is not None else 'unmatched'
+        metrics.observe_request(route, response.status_code, time.perf_counter() - started, stats)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        self._observe(request, response, started, stats)
+        metrics.publisher.start()
+        return response
+
+    async def __acall__(self, request):
+        stats = metrics.RequestStats()
+        token = metrics.current_request.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            metrics.current_request.reset(token)
+        self._observe(request, response, started, stats)
+        metrics.publisher.start()
+        return response
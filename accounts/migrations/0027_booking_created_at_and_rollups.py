@@ -0,0 +1,85 @@
+# Generated by Django 4.2.1 on 2026-10-19 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0026_multicityflight_multicityflightleg'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyBookingStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('booking_type', models.CharField(max_length=30)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Booking Stat',
+                'verbose_name_plural': 'Daily Booking Stats',
+                'ordering': ['-day', 'booking_type'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyRouteStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('booking_type', models.CharField(max_length=30)),
+                ('origin', models.CharField(blank=True, default='', max_length=255)),
+                ('destination', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Route Stat',
+                'verbose_name_plural': 'Daily Route Stats',
+                'ordering': ['-day', '-count'],
+            },
+        ),
+        migrations.CreateModel(
+            name='RollupCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=50, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='cruise',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='holidaypackage',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='hotel',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='rentalcar',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyroutestat',
+            constraint=models.UniqueConstraint(fields=('day', 'booking_type', 'origin', 'destination'), name='unique_daily_route_stat'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailybookingstat',
+            constraint=models.UniqueConstraint(fields=('day', 'booking_type'), name='unique_daily_booking_stat'),
+        ),
+    ]
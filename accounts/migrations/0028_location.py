@@ -0,0 +1,89 @@
+# Generated by Django 4.2.1 on 2026-10-19 18:19
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0027_booking_created_at_and_rollups'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='dailyroutestat',
+            name='unique_daily_route_stat',
+        ),
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('key', models.CharField(max_length=255, unique=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='cruise',
+            name='from_location_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddField(
+            model_name='cruise',
+            name='to_location_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddField(
+            model_name='dailyroutestat',
+            name='destination_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddField(
+            model_name='dailyroutestat',
+            name='origin_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='from_location_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddField(
+            model_name='flight',
+            name='to_location_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddField(
+            model_name='holidaypackage',
+            name='from_location_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddField(
+            model_name='holidaypackage',
+            name='to_location_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddField(
+            model_name='hotel',
+            name='place_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddField(
+            model_name='multicityflightleg',
+            name='from_location_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddField(
+            model_name='multicityflightleg',
+            name='to_location_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddField(
+            model_name='rentalcar',
+            name='location_ref',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+    ]
@@ -0,0 +1,113 @@
+from django.db import migrations, transaction
+from django.db.models import Count, Min, Sum
+
+
+CHUNK_SIZE = 5000
+
+LOCATION_FIELDS = {
+    'hotel': ['place'],
+    'flight': ['from_location', 'to_location'],
+    'rentalcar': ['location'],
+    'holidaypackage': ['from_location', 'to_location'],
+    'cruise': ['from_location', 'to_location'],
+    'multicityflightleg': ['from_location', 'to_location'],
+    'dailyroutestat': ['origin', 'destination'],
+}
+# The only location that stays optional; other empty ones get UNKNOWN_LOCATION.
+NULLABLE_FIELDS = {('dailyroutestat', 'origin')}
+UNKNOWN_LOCATION = 'Unknown'
+
+
+def normalize(name):
+    return ' '.join(str(name or '').split()).casefold()
+
+
+def backfill_locations(apps, schema_editor):
+    Location = apps.get_model('accounts', 'Location')
+    interned = dict(Location.objects.values_list('key', 'id'))
+
+    def intern(names):
+        missing = {}
+        for name in names:
+            key = normalize(name)
+            if key not in interned and key not in missing:
+                missing[key] = Location(key=key, name=' '.join(str(name).split()))
+        if missing:
+            Location.objects.bulk_create(missing.values(), ignore_conflicts=True)
+            interned.update(Location.objects.filter(key__in=missing).values_list('key', 'id'))
+
+    def unknown_id():
+        intern([UNKNOWN_LOCATION])
+        return interned[normalize(UNKNOWN_LOCATION)]
+
+    # A route stat without a destination counts nothing (rollups never write one).
+    DailyRouteStat = apps.get_model('accounts', 'DailyRouteStat')
+    DailyRouteStat.objects.filter(destination__regex=r'^\s*$').delete()
+
+    for model_name, fields in LOCATION_FIELDS.items():
+        model = apps.get_model('accounts', model_name)
+        last_id = 0
+        while True:
+            # One transaction per chunk keeps write locks short on large tables.
+            with transaction.atomic():
+                rows = list(model.objects.filter(pk__gt=last_id).order_by('pk')[:CHUNK_SIZE])
+                if not rows:
+                    break
+                intern(getattr(row, field) for row in rows for field in fields if normalize(getattr(row, field)))
+                for row in rows:
+                    for field in fields:
+                        value = getattr(row, field)
+                        if normalize(value):
+                            ref_id = interned[normalize(value)]
+                        else:
+                            ref_id = None if (model_name, field) in NULLABLE_FIELDS else unknown_id()
+                        setattr(row, f'{field}_ref_id', ref_id)
+                model.objects.bulk_update(rows, [f'{field}_ref' for field in fields])
+                last_id = rows[-1].pk
+
+    merge_route_stats(DailyRouteStat)
+
+
+def merge_route_stats(DailyRouteStat):
+    """
+    Fold route stats whose spellings now share a Location ("Goa" and "goa ")
+    into one row per day, type and route, so 0030's unique constraints hold.
+    DailyBookingStat has no location in its key and needs nothing.
+    """
+    groups = (
+        DailyRouteStat.objects.values('day', 'booking_type', 'origin_ref', 'destination_ref')
+        .annotate(rows=Count('id'), total=Sum('count'), keep=Min('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    for group in list(groups):
+        with transaction.atomic():
+            DailyRouteStat.objects.filter(pk=group['keep']).update(count=group['total'])
+            DailyRouteStat.objects.filter(
+                day=group['day'], booking_type=group['booking_type'],
+                origin_ref=group['origin_ref'], destination_ref=group['destination_ref'],
+            ).exclude(pk=group['keep']).delete()
+
+
+def restore_location_names(apps, schema_editor):
+    Location = apps.get_model('accounts', 'Location')
+    names = dict(Location.objects.values_list('id', 'name'))
+    for model_name, fields in LOCATION_FIELDS.items():
+        model = apps.get_model('accounts', model_name)
+        for row in model.objects.iterator(chunk_size=CHUNK_SIZE):
+            for field in fields:
+                ref_id = getattr(row, f'{field}_ref_id')
+                setattr(row, field, names.get(ref_id, ''))
+            row.save(update_fields=fields)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('accounts', '0028_location'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_locations, restore_location_names),
+    ]
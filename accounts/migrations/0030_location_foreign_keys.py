@@ -0,0 +1,248 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0029_backfill_locations'),
+    ]
+
+    operations = [
+        # State only: gives the text columns a default so unapplying this migration can re-add them.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='hotel',
+                    name='place',
+                    field=models.CharField(default='', max_length=255),
+                ),
+                migrations.AlterField(
+                    model_name='flight',
+                    name='from_location',
+                    field=models.CharField(default='', max_length=255),
+                ),
+                migrations.AlterField(
+                    model_name='flight',
+                    name='to_location',
+                    field=models.CharField(default='', max_length=255),
+                ),
+                migrations.AlterField(
+                    model_name='rentalcar',
+                    name='location',
+                    field=models.CharField(default='', max_length=255),
+                ),
+                migrations.AlterField(
+                    model_name='holidaypackage',
+                    name='to_location',
+                    field=models.CharField(default='', max_length=255),
+                ),
+                migrations.AlterField(
+                    model_name='holidaypackage',
+                    name='from_location',
+                    field=models.CharField(default='', max_length=255),
+                ),
+                migrations.AlterField(
+                    model_name='cruise',
+                    name='to_location',
+                    field=models.CharField(default='', max_length=255),
+                ),
+                migrations.AlterField(
+                    model_name='cruise',
+                    name='from_location',
+                    field=models.CharField(default='', max_length=255),
+                ),
+                migrations.AlterField(
+                    model_name='multicityflightleg',
+                    name='from_location',
+                    field=models.CharField(default='', max_length=255),
+                ),
+                migrations.AlterField(
+                    model_name='multicityflightleg',
+                    name='to_location',
+                    field=models.CharField(default='', max_length=255),
+                ),
+                migrations.AlterField(
+                    model_name='dailyroutestat',
+                    name='destination',
+                    field=models.CharField(default='', max_length=255),
+                ),
+            ],
+        ),
+        migrations.RemoveField(
+            model_name='hotel',
+            name='place',
+        ),
+        migrations.RemoveField(
+            model_name='flight',
+            name='from_location',
+        ),
+        migrations.RemoveField(
+            model_name='flight',
+            name='to_location',
+        ),
+        migrations.RemoveField(
+            model_name='rentalcar',
+            name='location',
+        ),
+        migrations.RemoveField(
+            model_name='holidaypackage',
+            name='to_location',
+        ),
+        migrations.RemoveField(
+            model_name='holidaypackage',
+            name='from_location',
+        ),
+        migrations.RemoveField(
+            model_name='cruise',
+            name='to_location',
+        ),
+        migrations.RemoveField(
+            model_name='cruise',
+            name='from_location',
+        ),
+        migrations.RemoveField(
+            model_name='multicityflightleg',
+            name='from_location',
+        ),
+        migrations.RemoveField(
+            model_name='multicityflightleg',
+            name='to_location',
+        ),
+        migrations.RemoveField(
+            model_name='dailyroutestat',
+            name='origin',
+        ),
+        migrations.RemoveField(
+            model_name='dailyroutestat',
+            name='destination',
+        ),
+        migrations.RenameField(
+            model_name='hotel',
+            old_name='place_ref',
+            new_name='place',
+        ),
+        migrations.RenameField(
+            model_name='flight',
+            old_name='from_location_ref',
+            new_name='from_location',
+        ),
+        migrations.RenameField(
+            model_name='flight',
+            old_name='to_location_ref',
+            new_name='to_location',
+        ),
+        migrations.RenameField(
+            model_name='rentalcar',
+            old_name='location_ref',
+            new_name='location',
+        ),
+        migrations.RenameField(
+            model_name='holidaypackage',
+            old_name='to_location_ref',
+            new_name='to_location',
+        ),
+        migrations.RenameField(
+            model_name='holidaypackage',
+            old_name='from_location_ref',
+            new_name='from_location',
+        ),
+        migrations.RenameField(
+            model_name='cruise',
+            old_name='to_location_ref',
+            new_name='to_location',
+        ),
+        migrations.RenameField(
+            model_name='cruise',
+            old_name='from_location_ref',
+            new_name='from_location',
+        ),
+        migrations.RenameField(
+            model_name='multicityflightleg',
+            old_name='from_location_ref',
+            new_name='from_location',
+        ),
+        migrations.RenameField(
+            model_name='multicityflightleg',
+            old_name='to_location_ref',
+            new_name='to_location',
+        ),
+        migrations.RenameField(
+            model_name='dailyroutestat',
+            old_name='origin_ref',
+            new_name='origin',
+        ),
+        migrations.RenameField(
+            model_name='dailyroutestat',
+            old_name='destination_ref',
+            new_name='destination',
+        ),
+        migrations.AlterField(
+            model_name='hotel',
+            name='place',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AlterField(
+            model_name='flight',
+            name='from_location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AlterField(
+            model_name='flight',
+            name='to_location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AlterField(
+            model_name='rentalcar',
+            name='location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AlterField(
+            model_name='holidaypackage',
+            name='to_location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AlterField(
+            model_name='holidaypackage',
+            name='from_location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AlterField(
+            model_name='cruise',
+            name='to_location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AlterField(
+            model_name='cruise',
+            name='from_location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AlterField(
+            model_name='multicityflightleg',
+            name='from_location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AlterField(
+            model_name='multicityflightleg',
+            name='to_location',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AlterField(
+            model_name='dailyroutestat',
+            name='origin',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AlterField(
+            model_name='dailyroutestat',
+            name='destination',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyroutestat',
+            constraint=models.UniqueConstraint(fields=('day', 'booking_type', 'origin', 'destination'), name='unique_daily_route_stat'),
+        ),
+        migrations.AddConstraint(
+            model_name='dailyroutestat',
+            constraint=models.UniqueConstraint(condition=models.Q(('origin__isnull', True)), fields=('day', 'booking_type', 'destination'), name='unique_daily_destination_stat'),
+        ),
+    ]
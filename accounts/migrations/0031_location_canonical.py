@@ -0,0 +1,19 @@
+# Generated by Django 4.2.1 on 2026-10-19 18:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0030_location_foreign_keys'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='location',
+            name='canonical',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='aliases', to='accounts.location'),
+        ),
+    ]
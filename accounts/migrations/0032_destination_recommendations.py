@@ -0,0 +1,46 @@
+# Generated by Django 4.2.1 on 2026-10-19 18:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0031_location_canonical'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserDestination',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('first_searched_at', models.DateTimeField(auto_now_add=True)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DestinationPair',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='accounts.location')),
+            ],
+            options={
+                'verbose_name': 'Destination Pair',
+                'verbose_name_plural': 'Destination Pairs',
+                'ordering': ['location', '-count'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='userdestination',
+            constraint=models.UniqueConstraint(fields=('user', 'location'), name='unique_user_destination'),
+        ),
+        migrations.AddConstraint(
+            model_name='destinationpair',
+            constraint=models.UniqueConstraint(fields=('location', 'related'), name='unique_destination_pair'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2.1 on 2026-10-19 18:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0032_destination_recommendations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchWatch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('flight', 'Flight'), ('hotel', 'Hotel')], max_length=20)),
+                ('search_id', models.PositiveIntegerField()),
+                ('query', models.JSONField()),
+                ('query_key', models.CharField(db_index=True, max_length=100)),
+                ('travel_date', models.DateField(blank=True, null=True)),
+                ('next_run_at', models.DateTimeField()),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_digest', models.CharField(blank=True, max_length=64)),
+                ('last_cheapest', models.FloatField(blank=True, null=True)),
+                ('active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_watches', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Search Watch',
+                'verbose_name_plural': 'Search Watches',
+            },
+        ),
+        migrations.CreateModel(
+            name='SearchNotification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('summary', models.JSONField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('watch', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to='accounts.searchwatch')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='searchwatch',
+            constraint=models.UniqueConstraint(fields=('kind', 'search_id'), name='unique_search_watch'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+from collections import Counter
+
+from django.db import migrations
+from django.db.models import Count, Max
+from django.db.models.functions import TruncDate
+
+
+# Mirrors accounts.rollups.ROLLUP_SOURCES, by model name:
+# (booking_type, model, day_field, origin_field, destination_field, counts_bookings)
+ROLLUP_SOURCES = [
+    ('hotel', 'hotel', 'created_at', None, 'place', True),
+    ('flight', 'flight', 'created_at', 'from_location', 'to_location', True),
+    ('rental_car', 'rentalcar', 'created_at', None, 'location', True),
+    ('holiday_package', 'holidaypackage', 'created_at', 'from_location', 'to_location', True),
+    ('cruise', 'cruise', 'created_at', 'from_location', 'to_location', True),
+    ('multi_city_flight', 'multicityflight', 'created_at', None, None, True),
+    ('multi_city_flight', 'multicityflightleg', 'multi_city_flight__created_at', 'from_location', 'to_location', False),
+]
+
+
+def backfill_rollups(apps, schema_editor):
+    """
+    Count every existing booking into the daily stats, the same way
+    `update_rollups --rebuild` does, but with one grouped query per source.
+    Rows without created_at are skipped, as rollups._count_row does.
+    """
+    DailyBookingStat = apps.get_model('accounts', 'DailyBookingStat')
+    DailyRouteStat = apps.get_model('accounts', 'DailyRouteStat')
+    RollupCursor = apps.get_model('accounts', 'RollupCursor')
+    DailyBookingStat.objects.all().delete()
+    DailyRouteStat.objects.all().delete()
+    RollupCursor.objects.all().delete()
+
+    booking_counts, route_counts = Counter(), Counter()
+    for booking_type, model_name, day_field, origin_field, destination_field, counts_bookings in ROLLUP_SOURCES:
+        model = apps.get_model('accounts', model_name)
+        rows = model.objects.filter(**{f'{day_field}__isnull': False}).annotate(rollup_day=TruncDate(day_field)).order_by()
+        if counts_bookings:
+            for day, count in rows.values_list('rollup_day').annotate(total=Count('pk')):
+                booking_counts[day, booking_type] += count
+        if destination_field:
+            columns = ['rollup_day', destination_field] + ([origin_field] if origin_field else [])
+            grouped = rows.filter(**{f'{destination_field}__isnull': False}).values(*columns).annotate(total=Count('pk'))
+            for row in grouped:
+                key = (row['rollup_day'], booking_type, row.get(origin_field), row[destination_field])
+                route_counts[key] += row['total']
+
+        last_id = model.objects.aggregate(last_id=Max('pk'))['last_id']
+        RollupCursor.objects.create(source=model_name, last_id=last_id or 0)
+
+    DailyBookingStat.objects.bulk_create(
+        [DailyBookingStat(day=day, booking_type=booking_type, count=count)
+         for (day, booking_type), count in booking_counts.items()],
+        batch_size=1000,
+    )
+    DailyRouteStat.objects.bulk_create(
+        [DailyRouteStat(day=day, booking_type=booking_type, origin_id=origin_id, destination_id=destination_id, count=count)
+         for (day, booking_type, origin_id, destination_id), count in route_counts.items()],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0034_user_profile_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+from collections import Counter
+from itertools import permutations
+
+from django.db import migrations
+
+
+# Mirrors accounts.recommendations.RECOMMENDATION_SOURCES, by model name:
+# (model, user path, destination field)
+RECOMMENDATION_SOURCES = [
+    ('hotel', 'user_id', 'place_id'),
+    ('flight', 'user_id', 'to_location_id'),
+    ('holidaypackage', 'user_id', 'to_location_id'),
+    ('cruise', 'user_id', 'to_location_id'),
+    ('multicityflightleg', 'multi_city_flight__user_id', 'to_location_id'),
+]
+
+
+def backfill_recommendations(apps, schema_editor):
+    """
+    Count the searches made before the co-occurrence tables existed, the same
+    way `rebuild_recommendations` does; signals only see rows saved since.
+    """
+    UserDestination = apps.get_model('accounts', 'UserDestination')
+    DestinationPair = apps.get_model('accounts', 'DestinationPair')
+
+    destinations = {}
+    for model_name, user_path, field in RECOMMENDATION_SOURCES:
+        model = apps.get_model('accounts', model_name)
+        rows = model.objects.filter(**{f'{user_path}__isnull': False}).values_list(user_path, field).distinct()
+        for user_id, location_id in rows.iterator(chunk_size=5000):
+            destinations.setdefault(user_id, set()).add(location_id)
+
+    pairs = Counter()
+    for locations in destinations.values():
+        pairs.update(permutations(locations, 2))
+
+    DestinationPair.objects.all().delete()
+    UserDestination.objects.all().delete()
+    UserDestination.objects.bulk_create(
+        (UserDestination(user_id=user_id, location_id=location_id)
+         for user_id, locations in destinations.items() for location_id in locations),
+        batch_size=5000,
+    )
+    DestinationPair.objects.bulk_create(
+        (DestinationPair(location_id=a, related_id=b, count=count) for (a, b), count in pairs.items()),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0035_backfill_rollups'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_recommendations, migrations.RunPython.noop),
+    ]
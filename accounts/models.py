@@ -30,13 +30,34 @@ class User(AbstractUser):   #customer table in db
     is_onboarding_completed = models.BooleanField(default=False)
     is_auth_required = models.BooleanField(default=True)
     is_email_verified = models.BooleanField(default=False)
+    # Bumped whenever a PROFILE_FIELDS value changes; the ETag of /me/ (see profiles.py).
+    profile_version = models.PositiveIntegerField(default=1, editable=False)
 
 
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = []
+    PROFILE_FIELDS = ('first_name', 'last_name', 'phone_number', 'address', 'email')
 
     objects = UserManager()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_profile = {
+            name: value for name, value in zip(field_names, values) if name in cls.PROFILE_FIELDS
+        }
+        return instance
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_profile', None)
+        update_fields = kwargs.get('update_fields')
+        if loaded is not None and any(getattr(self, name) != value for name, value in loaded.items()):
+            self.profile_version += 1
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'profile_version'}
+        super().save(*args, **kwargs)
+        self._loaded_profile = {name: getattr(self, name) for name in self.PROFILE_FIELDS}
+
     def __str__(self):
         if self.is_superuser:
             return "admin:apparatus"
@@ -70,10 +91,24 @@ class OTPLog(models.Model):
         ordering = ['-timestamp']
 
 
+#locations shared by all bookings (see locations.py)
+class Location(models.Model):
+    name = models.CharField(max_length=255)
+    key = models.CharField(max_length=255, unique=True)
+    # Set when this spelling was merged into another location (see resolver.py).
+    canonical = models.ForeignKey('self', on_delete=models.SET_NULL, related_name='aliases', null=True, blank=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+
 #hotel table in db
 class Hotel(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='hotels', null=True, blank=True)
-    place = models.CharField(max_length=255)
+    place = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
     checkin_date = models.DateField(null=True, blank=True)
     checkout_date = models.DateField(null=True, blank=True)
     adults = models.IntegerField(default=0)
@@ -82,6 +117,7 @@ class Hotel(models.Model):
     customer_name = models.CharField(max_length=255, blank=True, null=True)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     coupon = models.CharField(max_length=50, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
 
     def save(self, *args, **kwargs):
         if not self.pk and self.user:
@@ -115,8 +151,8 @@ class Flight(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='flights', null=True, blank=True)
     round_trip = models.BooleanField(default=False)
     one_way = models.BooleanField(default=True)
-    from_location = models.CharField(max_length=255)
-    to_location = models.CharField(max_length=255)
+    from_location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
+    to_location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
     departure_date = models.DateField(null=True, blank=True)
     return_date = models.DateField(null=True, blank=True)
     adults = models.IntegerField(default=0)
@@ -124,6 +160,7 @@ class Flight(models.Model):
     customer_name = models.CharField(max_length=255, blank=True, null=True)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     coupon = models.CharField(max_length=50, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
 
     def save(self, *args, **kwargs):
         if not self.pk and self.user:
@@ -156,12 +193,13 @@ class Flight(models.Model):
 
 class RentalCar(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='rental_cars', null=True, blank=True)
-    location = models.CharField(max_length=255)
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
     pickup_time = models.DateTimeField(null=True, blank=True)
     dropoff_time = models.DateTimeField(null=True, blank=True)
     customer_name = models.CharField(max_length=255, blank=True, null=True)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     coupon = models.CharField(max_length=50, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
 
     def save(self, *args, **kwargs):
         if not self.pk and self.user:
@@ -192,14 +230,15 @@ class RentalCar(models.Model):
 #Holiday Packages table in db    
 class HolidayPackage(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='holiday_packages', null=True, blank=True)
-    to_location = models.CharField(max_length=255)
-    from_location = models.CharField(max_length=255)
+    to_location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
+    from_location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
     duration = models.IntegerField()
     adults = models.IntegerField(default=0)
     children = models.IntegerField(default=0)
     customer_name = models.CharField(max_length=255, blank=True, null=True)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     coupon = models.CharField(max_length=50, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
 
     def save(self, *args, **kwargs):
         if not self.pk and self.user:
@@ -229,8 +268,8 @@ class HolidayPackage(models.Model):
 #CRUISES
 class Cruise(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cruises', null=True, blank=True)
-    to_location = models.CharField(max_length=255)
-    from_location = models.CharField(max_length=255)
+    to_location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
+    from_location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
     duration = models.IntegerField()
     cabins = models.CharField(max_length=255)
     adults = models.IntegerField(default=0)
@@ -238,6 +277,7 @@ class Cruise(models.Model):
     customer_name = models.CharField(max_length=255, blank=True, null=True)
     phone_number = models.CharField(max_length=15, blank=True, null=True)
     coupon = models.CharField(max_length=50, blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
 
     def save(self, *args, **kwargs):
         if not self.pk and self.user:
@@ -290,9 +330,128 @@ class MultiCityFlight(models.Model):
 
 class MultiCityFlightLeg(models.Model):
     multi_city_flight = models.ForeignKey(MultiCityFlight, on_delete=models.CASCADE, related_name='legs')
-    from_location = models.CharField(max_length=255)
-    to_location = models.CharField(max_length=255)
+    from_location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
+    to_location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
     departure_date = models.DateField()
 
     def __str__(self):
         return f"Leg: {self.from_location} to {self.to_location} on {self.departure_date}"
+
+
+# DASHBOARD ROLLUPS
+class DailyBookingStat(models.Model):
+    day = models.DateField()
+    booking_type = models.CharField(max_length=30)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Daily Booking Stat"
+        verbose_name_plural = "Daily Booking Stats"
+        ordering = ['-day', 'booking_type']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'booking_type'], name='unique_daily_booking_stat'),
+        ]
+
+    def __str__(self):
+        return f"{self.booking_type} on {self.day}: {self.count}"
+
+class DailyRouteStat(models.Model):
+    day = models.DateField()
+    booking_type = models.CharField(max_length=30)
+    origin = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+', null=True, blank=True)
+    destination = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Daily Route Stat"
+        verbose_name_plural = "Daily Route Stats"
+        ordering = ['-day', '-count']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'booking_type', 'origin', 'destination'], name='unique_daily_route_stat'),
+            # NULLs never collide in a unique index, so destination-only stats need their own.
+            models.UniqueConstraint(
+                fields=['day', 'booking_type', 'destination'], condition=models.Q(origin__isnull=True),
+                name='unique_daily_destination_stat',
+            ),
+        ]
+
+    def __str__(self):
+        route = f"{self.origin} to {self.destination}" if self.origin else self.destination
+        return f"{self.booking_type} {route} on {self.day}: {self.count}"
+
+class RollupCursor(models.Model):
+    source = models.CharField(max_length=50, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source} rolled up to #{self.last_id}"
+
+
+# RECOMMENDATIONS
+class UserDestination(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
+    first_searched_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'location'], name='unique_user_destination'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} searched {self.location}"
+
+class DestinationPair(models.Model):
+    # Users who searched both locations; every pair is stored in both directions.
+    location = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
+    related = models.ForeignKey(Location, on_delete=models.PROTECT, related_name='+')
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "Destination Pair"
+        verbose_name_plural = "Destination Pairs"
+        ordering = ['location', '-count']
+        constraints = [
+            models.UniqueConstraint(fields=['location', 'related'], name='unique_destination_pair'),
+        ]
+
+    def __str__(self):
+        return f"{self.location} -> {self.related}: {self.count}"
+
+
+# SAVED SEARCH ALERTS
+class SearchWatch(models.Model):
+    KIND_CHOICES = [('flight', 'Flight'), ('hotel', 'Hotel')]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_watches')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    search_id = models.PositiveIntegerField()
+    query = models.JSONField()
+    query_key = models.CharField(max_length=100, db_index=True)
+    travel_date = models.DateField(null=True, blank=True)
+    next_run_at = models.DateTimeField()
+    last_run_at = models.DateTimeField(null=True, blank=True)
+    last_digest = models.CharField(max_length=64, blank=True)
+    last_cheapest = models.FloatField(null=True, blank=True)
+    active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Search Watch"
+        verbose_name_plural = "Search Watches"
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'search_id'], name='unique_search_watch'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} watching {self.kind} #{self.search_id}"
+
+class SearchNotification(models.Model):
+    watch = models.ForeignKey(SearchWatch, on_delete=models.CASCADE, related_name='notifications')
+    summary = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Results changed for {self.watch}"
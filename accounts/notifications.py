@@ -0,0 +1,94 @@
+"""
+Booking confirmation emails to the support inbox.
+
+The sync views send them inline; the async views (async_views.py) hand them
+to a small thread pool so SMTP never holds up the response.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.mail import send_mail
+
+from .models import Hotel, Flight, RentalCar, HolidayPackage, Cruise, MultiCityFlight
+
+
+SUPPORT_INBOX = ['support@cheaptickethub.com']
+SIGNATURE = "Thank you for choosing CheapTicket!"
+
+
+def _hotel(instance):
+    return 'Hotel Search Confirmation', (
+        f"Your hotel search at {instance.place} has been saved.\n"
+        f"Check-in: {instance.checkin_date}\nCheck-out: {instance.checkout_date}"
+    )
+
+
+def _flight(instance):
+    trip_type = "Round Trip" if instance.round_trip else "One Way"
+    return 'Flight Search Confirmation', (
+        f"Your flight search has been saved.\n\nFlight Details:\n{instance.from_location} to {instance.to_location}\n"
+        f"Departure: {instance.departure_date}\nType: {trip_type}"
+    )
+
+
+def _rental_car(instance):
+    return 'Rental Car Search Confirmation', (
+        f"Your rental car search at {instance.location} has been saved.\n"
+        f"Pickup: {instance.pickup_time}\nDrop-off: {instance.dropoff_time}"
+    )
+
+
+def _holiday_package(instance):
+    return 'Holiday Package Search Confirmation', (
+        f"Your holiday package search for {instance.to_location} has been saved.\nDuration: {instance.duration} days"
+    )
+
+
+def _cruise(instance):
+    return 'Cruise Search Confirmation', (
+        f"Your cruise search for {instance.to_location} has been saved.\n"
+        f"Duration: {instance.duration} days\nCabins: {instance.cabins}"
+    )
+
+
+def _multi_city_flight(instance):
+    legs_info = "\n".join(
+        f"- {leg.from_location} to {leg.to_location} on {leg.departure_date}" for leg in instance.legs.all()
+    )
+    return 'Multi-City Flight Search Confirmation', (
+        f"Your multi-city flight search has been saved.\n\nFlight Details:\n{legs_info}"
+    )
+
+
+CONFIRMATIONS = {
+    Hotel: _hotel,
+    Flight: _flight,
+    RentalCar: _rental_car,
+    HolidayPackage: _holiday_package,
+    Cruise: _cruise,
+    MultiCityFlight: _multi_city_flight,
+}
+
+
+def booking_confirmation(instance):
+    """(subject, message) for a saved booking search."""
+    subject, details = CONFIRMATIONS[type(instance)](instance)
+    message = f"Hello {instance.customer_name},\n\n{details}\n\nCoupon Code: {instance.coupon}\n\n{SIGNATURE}"
+    return subject, message
+
+
+def send_booking_confirmation(instance):
+    subject, message = booking_confirmation(instance)
+    try:
+        send_mail(subject, message, settings.EMAIL_HOST_USER, SUPPORT_INBOX, fail_silently=True)
+    except Exception:
+        pass
+
+
+_background = ThreadPoolExecutor(max_workers=4, thread_name_prefix='mail')
+
+
+def send_booking_confirmation_later(instance):
+    """Compose now (the instance may need the caller's context) and send from a pool thread."""
+    subject, message = booking_confirmation(instance)
+    _background.submit(send_mail, subject, message, settings.EMAIL_HOST_USER, SUPPORT_INBOX, fail_silently=True)
@@ -0,0 +1,131 @@
+"""
+The OpenAPI schema, generated once per code version.
+
+SpectacularAPIView introspects every view and serializer each time api/schema/
+is requested, and api/docs/ and api/redoc/ request it on every page load. The
+schema only changes with the code, so `manage.py generate_schema` renders it at
+deploy time into SCHEMA_DIR as openapi-<version>.yaml and .json, where the
+version is CODE_VERSION if the deploy sets one and otherwise a digest of the
+project's source and the versions of the packages that shape the schema.
+
+CachedSchemaView serves those files from memory with an ETag. A process that
+finds no file for its code version (the command was not run after a deploy)
+generates it once itself, so the schema is only rebuilt when the code changes.
+"""
+import functools
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import django
+import drf_spectacular
+import rest_framework
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from drf_spectacular.renderers import OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+from drf_spectacular.utils import extend_schema
+from drf_spectacular.views import SCHEMA_KWARGS, SpectacularAPIView
+
+from .renderers import OpenApiORJSONRenderer
+
+# Packages whose source the schema is generated from.
+SOURCE_PACKAGES = ('accounts', 'traveling')
+FORMATS = ('yaml', 'json')
+
+_lock = threading.Lock()
+_loaded = {}  # code version -> {format: bytes}
+
+
+@functools.cache
+def code_version():
+    configured = getattr(settings, 'CODE_VERSION', None)
+    if configured:
+        return configured
+    digest = hashlib.sha256()
+    for package in (django, rest_framework, drf_spectacular):
+        digest.update(f'{package.__name__}=={package.__version__};'.encode())
+    for package in SOURCE_PACKAGES:
+        for path in sorted(Path(settings.BASE_DIR, package).rglob('*.py')):
+            digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+def schema_path(version, schema_format):
+    return Path(settings.SCHEMA_DIR) / f'openapi-{version}.{schema_format}'
+
+
+def render_schema():
+    schema = spectacular_settings.DEFAULT_GENERATOR_CLASS().get_schema(request=None, public=True)
+    return {
+        'yaml': OpenApiYamlRenderer().render(schema, renderer_context={}),
+        'json': OpenApiORJSONRenderer().render(schema, renderer_context={}),
+    }
+
+
+def write_schema(version, rendered):
+    Path(settings.SCHEMA_DIR).mkdir(parents=True, exist_ok=True)
+    for schema_format, content in rendered.items():
+        path = schema_path(version, schema_format)
+        tmp = path.with_name(f'.{path.name}.{os.getpid()}')
+        tmp.write_bytes(content)
+        os.replace(tmp, path)  # readers never see a half-written file
+
+
+def generate_schema(version=None):
+    version = version or code_version()
+    rendered = render_schema()
+    write_schema(version, rendered)
+    _loaded[version] = rendered
+    return version, rendered
+
+
+def prune_schemas(keep):
+    """Delete all but the `keep` most recently written versions."""
+    paths = sorted(Path(settings.SCHEMA_DIR).glob('openapi-*.*'), key=lambda path: path.stat().st_mtime, reverse=True)
+    versions = list(dict.fromkeys(path.stem.removeprefix('openapi-') for path in paths))
+    stale = set(versions[keep:])
+    for path in paths:
+        if path.stem.removeprefix('openapi-') in stale:
+            path.unlink()
+    return sorted(stale)
+
+
+def load_schema():
+    """(version, {format: bytes}) for the running code, generating it if nobody has."""
+    version = code_version()
+    rendered = _loaded.get(version)
+    if rendered is not None:
+        return version, rendered
+    with _lock:
+        if version not in _loaded:
+            try:
+                _loaded[version] = {fmt: schema_path(version, fmt).read_bytes() for fmt in FORMATS}
+            except FileNotFoundError:
+                generate_schema(version)
+        return version, _loaded[version]
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """SpectacularAPIView answering from the generated files."""
+
+    @extend_schema(**SCHEMA_KWARGS)
+    def get(self, request, *args, **kwargs):
+        version, rendered = load_schema()
+        schema_format = 'json' if request.accepted_renderer.format == 'json' else 'yaml'
+        etag = quote_etag(f'{version}-{schema_format}')
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                rendered[schema_format], content_type=f'{request.accepted_media_type}; charset=utf-8',
+            )
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, max_age=settings.SCHEMA_CACHE_MAX_AGE)
+        patch_vary_headers(response, ['Accept'])
+        return response
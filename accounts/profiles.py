@@ -0,0 +1,50 @@
+"""
+Cached current-user profiles for GET /me/.
+
+Each entry holds the PROFILE_FIELDS of one user and a strong ETag made of the
+user id and User.profile_version, which goes up on every change to those
+fields. Entries are dropped when the user row is saved or deleted (the
+onboarding view, the admin, OTP logins), so on a cache hit the view answers
+a request, or a matching If-None-Match with 304, without touching the users
+table; a miss costs one query.
+With Redis (REDIS_URL, as in production) every worker shares the entries and
+sees each other's deletes. The local-memory fallback keeps them per process:
+right for a single development server, but another worker would go on
+serving its own copy for up to PROFILE_CACHE_TTL.
+Changes made with QuerySet.update() skip the signal and show up after
+PROFILE_CACHE_TTL.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import quote_etag
+
+from .models import User, Customer, AuthUser
+
+
+PROFILE_SOURCES = (User, Customer, AuthUser)
+
+
+def profile_key(user_id):
+    return f'profile:{user_id}'
+
+
+def profile_entry(user_id):
+    """{'etag', 'data'} for an active user, or None."""
+    key = profile_key(user_id)
+    entry = cache.get(key)
+    if entry is None:
+        row = User.objects.filter(pk=user_id, is_active=True).values('profile_version', *User.PROFILE_FIELDS).first()
+        if row is None:
+            return None
+        version = row.pop('profile_version')
+        entry = {'etag': quote_etag(f'{user_id}-{version}'), 'data': row}
+        cache.set(key, entry, getattr(settings, 'PROFILE_CACHE_TTL', 3600))
+    return entry
+
+
+def invalidate_profile(user_id):
+    key = profile_key(user_id)
+    cache.delete(key)
+    # Again after commit, in case a request cached the old row in between.
+    transaction.on_commit(lambda: cache.delete(key))
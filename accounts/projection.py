@@ -0,0 +1,136 @@
+"""
+Sparse fieldsets for API responses.
+
+A client names the parts of the body it reads with `?fields=`, as
+comma-separated dotted paths (`?fields=message,data.coupon`), or sends
+`Prefer: return=minimal` to get the view's `minimal_fields`. Views with
+ProjectionMixin trim successful responses to that shape and can ask the
+projection up front whether a part is wanted at all, so unrequested parts are
+never computed and unrequested columns never loaded (see `project_queryset`).
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from django.utils.cache import patch_vary_headers
+from rest_framework.serializers import ListSerializer
+
+from .representations import readable_fields
+from .serializers import LocationField
+
+
+def parse_fields(paths):
+    """'a,b.c' -> {'a': None, 'b': {'c': None}}, where None keeps the whole value."""
+    tree = {}
+    for path in paths:
+        node = tree
+        parts = [part for part in path.strip().split('.') if part]
+        for depth, part in enumerate(parts):
+            if depth == len(parts) - 1:
+                node[part] = None
+                break
+            if part in node and node[part] is None:
+                break  # an ancestor is already kept whole
+            node = node.setdefault(part, {})
+    return tree
+
+
+class Projection:
+    def __init__(self, tree=None, minimal=False):
+        self.tree = tree
+        self.minimal = minimal
+
+    def _node(self, path):
+        node = self.tree
+        for part in path.split('.'):
+            if node is None:
+                return None, True
+            if part not in node:
+                return None, False
+            node = node[part]
+        return node, True
+
+    def wants(self, path):
+        return self._node(path)[1]
+
+    def asks_for(self, path):
+        """Whether `?fields=` names `path` (or a parent of it) explicitly, for opt-in parts."""
+        return self.tree is not None and not self.minimal and self.wants(path)
+
+    def fields(self, path):
+        """Names wanted directly under `path`, or None for all of them."""
+        node, wanted = self._node(path)
+        if not wanted:
+            return frozenset()
+        return None if node is None else frozenset(node)
+
+    def apply(self, data, tree=...):
+        tree = self.tree if tree is ... else tree
+        if tree is None:
+            return data
+        if isinstance(data, dict):
+            return {key: self.apply(value, tree[key]) for key, value in data.items() if key in tree}
+        if isinstance(data, list):
+            return [self.apply(item, tree) for item in data]
+        return data
+
+
+def projection_for(request, minimal_fields=None):
+    fields = request.query_params.get('fields')
+    if fields:
+        return Projection(parse_fields(fields.split(',')))
+    prefer = request.headers.get('Prefer', '')
+    if minimal_fields is not None and 'return=minimal' in prefer.replace(' ', '').split(','):
+        return Projection(parse_fields(minimal_fields), minimal=True)
+    return Projection()
+
+
+class ProjectionMixin:
+    """Trims successful responses to the projection requested (see module docstring)."""
+
+    # What `Prefer: return=minimal` keeps; None means the view ignores it.
+    minimal_fields = None
+
+    def initial(self, request, *args, **kwargs):
+        self.projection = projection_for(request, self.minimal_fields)
+        super().initial(request, *args, **kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        projection = getattr(self, 'projection', None)
+        if projection is not None and projection.tree is not None and 200 <= response.status_code < 300:
+            response.data = projection.apply(response.data)
+            if projection.minimal:
+                response['Preference-Applied'] = 'return=minimal'
+        if self.minimal_fields is not None:
+            patch_vary_headers(response, ['Prefer'])
+        return response
+
+
+def project_queryset(queryset, serializer_class, names=None, include=()):
+    """
+    Restrict `queryset` to the columns behind the serializer's fields (only
+    those in `names`, if given), joining the locations and prefetching the
+    child rows they read, so representing a row costs no further queries.
+    """
+    model = queryset.model
+    only, joins, prefetches = {model._meta.pk.name, *include}, [], []
+    for field in readable_fields(serializer_class):
+        if names is not None and field.field_name not in names:
+            continue
+        if len(field.source_attrs) != 1:
+            return queryset  # dotted sources: load the row as it is
+        try:
+            model_field = model._meta.get_field(field.source_attrs[0])
+        except FieldDoesNotExist:
+            return queryset  # computed attributes
+        if model_field.one_to_many and isinstance(field, ListSerializer):
+            # The prefetch matches children to parents through their foreign key.
+            children = project_queryset(
+                model_field.related_model.objects.all(), type(field.child), include=[model_field.field.name],
+            )
+            prefetches.append(Prefetch(model_field.get_accessor_name(), queryset=children))
+        elif model_field.many_to_one or model_field.one_to_one:
+            joins.append(model_field.name)
+            only.add(f'{model_field.name}__name' if isinstance(field, LocationField) else model_field.name)
+        else:
+            only.add(model_field.name)
+    return queryset.select_related(*joins).prefetch_related(*prefetches).only(*only)
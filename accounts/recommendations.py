@@ -0,0 +1,128 @@
+"""
+"People who searched X also searched Y".
+
+DestinationPair is a sparse co-occurrence matrix over locations: how many
+users searched both. It is maintained as rows arrive (see signals.py): the
+first time a user searches a destination, UserDestination records it and
+every pair between it and that user's earlier destinations goes up by one, so
+no step ever rereads the full history. Requests are answered from an
+in-memory index holding the top RECOMMENDATION_TOP_K related destinations per
+location, rebuilt in the background.
+"""
+from collections import Counter
+from itertools import permutations
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+
+from .indexing import BackgroundIndex
+from .locations import normalize_location
+from .models import (
+    Hotel, Flight, HolidayPackage, Cruise, MultiCityFlightLeg, UserDestination, DestinationPair,
+)
+from .resolver import resolve_location
+
+
+# Which column holds the destination of each searched product.
+RECOMMENDATION_SOURCES = {
+    Hotel: 'place_id',
+    Flight: 'to_location_id',
+    HolidayPackage: 'to_location_id',
+    Cruise: 'to_location_id',
+    MultiCityFlightLeg: 'to_location_id',
+}
+
+# Paths to the searching user, for the bulk rebuild.
+_USER_PATHS = {MultiCityFlightLeg: 'multi_city_flight__user_id'}
+
+
+def _user_id(instance):
+    if isinstance(instance, MultiCityFlightLeg):
+        return instance.multi_city_flight.user_id
+    return instance.user_id
+
+
+def record_destination(user_id, location_id):
+    """Count a destination the user has not searched before against all the ones they have."""
+    if not user_id or not location_id:
+        return False
+    with transaction.atomic():
+        _, created = UserDestination.objects.get_or_create(user_id=user_id, location_id=location_id)
+        if not created:
+            return False
+        earlier = list(
+            UserDestination.objects.filter(user_id=user_id)
+            .exclude(location_id=location_id)
+            .values_list('location_id', flat=True)
+        )
+        if earlier:
+            # Missing pairs go in at zero first, so one UPDATE counts every pair
+            # and a concurrent insert of the same pair cannot lose an increment.
+            DestinationPair.objects.bulk_create(
+                [DestinationPair(location_id=a, related_id=b, count=0)
+                 for other_id in earlier for a, b in ((location_id, other_id), (other_id, location_id))],
+                ignore_conflicts=True,
+            )
+            DestinationPair.objects.filter(
+                Q(location_id=location_id, related_id__in=earlier) | Q(location_id__in=earlier, related_id=location_id)
+            ).update(count=F('count') + 1)
+    return True
+
+
+def record(instance):
+    field = RECOMMENDATION_SOURCES.get(type(instance))
+    if field is not None:
+        record_destination(_user_id(instance), getattr(instance, field))
+
+
+def rebuild_recommendations(batch_size=5000):
+    """Recount both tables from the full search history, for backfills and repairs."""
+    destinations = {}
+    for model, field in RECOMMENDATION_SOURCES.items():
+        user_path = _USER_PATHS.get(model, 'user_id')
+        rows = model.objects.filter(**{f'{user_path}__isnull': False}).values_list(user_path, field).distinct()
+        for user_id, location_id in rows.iterator(chunk_size=batch_size):
+            destinations.setdefault(user_id, set()).add(location_id)
+
+    pairs = Counter()
+    for locations in destinations.values():
+        pairs.update(permutations(locations, 2))
+
+    with transaction.atomic():
+        DestinationPair.objects.all().delete()
+        UserDestination.objects.all().delete()
+        UserDestination.objects.bulk_create(
+            (UserDestination(user_id=user_id, location_id=location_id)
+             for user_id, locations in destinations.items() for location_id in locations),
+            batch_size=batch_size,
+        )
+        DestinationPair.objects.bulk_create(
+            (DestinationPair(location_id=a, related_id=b, count=count) for (a, b), count in pairs.items()),
+            batch_size=batch_size,
+        )
+    return len(destinations), len(pairs)
+
+
+def build_related_index():
+    """{location key: [{'name', 'count'}, ...]} with each list the top K, best first."""
+    top_k = getattr(settings, 'RECOMMENDATION_TOP_K', 20)
+    rows = (
+        DestinationPair.objects.filter(related__canonical__isnull=True)
+        .order_by('location_id', '-count', 'related__name')
+        .values_list('location__key', 'related__name', 'count')
+    )
+    index = {}
+    for key, name, count in rows.iterator(chunk_size=5000):
+        related = index.setdefault(key, [])
+        if len(related) < top_k:
+            related.append({'name': name, 'count': count})
+    return index
+
+
+related_index = BackgroundIndex('related-destinations', build_related_index, 'RECOMMENDATION_REFRESH_SECONDS')
+
+
+def related_destinations(name, limit=10):
+    key = normalize_location(resolve_location(name))
+    return related_index.get().get(key, [])[:limit]
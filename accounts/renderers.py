@@ -0,0 +1,79 @@
+"""
+JSON rendering through orjson.
+
+orjson encodes dicts, lists, strings, numbers, dates, datetimes and UUIDs in
+C. Anything else it does not know (Decimals, lazy translation strings,
+timedeltas, querysets) is handed to DRF's own JSONEncoder.default, so the
+output matches JSONRenderer. DecimalField output is already a string (DRF's
+COERCE_DECIMAL_TO_STRING), so only a raw Decimal put in a body by hand takes
+that path, and renders as a float just as JSONRenderer would.
+
+orjson writes NaN and infinities as null where JSONRenderer refuses them
+under STRICT_JSON; a body containing null is checked for them and rejected
+the same way. Without orjson installed both renderers here behave exactly
+like DRF's.
+"""
+import math
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional accelerator
+    orjson = None
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+_fallback = JSONEncoder().default
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def _finite(value):
+    """False if a float anywhere in `value` is NaN or infinite."""
+    if isinstance(value, float):
+        return math.isfinite(value)
+    if isinstance(value, dict):
+        return all(_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return all(_finite(item) for item in value)
+    if numpy is not None and isinstance(value, (numpy.ndarray, numpy.generic)) and value.dtype.kind in 'fc':
+        return bool(numpy.isfinite(value).all())
+    return True
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b''
+
+        options = OPTIONS
+        # orjson only indents by two spaces; any requested indent gets that.
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            options |= orjson.OPT_INDENT_2
+        ret = orjson.dumps(data, default=_fallback, option=options)
+        if self.strict and b'null' in ret and not _finite(data):
+            raise ValueError("Out of range float values are not JSON compliant")
+        # Same escaping as JSONRenderer, for responses embedded in HTML.
+        if b'\xe2\x80\xa8' in ret or b'\xe2\x80\xa9' in ret:
+            ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return ret
+
+
+class OpenApiORJSONRenderer(ORJSONRenderer):
+    media_type = 'application/vnd.oai.openapi+json'  # drf_spectacular's OpenApiJsonRenderer
+
+    def get_indent(self, accepted_media_type, renderer_context):
+        return super().get_indent(accepted_media_type, renderer_context) or 2
+
+
+class OpenApiORJSONRenderer2(OpenApiORJSONRenderer):
+    media_type = 'application/json'
@@ -0,0 +1,96 @@
+"""
+Precompiled response bodies for the booking endpoints.
+
+DRF builds a response by walking the serializer's fields and calling each
+field's to_representation, which is a noticeable share of a booking request.
+`compile_representation` does that walk once and generates a plain function
+that reads the attributes straight off the saved instance. Fields without a
+shortcut still go through their own to_representation, so the result equals
+`Serializer(instance).data`.
+"""
+import functools
+
+from django.db.models import Manager
+from rest_framework import serializers
+from rest_framework.relations import RelatedField
+from rest_framework.settings import api_settings
+
+from .serializers import (
+    LocationField, HotelListSerializer, FlightListSerializer, RentalCarListSerializer,
+    HolidayPackageListSerializer, CruiseListSerializer, MultiCityFlightSerializer,
+)
+
+
+def _is_iso(field, default):
+    output_format = getattr(field, 'format', default)
+    return isinstance(output_format, str) and output_format.lower() == 'iso-8601'
+
+
+def _expression(field, slot, namespace):
+    """Python expression turning `value` (never None) into the field's output."""
+    kind = type(field)
+    if kind is LocationField:
+        return 'value.name'
+    if kind is serializers.CharField:
+        return 'str(value)'
+    if kind is serializers.IntegerField:
+        return 'int(value)'
+    if kind is serializers.BooleanField:
+        return 'bool(value)'
+    if kind is serializers.DateField and _is_iso(field, api_settings.DATE_FORMAT):
+        return 'value if isinstance(value, str) else value.isoformat()'
+    if isinstance(field, serializers.ListSerializer) and isinstance(field.child, serializers.Serializer):
+        namespace[f'child_{slot}'] = compile_representation(type(field.child))
+        return f'[child_{slot}(item) for item in (value.all() if isinstance(value, Manager) else value)]'
+    if isinstance(field, serializers.Serializer):
+        namespace[f'child_{slot}'] = compile_representation(type(field))
+        return f'child_{slot}(value)'
+    namespace[f'field_{slot}'] = field
+    return f'field_{slot}.to_representation(value)'
+
+
+@functools.cache
+def readable_fields(serializer_class):
+    return [field for field in serializer_class().fields.values() if not field.write_only]
+
+
+def compile_representation(serializer_class, names=None):
+    """A function of the instance giving the serializer's output, limited to `names` if given."""
+    namespace = {'Manager': Manager}
+    lines = ['def represent(instance):', '    data = {}']
+    readable = [field for field in readable_fields(serializer_class) if names is None or field.field_name in names]
+    for slot, field in enumerate(readable):
+        direct = len(field.source_attrs) == 1 and not isinstance(field, RelatedField)
+        if direct:
+            lines.append(f'    value = instance.{field.source_attrs[0]}')
+        else:
+            namespace[f'get_{slot}'] = field.get_attribute
+            lines.append(f'    value = get_{slot}(instance)')
+        expression = _expression(field, slot, namespace)
+        lines.append(f'    data[{field.field_name!r}] = None if value is None else {expression}')
+    lines.append('    return data')
+
+    code = compile('\n'.join(lines), f'<representation of {serializer_class.__name__}>', 'exec')
+    exec(code, namespace)
+    return namespace['represent']
+
+
+BOOKING_SERIALIZERS = [
+    HotelListSerializer, FlightListSerializer, RentalCarListSerializer,
+    HolidayPackageListSerializer, CruiseListSerializer, MultiCityFlightSerializer,
+]
+
+_compiled = {serializer_class: compile_representation(serializer_class) for serializer_class in BOOKING_SERIALIZERS}
+
+
+def represent(serializer_class, instance, names=None):
+    """Same output as `serializer_class(instance).data`, keeping only `names` if given."""
+    key = serializer_class
+    if names is not None:
+        # Only real field names are kept, so there is at most one variant per subset.
+        known = frozenset(field.field_name for field in readable_fields(serializer_class))
+        key = (serializer_class, known.intersection(names))
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = _compiled[key] = compile_representation(serializer_class, None if names is None else key[1])
+    return compiled(instance)
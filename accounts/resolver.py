@@ -0,0 +1,280 @@
+"""
+Typo-tolerant location resolution.
+
+Maps raw input such as "Hyderbad", "Dubay" or "NYC" to a canonical location
+name. The vocabulary is every unmerged location searched at least
+LOCATION_CANONICAL_MIN_SEARCHES times. Candidates come from a trigram inverted
+index filtered by length, and are confirmed with an edit distance that gives
+up as soon as the bound is exceeded. Answers are memoized per index, so
+repeat input is a dictionary lookup.
+
+A near miss is only corrected automatically when the margin is clear: the
+word is long enough for its edits (LOCATION_AUTOCORRECT_CHARS_PER_EDIT), or
+the match has been searched LOCATION_AUTOCORRECT_MIN_RATIO times as often as
+the input. "Raipur" is one edit from "Jaipur" and both are real places, so
+such matches are only suggested, for staff to merge from the admin.
+"""
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+
+from .autocomplete import scope_weights, ALL_SCOPES
+from .indexing import BackgroundIndex
+from .locations import normalize_location, display_location, clear_location_cache
+from .models import (
+    Location, Hotel, Flight, RentalCar, HolidayPackage, Cruise, MultiCityFlightLeg, DailyRouteStat,
+    UserDestination, DestinationPair,
+)
+from .rollups import increment_count
+
+
+def trigrams(key):
+    padded = f'  {key} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def max_edits(key):
+    """How many edits a word of this length may be away from its match."""
+    if len(key) < 5:
+        return 0
+    if len(key) <= 8:
+        return 1
+    return 2
+
+
+def bounded_distance(a, b, bound):
+    """
+    Optimal-string-alignment distance between a and b, or bound + 1 once it is
+    certain to exceed `bound`.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = current[0]
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > bound:
+            return bound + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class LocationResolver:
+    def __init__(self, vocabulary, aliases=None, counts=None):
+        """
+        `vocabulary` is an iterable of (name, weight); `aliases` maps input to a
+        name; `counts` maps the key of any location to its search count.
+        """
+        self.names = []
+        self.keys = []
+        self.weights = []
+        self.by_key = {}
+        self.postings = {}
+        for name, weight in vocabulary:
+            key = normalize_location(name)
+            if key in self.by_key:
+                continue
+            position = len(self.names)
+            self.names.append(name)
+            self.keys.append(key)
+            self.weights.append(weight)
+            self.by_key[key] = position
+            for gram in trigrams(key):
+                self.postings.setdefault(gram, []).append(position)
+        self.aliases = {normalize_location(alias): name for alias, name in (aliases or {}).items()}
+        self.counts = counts or {}
+        self.chars_per_edit = getattr(settings, 'LOCATION_AUTOCORRECT_CHARS_PER_EDIT', 8)
+        self.min_ratio = getattr(settings, 'LOCATION_AUTOCORRECT_MIN_RATIO', 20)
+        self._memo = {}
+        self._memo_lock = threading.Lock()
+        self._memo_size = getattr(settings, 'LOCATION_RESOLVER_CACHE_SIZE', 50000)
+
+    def _clear_margin(self, key, position, distance):
+        if len(key) >= self.chars_per_edit * distance:
+            return True
+        return self.weights[position] >= self.min_ratio * max(self.counts.get(key, 0), 1)
+
+    def _match(self, key):
+        """(name, sure) for the closest canonical spelling, or (None, False)."""
+        if key in self.by_key:
+            return self.names[self.by_key[key]], True
+        if key in self.aliases:
+            return self.aliases[key], True
+        bound = max_edits(key)
+        if not bound:
+            return None, False
+
+        grams = trigrams(key)
+        # Each edit can break at most three trigrams.
+        needed = max(1, len(grams) - 3 * bound)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.postings.get(gram, ()))
+
+        best = None
+        for position, count in shared.items():
+            if count < needed:
+                continue
+            distance = bounded_distance(key, self.keys[position], bound)
+            if distance > bound:
+                continue
+            rank = (distance, -self.weights[position])
+            if best is None or rank < best[0]:
+                best = (rank, position)
+        if best is None:
+            return None, False
+        (distance, _), position = best
+        return self.names[position], self._clear_margin(key, position, distance)
+
+    def _lookup(self, name):
+        key = normalize_location(name)
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        match = self._match(key)
+        with self._memo_lock:
+            if len(self._memo) >= self._memo_size:
+                self._memo.clear()
+            self._memo[key] = match
+        return match
+
+    def canonical_name(self, name):
+        """The canonical spelling for `name`, or None when nothing is clearly close enough."""
+        match, sure = self._lookup(name)
+        return match if sure else None
+
+    def suggestion(self, name):
+        """A close canonical spelling that is not clear enough to correct to automatically."""
+        match, sure = self._lookup(name)
+        return None if sure else match
+
+    def resolve(self, name):
+        """Canonical spelling if there is one, otherwise the input tidied up."""
+        return self.canonical_name(name) or display_location(name)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def build_resolver():
+    weights = scope_weights()[ALL_SCOPES]
+    minimum = getattr(settings, 'LOCATION_CANONICAL_MIN_SEARCHES', 3)
+    locations = Location.objects.filter(canonical__isnull=True).values_list('id', 'name', 'key')
+    vocabulary, counts = [], {}
+    for location_id, name, key in locations:
+        weight = weights.get(location_id, 0)
+        counts[key] = weight
+        if weight >= minimum:
+            vocabulary.append((name, weight))
+    return LocationResolver(vocabulary, getattr(settings, 'LOCATION_ALIASES', {}), counts)
+
+
+location_resolver = BackgroundIndex('location-resolver', build_resolver, 'LOCATION_RESOLVER_REFRESH_SECONDS')
+
+
+def resolve_location(name):
+    return location_resolver.get().resolve(name)
+
+
+# --- Batch re-canonicalization ---
+
+LOCATION_REFERENCES = [
+    (Hotel, ['place']),
+    (Flight, ['from_location', 'to_location']),
+    (RentalCar, ['location']),
+    (HolidayPackage, ['from_location', 'to_location']),
+    (Cruise, ['from_location', 'to_location']),
+    (MultiCityFlightLeg, ['from_location', 'to_location']),
+]
+
+
+def plan_merges(resolver=None):
+    """
+    ([(location, canonical location)] to merge, [(location, location)] only
+    suggested) for every unmerged spelling the resolver maps elsewhere.
+    Targets that do not exist yet are returned unsaved.
+    """
+    resolver = resolver or build_resolver()
+    targets = {}
+    merges, suggestions = [], []
+    for location in Location.objects.filter(canonical__isnull=True).iterator():
+        name = resolver.canonical_name(location.name)
+        planned = merges
+        if name is None:
+            name, planned = resolver.suggestion(location.name), suggestions
+        if not name or normalize_location(name) == location.key:
+            continue
+        key = normalize_location(name)
+        if key not in targets:
+            target = Location.objects.filter(key=key).select_related('canonical').first()
+            if target is None:
+                # Aliases may name a location nobody has searched for yet.
+                target = Location(key=key, name=name)
+            targets[key] = target.canonical or target
+        target = targets[key]
+        if target.pk != location.pk:
+            planned.append((location, target))
+    return merges, suggestions
+
+
+def _merge_route_stats(source_id, target_id):
+    for column in ('origin', 'destination'):
+        for stat in DailyRouteStat.objects.filter(**{column: source_id}):
+            lookup = {
+                'day': stat.day, 'booking_type': stat.booking_type,
+                'origin_id': stat.origin_id, 'destination_id': stat.destination_id,
+            }
+            lookup[f'{column}_id'] = target_id
+            stat.delete()
+            increment_count(DailyRouteStat, stat.count, **lookup)
+
+
+def _merge_recommendations(source_id, target_id):
+    # Users who searched both spellings keep a single destination row.
+    users_with_target = UserDestination.objects.filter(location_id=target_id).values('user_id')
+    UserDestination.objects.filter(location_id=source_id, user_id__in=users_with_target).delete()
+    UserDestination.objects.filter(location_id=source_id).update(location_id=target_id)
+
+    for column in ('location', 'related'):
+        for pair in DestinationPair.objects.filter(**{column: source_id}):
+            lookup = {'location_id': pair.location_id, 'related_id': pair.related_id}
+            lookup[f'{column}_id'] = target_id
+            pair.delete()
+            if lookup['location_id'] != lookup['related_id']:
+                increment_count(DestinationPair, pair.count, **lookup)
+
+
+def merge_location(source, target):
+    """Point every booking and rollup row at `target` and mark `source` as its alias."""
+    with transaction.atomic():
+        for model, fields in LOCATION_REFERENCES:
+            for field in fields:
+                model.objects.filter(**{field: source}).update(**{field: target})
+        _merge_route_stats(source.pk, target.pk)
+        _merge_recommendations(source.pk, target.pk)
+        Location.objects.filter(canonical=source).update(canonical=target)
+        source.canonical = target
+        source.save(update_fields=['canonical'])
+
+
+def canonicalize_locations(dry_run=False):
+    """Make the clear merges (unless `dry_run`); returns (merges, suggestions) as plan_merges."""
+    merges, suggestions = plan_merges()
+    if not dry_run:
+        for source, target in merges:
+            if target.pk is None:
+                target.save()
+            merge_location(source, target)
+        clear_location_cache()
+    return merges, suggestions
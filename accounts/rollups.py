@@ -0,0 +1,239 @@
+"""
+Daily rollups behind the admin dashboard.
+
+Booking rows are counted into DailyBookingStat / DailyRouteStat either as they
+are inserted (see signals.py) or by the `update_rollups` delta job, so the
+dashboard reads a handful of small summary rows instead of aggregating the
+booking tables on every page load.
+"""
+from collections import Counter, namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from .models import (
+    Hotel, Flight, RentalCar, HolidayPackage, Cruise, MultiCityFlight, MultiCityFlightLeg,
+    DailyBookingStat, DailyRouteStat, RollupCursor,
+)
+
+
+DASHBOARD_CACHE_KEY = 'dashboard:kpis'
+
+RollupSource = namedtuple('RollupSource', [
+    'booking_type', 'model', 'day_field', 'origin_field', 'destination_field', 'counts_bookings',
+])
+
+# Legs only feed route stats; the parent MultiCityFlight row is the booking.
+ROLLUP_SOURCES = [
+    RollupSource('hotel', Hotel, 'created_at', None, 'place_id', True),
+    RollupSource('flight', Flight, 'created_at', 'from_location_id', 'to_location_id', True),
+    RollupSource('rental_car', RentalCar, 'created_at', None, 'location_id', True),
+    RollupSource('holiday_package', HolidayPackage, 'created_at', 'from_location_id', 'to_location_id', True),
+    RollupSource('cruise', Cruise, 'created_at', 'from_location_id', 'to_location_id', True),
+    RollupSource('multi_city_flight', MultiCityFlight, 'created_at', None, None, True),
+    RollupSource('multi_city_flight', MultiCityFlightLeg, 'multi_city_flight__created_at', 'from_location_id', 'to_location_id', False),
+]
+
+SOURCES_BY_MODEL = {source.model: source for source in ROLLUP_SOURCES}
+
+
+def _source_name(source):
+    return source.model._meta.model_name
+
+
+def _resolve(instance, path):
+    value = instance
+    for attr in path.split('__'):
+        value = getattr(value, attr, None)
+        if value is None:
+            return None
+    return value
+
+
+def _to_day(value):
+    if value is None:
+        return None
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def increment_count(model, count, **lookup):
+    updated = model.objects.filter(**lookup).update(count=F('count') + count)
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(count=count, **lookup)
+    except IntegrityError:
+        # Another writer created the row between our update and insert.
+        model.objects.filter(**lookup).update(count=F('count') + count)
+
+
+def _apply(source, day_counts, route_counts):
+    if source.counts_bookings:
+        for day, count in day_counts.items():
+            increment_count(DailyBookingStat, count, day=day, booking_type=source.booking_type)
+    for (day, origin_id, destination_id), count in route_counts.items():
+        increment_count(
+            DailyRouteStat, count,
+            day=day, booking_type=source.booking_type, origin_id=origin_id, destination_id=destination_id,
+        )
+
+
+def _count_row(source, day, origin_id, destination_id, day_counts, route_counts):
+    # Rows created before created_at existed have no day to be counted on.
+    if day is None:
+        return
+    day_counts[day] += 1
+    if source.destination_field and destination_id:
+        route_counts[(day, origin_id, destination_id)] += 1
+
+
+def record(instance):
+    """Count a single freshly inserted booking row."""
+    source = SOURCES_BY_MODEL.get(type(instance))
+    if source is None:
+        return
+    day_counts, route_counts = Counter(), Counter()
+    _count_row(
+        source,
+        _to_day(_resolve(instance, source.day_field)),
+        _resolve(instance, source.origin_field) if source.origin_field else None,
+        _resolve(instance, source.destination_field) if source.destination_field else None,
+        day_counts, route_counts,
+    )
+    with transaction.atomic():
+        _apply(source, day_counts, route_counts)
+
+
+def apply_delta(source, chunk_size=None):
+    """
+    Roll up rows of one source whose primary key is past its cursor.
+    Each chunk and its cursor move commit together, so an interrupted run resumes cleanly.
+    """
+    chunk_size = chunk_size or getattr(settings, 'ROLLUP_CHUNK_SIZE', 5000)
+    name = _source_name(source)
+    columns = ['pk', source.day_field]
+    columns += [source.origin_field] if source.origin_field else []
+    columns += [source.destination_field] if source.destination_field else []
+
+    processed = 0
+    while True:
+        with transaction.atomic():
+            cursor, _ = RollupCursor.objects.select_for_update().get_or_create(source=name)
+            rows = list(
+                source.model.objects.filter(pk__gt=cursor.last_id)
+                .order_by('pk')
+                .values_list(*columns)[:chunk_size]
+            )
+            if not rows:
+                return processed
+
+            day_counts, route_counts = Counter(), Counter()
+            for row in rows:
+                origin = row[2] if source.origin_field else None
+                destination = row[-1] if source.destination_field else None
+                _count_row(source, _to_day(row[1]), origin, destination, day_counts, route_counts)
+            _apply(source, day_counts, route_counts)
+
+            cursor.last_id = rows[-1][0]
+            cursor.save(update_fields=['last_id', 'updated_at'])
+        processed += len(rows)
+
+
+def update_rollups(chunk_size=None):
+    results = {_source_name(source): apply_delta(source, chunk_size) for source in ROLLUP_SOURCES}
+    cache.delete(DASHBOARD_CACHE_KEY)
+    return results
+
+
+def rebuild_rollups(chunk_size=None):
+    with transaction.atomic():
+        DailyBookingStat.objects.all().delete()
+        DailyRouteStat.objects.all().delete()
+        RollupCursor.objects.all().delete()
+    return update_rollups(chunk_size)
+
+
+# --- Dashboard ---
+
+def _daily_series(booking_types, start, days):
+    totals = dict(
+        DailyBookingStat.objects.filter(booking_type__in=booking_types, day__gte=start)
+        .values_list('day')
+        .annotate(total=Sum('count'))
+    )
+    return [totals.get(start + timedelta(days=offset), 0) for offset in range(days)]
+
+
+def _total(**filters):
+    return DailyBookingStat.objects.filter(**filters).aggregate(total=Sum('count'))['total'] or 0
+
+
+def _growth_footer(this_week, last_week):
+    if not last_week:
+        return "This week" if not this_week else "New this week"
+    change = round((this_week - last_week) * 100 / last_week)
+    return f"{change:+d}% Growth"
+
+
+def compute_dashboard_kpis():
+    today = timezone.localdate()
+    week_start = today - timedelta(days=6)
+    month_start = today.replace(day=1)
+
+    flight_chart = _daily_series(['flight', 'multi_city_flight'], week_start, 7)
+    hotel_chart = _daily_series(['hotel'], week_start, 7)
+    this_week = _total(day__gte=week_start)
+    last_week = _total(day__gte=week_start - timedelta(days=7), day__lt=week_start)
+
+    top_destination = (
+        DailyRouteStat.objects.filter(day__gte=week_start)
+        .values('destination', 'destination__name')
+        .annotate(total=Sum('count'))
+        .order_by('-total')
+        .first()
+    )
+
+    return [
+        {
+            "title": "Flight Searches",
+            "icon": "flight_takeoff",
+            "metric": f"{sum(flight_chart):,}",
+            "footer": "This week",
+            "chart": flight_chart,
+        },
+        {
+            "title": "Hotel Searches",
+            "icon": "hotel",
+            "metric": f"{sum(hotel_chart):,}",
+            "footer": "This week",
+            "chart": hotel_chart,
+        },
+        {
+            "title": "Total Bookings",
+            "icon": "airplane_ticket",
+            "metric": f"{_total():,}",
+            "footer": _growth_footer(this_week, last_week),
+        },
+        {
+            "title": "Multi-City Flights",
+            "icon": "vibration",
+            "metric": f"{_total(booking_type='multi_city_flight', day__gte=month_start):,}",
+            "footer": "This month",
+        },
+        {
+            "title": "Top Destination",
+            "icon": "flight_land",
+            "metric": top_destination['destination__name'] if top_destination else "-",
+            "footer": f"{top_destination['total']:,} searches this week" if top_destination else "This week",
+        },
+    ]
+
+
+def dashboard_kpis():
+    timeout = getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 30)
+    return cache.get_or_set(DASHBOARD_CACHE_KEY, compute_dashboard_kpis, timeout)
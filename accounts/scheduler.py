@@ -0,0 +1,170 @@
+"""
+Re-running saved flight and hotel searches.
+
+A SearchWatch asks for a saved search to be re-run until its travel date and
+for the customer to hear when the results change. The scheduler keeps the
+watches in a heap ordered by (next run time, days until travel), so each cycle
+pops only what is due, nearest trips first. Due watches are grouped by their
+normalized query and every distinct query is fetched once, in parallel on a
+worker pool, through the supplier layer. A SearchNotification is queued only
+when a query's offers differ from what that watch saw last time.
+"""
+import hashlib
+import heapq
+import json
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Flight, Hotel, SearchWatch, SearchNotification
+from .search import canonical_query, fetch_offers, search_key
+
+
+# The fields of each watchable search that make up its query, as in the *ListSerializer payloads.
+WATCHABLE = {
+    'flight': (Flight, 'departure_date', [
+        'from_location', 'to_location', 'round_trip', 'one_way', 'departure_date', 'return_date', 'adults', 'children',
+    ]),
+    'hotel': (Hotel, 'checkin_date', [
+        'place', 'checkin_date', 'checkout_date', 'adults', 'children', 'rooms',
+    ]),
+}
+
+
+def watch_search(user, kind, search_id):
+    """Start watching one of the user's saved searches; returns (watch, created)."""
+    model, date_field, fields = WATCHABLE[kind]
+    row = model.objects.select_related(*[
+        field for field in fields if model._meta.get_field(field).is_relation
+    ]).get(pk=search_id, user=user)
+    query = canonical_query({field: getattr(row, field) for field in fields})
+    return SearchWatch.objects.get_or_create(
+        kind=kind, search_id=row.pk,
+        defaults={
+            'user': user,
+            'query': query,
+            'query_key': search_key(kind, query),
+            'travel_date': getattr(row, date_field),
+            'next_run_at': timezone.now(),
+        },
+    )
+
+
+def results_digest(offers):
+    key = sorted((offer['supplier'], offer['offer_id'], offer['price']) for offer in offers)
+    return hashlib.sha256(json.dumps(key).encode()).hexdigest()
+
+
+def _priority(travel_date, today):
+    return (travel_date - today).days if travel_date else 10 ** 6
+
+
+def _interval(travel_date, today):
+    if travel_date and (travel_date - today).days <= getattr(settings, 'SAVED_SEARCH_URGENT_DAYS', 7):
+        return getattr(settings, 'SAVED_SEARCH_URGENT_INTERVAL', 3600)
+    return getattr(settings, 'SAVED_SEARCH_INTERVAL', 6 * 3600)
+
+
+class SavedSearchScheduler:
+    def __init__(self, workers=None):
+        self.heap = []  # (next run timestamp, days until travel, watch id)
+        self.last_loaded_id = 0
+        self.pool = ThreadPoolExecutor(
+            max_workers=workers or getattr(settings, 'SAVED_SEARCH_WORKERS', 8),
+            thread_name_prefix='saved-search',
+        )
+
+    def load(self):
+        """Push watches created since the last call."""
+        today = timezone.localdate()
+        rows = (
+            SearchWatch.objects.filter(active=True, pk__gt=self.last_loaded_id)
+            .order_by('pk')
+            .values_list('pk', 'next_run_at', 'travel_date')
+        )
+        for pk, next_run_at, travel_date in rows.iterator():
+            heapq.heappush(self.heap, (next_run_at.timestamp(), _priority(travel_date, today), pk))
+            self.last_loaded_id = pk
+
+    def _pop_due(self, now):
+        due = []
+        while self.heap and self.heap[0][0] <= now.timestamp():
+            due.append(heapq.heappop(self.heap)[2])
+        return due
+
+    def run_cycle(self, now=None):
+        """Re-run everything due; returns counts of watches, distinct queries and notifications."""
+        now = now or timezone.now()
+        today = timezone.localdate(now)
+        self.load()
+        due_ids = self._pop_due(now)
+        if not due_ids:
+            return {'watches': 0, 'queries': 0, 'notifications': 0}
+
+        groups = defaultdict(list)
+        for watch in SearchWatch.objects.filter(pk__in=due_ids, active=True):
+            groups[(watch.kind, watch.query_key)].append(watch)
+
+        futures = {
+            self.pool.submit(fetch_offers, kind, watches[0].query): (kind, query_key)
+            for (kind, query_key), watches in groups.items()
+        }
+        wait(futures, timeout=getattr(settings, 'SAVED_SEARCH_CYCLE_TIMEOUT', 60))
+
+        notifications, updated = [], []
+        for future, group in futures.items():
+            watches = groups[group]
+            offers, unavailable = future.result() if future.done() and not future.exception() else (None, None)
+            for watch in watches:
+                watch.last_run_at = now
+                # Partial answers would look like changes, so they don't count.
+                if offers is not None and not unavailable:
+                    digest = results_digest(offers)
+                    cheapest = offers[0]['price'] if offers else None
+                    if watch.last_digest and digest != watch.last_digest:
+                        notifications.append(SearchNotification(watch=watch, summary={
+                            'offers': len(offers),
+                            'cheapest': cheapest,
+                            'previous_cheapest': watch.last_cheapest,
+                        }))
+                    watch.last_digest, watch.last_cheapest = digest, cheapest
+                if watch.travel_date and watch.travel_date < today:
+                    watch.active = False
+                else:
+                    watch.next_run_at = now + timedelta(seconds=_interval(watch.travel_date, today))
+                    heapq.heappush(self.heap, (
+                        watch.next_run_at.timestamp(), _priority(watch.travel_date, today), watch.pk,
+                    ))
+                updated.append(watch)
+
+        with transaction.atomic():
+            SearchWatch.objects.bulk_update(
+                updated, ['last_run_at', 'last_digest', 'last_cheapest', 'next_run_at', 'active'],
+            )
+            SearchNotification.objects.bulk_create(notifications)
+        return {'watches': len(updated), 'queries': len(groups), 'notifications': len(notifications)}
+
+
+def send_pending_notifications():
+    sent = 0
+    pending = SearchNotification.objects.filter(sent_at__isnull=True).select_related('watch__user')
+    for notification in pending:
+        watch, summary = notification.watch, notification.summary
+        cheapest = summary.get('cheapest')
+        message = (
+            f"Hello {watch.user.first_name or watch.user.email},\n\n"
+            f"The results for your saved {watch.kind} search have changed.\n"
+            f"Offers available: {summary.get('offers', 0)}\n"
+            + (f"Cheapest price now: {cheapest}\n" if cheapest is not None else "")
+            + "\nThank you for choosing CheapTicket!"
+        )
+        send_mail('Your saved search has new results', message, settings.EMAIL_HOST_USER, [watch.user.email], fail_silently=True)
+        notification.sent_at = timezone.now()
+        notification.save(update_fields=['sent_at'])
+        sent += 1
+    return sent
@@ -0,0 +1,235 @@
+"""
+Live availability search behind the booking endpoints.
+
+It only runs when a request asks for `availability` in `?fields=` and a
+configured supplier serves the search kind (see has_suppliers).
+
+A validated search payload is reduced to a canonical query (locations as
+their normalized key, dates as ISO strings) and hashed, so every spelling of
+the same search shares one cache entry. Entries stay fresh for
+SEARCH_CACHE_TTL seconds; for SEARCH_CACHE_STALE_TTL seconds after that they
+are still served while a single background refresh fetches new offers.
+Suppliers are queried concurrently (see fanout.py); a partial answer is
+served but counts as stale straight away, so the next search retries.
+
+On a miss, identical searches running at the same time share one supplier
+fetch: threads of a worker through SingleFlight, other workers by waiting on
+a cache lock until the leader's result lands in the cache.
+"""
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import metrics
+from .fanout import fan_out
+from .models import Location
+from .singleflight import SingleFlight, CoalesceTimeout
+from .suppliers import load_suppliers
+
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CACHE_PREFIX = 'search:'
+
+_suppliers = None
+_suppliers_lock = threading.Lock()
+_in_flight = SingleFlight()
+_leg_executor = None
+
+
+def get_suppliers():
+    global _suppliers
+    if _suppliers is None:
+        with _suppliers_lock:
+            if _suppliers is None:
+                _suppliers = load_suppliers()
+    return _suppliers
+
+
+def has_suppliers(kind):
+    return any(supplier.supports(kind) for supplier in get_suppliers())
+
+
+def _canonical(value):
+    if isinstance(value, Location):
+        return value.key
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return canonical_query(value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+
+def canonical_query(data):
+    """The parts of a validated payload that decide the search result."""
+    return {field: _canonical(value) for field, value in data.items() if value is not None}
+
+
+def search_key(kind, query):
+    text = json.dumps([kind, query], sort_keys=True, separators=(',', ':'), default=str)
+    return SEARCH_CACHE_PREFIX + hashlib.sha256(text.encode()).hexdigest()
+
+
+def _timeouts():
+    fresh = getattr(settings, 'SEARCH_CACHE_TTL', 300)
+    stale = getattr(settings, 'SEARCH_CACHE_STALE_TTL', 600)
+    return fresh, stale
+
+
+def fetch_offers(kind, query):
+    """
+    Ask every supplier that handles `kind` at once.
+    Returns (offers cheapest first, names of suppliers that did not answer).
+    """
+    suppliers = [supplier for supplier in get_suppliers() if supplier.supports(kind)]
+    if not suppliers:
+        return [], []
+    offers, unavailable = fan_out.search(suppliers, kind, query)
+    offers.sort(key=lambda offer: offer['price'])
+    return offers, unavailable
+
+
+def _store(key, kind, query):
+    metrics.increment('search.fetches')
+    fresh, stale = _timeouts()
+    offers, unavailable = fetch_offers(kind, query)
+    if unavailable:
+        metrics.increment('search.partial')
+    now = time.time()
+    entry = {
+        'offers': offers,
+        'unavailable': unavailable,
+        'fresh_until': now if unavailable else now + fresh,
+    }
+    cache.set(key, entry, fresh + stale)
+    return entry
+
+
+def _refresh_in_background(key, kind, query):
+    fresh, _ = _timeouts()
+    # cache.add is atomic on the shared cache, so only one worker refreshes a given search.
+    if not cache.add(f'{key}:refresh', 1, max(fresh, 1)):
+        return
+
+    def run():
+        try:
+            _store(key, kind, query)
+        except Exception:
+            logger.exception("Refreshing %s search failed", kind)
+        finally:
+            cache.delete(f'{key}:refresh')
+
+    threading.Thread(target=run, name='search-refresh', daemon=True).start()
+
+
+def _coalesce_timeout():
+    return getattr(settings, 'SEARCH_COALESCE_TIMEOUT', 10)
+
+
+def _fetch_once(key, kind, query):
+    """Fetch and cache offers, or wait for the worker that is already fetching them."""
+    timeout = _coalesce_timeout()
+    lock_key = f'{key}:lock'
+    if cache.add(lock_key, 1, timeout + 1):
+        try:
+            return _store(key, kind, query), 'miss'
+        finally:
+            cache.delete(lock_key)
+
+    poll = getattr(settings, 'SEARCH_COALESCE_POLL_INTERVAL', 0.05)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll)
+        entry = cache.get(key)
+        if entry is not None:
+            metrics.increment('search.coalesced_remote')
+            return entry, 'shared'
+        if cache.get(lock_key) is None:
+            # The leader failed without caching anything; fetch ourselves.
+            break
+    else:
+        metrics.increment('search.coalesce_timeouts')
+    return _store(key, kind, query), 'miss'
+
+
+def _response(entry, source):
+    return {'offers': entry['offers'], 'unavailable': entry['unavailable'], 'cache': source}
+
+
+def search_offers(kind, data):
+    """
+    Offers for a validated search payload, cheapest first.
+    Returns {'offers': [...], 'unavailable': [supplier names], 'cache': 'hit' | 'stale' | 'miss' | 'shared'}.
+    """
+    metrics.increment('search.requests')
+    query = canonical_query(data)
+    key = search_key(kind, query)
+    entry = cache.get(key)
+    if entry is not None:
+        if time.time() < entry['fresh_until']:
+            metrics.increment('search.hits')
+            return _response(entry, 'hit')
+        metrics.increment('search.stale')
+        _refresh_in_background(key, kind, query)
+        return _response(entry, 'stale')
+
+    metrics.increment('search.misses')
+    try:
+        (entry, source), shared = _in_flight.do(key, lambda: _fetch_once(key, kind, query), _coalesce_timeout())
+    except CoalesceTimeout:
+        metrics.increment('search.coalesce_timeouts')
+        entry, source, shared = _store(key, kind, query), 'miss', False
+    if shared:
+        metrics.increment('search.coalesced')
+        source = 'shared'
+    return _response(entry, source)
+
+
+def _legs_pool():
+    global _leg_executor
+    if _leg_executor is None:
+        with _suppliers_lock:
+            if _leg_executor is None:
+                _leg_executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'MULTI_CITY_MAX_WORKERS', 8),
+                    thread_name_prefix='multi-city-leg',
+                )
+    return _leg_executor
+
+
+def search_legs(legs, travellers):
+    """
+    Flight availability for every leg of a multi-city search, looked up
+    concurrently and returned in leg order. The itinerary shares one
+    MULTI_CITY_DEADLINE; legs still running by then come back without offers.
+    """
+    deadline = time.monotonic() + getattr(settings, 'MULTI_CITY_DEADLINE', 3.0)
+    pool = _legs_pool()
+    futures = [pool.submit(search_offers, 'flight', {**travellers, **leg}) for leg in legs]
+    results = []
+    for future in futures:
+        try:
+            results.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+        except FuturesTimeout:
+            future.cancel()
+            metrics.increment('search.leg_timeouts')
+            results.append({'offers': [], 'unavailable': [], 'cache': 'timeout'})
+    return results
+
+
+def search_stats():
+    """This worker's search counters plus the share of misses answered by another caller's fetch."""
+    stats = metrics.counters('search.')
+    misses = stats.get('search.misses', 0)
+    shared = stats.get('search.coalesced', 0) + stats.get('search.coalesced_remote', 0)
+    stats['coalescing_ratio'] = round(shared / misses, 4) if misses else 0.0
+    return stats
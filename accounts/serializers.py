@@ -1,5 +1,50 @@
+from django.conf import settings
+from django.db import transaction
 from rest_framework import serializers
-from .models import Hotel, Flight, RentalCar, HolidayPackage, Cruise, MultiCityFlight, MultiCityFlightLeg
+from .locations import intern_location, lookup_location
+from .resolver import resolve_location
+from .models import Location, Hotel, Flight, RentalCar, HolidayPackage, Cruise, MultiCityFlight, MultiCityFlightLeg
+
+
+class LocationField(serializers.CharField):
+    """
+    Reads and writes a Location foreign key as its plain name, correcting typos on the way in.
+    A place nobody has named before validates to an unsaved Location, which
+    LocationModelSerializer creates along with the row, so rejected requests
+    leave no Location behind.
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_length', 255)
+        super().__init__(**kwargs)
+
+    def run_validation(self, data=serializers.empty):
+        # Length and blank checks run on the text; the Location is looked up last.
+        value = super().run_validation(data)
+        return lookup_location(resolve_location(value)) if value is not None else None
+
+    def to_representation(self, value):
+        return value.name
+
+
+def intern_new_locations(data):
+    """`data` with the unsaved Locations from LocationField replaced by stored ones."""
+    return {
+        field: intern_location(value.name) if isinstance(value, Location) and value.pk is None else value
+        for field, value in data.items()
+    }
+
+
+class LocationModelSerializer(serializers.ModelSerializer):
+    """Saves the row and any Location it is first to name in one transaction."""
+
+    def create(self, validated_data):
+        with transaction.atomic():
+            return super().create(intern_new_locations(validated_data))
+
+    def update(self, instance, validated_data):
+        with transaction.atomic():
+            return super().update(instance, intern_new_locations(validated_data))
 
 class ContactSupportSerializer(serializers.Serializer):
     name = serializers.CharField(max_length=255, required=True, error_messages={'required': 'Please provide your name.'})
@@ -13,12 +58,15 @@ class ContactSupportSerializer(serializers.Serializer):
 # ... other serializers ...
 
 # Multi-City Flight serializer
-class MultiCityFlightLegSerializer(serializers.ModelSerializer):
+class MultiCityFlightLegSerializer(LocationModelSerializer):
+    from_location = LocationField(required=True)
+    to_location = LocationField(required=True)
+
     class Meta:
         model = MultiCityFlightLeg
         fields = ['from_location', 'to_location', 'departure_date']
 
-class MultiCityFlightSerializer(serializers.ModelSerializer):
+class MultiCityFlightSerializer(LocationModelSerializer):
     legs = MultiCityFlightLegSerializer(many=True)
     childrens = serializers.IntegerField(source='children', default=0)
 
@@ -29,9 +77,14 @@ class MultiCityFlightSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         legs_data = validated_data.pop('legs')
-        multi_city_flight = MultiCityFlight.objects.create(**validated_data)
-        for leg_data in legs_data:
-            MultiCityFlightLeg.objects.create(multi_city_flight=multi_city_flight, **leg_data)
+        with transaction.atomic():
+            multi_city_flight = MultiCityFlight.objects.create(**validated_data)
+            legs = [
+                MultiCityFlightLeg.objects.create(multi_city_flight=multi_city_flight, **intern_new_locations(leg_data))
+                for leg_data in legs_data
+            ]
+        # Representing the search and its email reads the legs from here, not the database.
+        multi_city_flight._prefetched_objects_cache = {'legs': legs}
         return multi_city_flight
 
     def validate(self, data):
@@ -47,6 +100,23 @@ class MultiCityFlightSerializer(serializers.ModelSerializer):
         return data
 
 
+class ItineraryOptimizeSerializer(serializers.Serializer):
+    legs = MultiCityFlightLegSerializer(many=True)
+
+    def validate_legs(self, legs):
+        if not legs:
+            raise serializers.ValidationError("At least one flight leg is required.")
+        max_legs = getattr(settings, 'ITINERARY_MAX_LEGS', 30)
+        if len(legs) > max_legs:
+            raise serializers.ValidationError(f"At most {max_legs} legs can be optimized.")
+        return legs
+
+
+class SearchWatchSerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=['flight', 'hotel'])
+    id = serializers.IntegerField(min_value=1)
+
+
 #authentication serializers
 class UserRegisterSerializer(serializers.Serializer):
     first_name = serializers.CharField(max_length=100)
@@ -88,25 +158,26 @@ class OTPSerializer(serializers.Serializer):
 #main api's serializers
 
 #Hotel serializer
-class HotelSerializer(serializers.ModelSerializer):
+class HotelSerializer(LocationModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
+    place = LocationField()
 
     class Meta:
         model = Hotel
         fields = ['id', 'place', 'checkin_date', 'checkout_date', 'adults', 'children', 'rooms', 'customer_name', 'phone_number', 'user', 'user_email', 'coupon']
         read_only_fields = ['user', 'coupon', 'customer_name', 'phone_number']
 
-class HotelListSerializer(serializers.ModelSerializer):
+class HotelListSerializer(LocationModelSerializer):
     checkin_date = serializers.DateField(required=True, help_text="Format: YYYY-MM-DD")
     checkout_date = serializers.DateField(required=True, help_text="Format: YYYY-MM-DD")
     childrens = serializers.IntegerField(source='children', default=0)
     adults = serializers.IntegerField(default=0)
     rooms = serializers.IntegerField(default=0)
-    place = serializers.CharField(required=True)
+    place = LocationField(required=True)
 
     class Meta:
         model = Hotel
-        fields = ['customer_name', 'phone_number', 'place', 'checkin_date', 'checkout_date', 'adults', 'childrens', 'rooms', 'coupon']
+        fields = ['id', 'customer_name', 'phone_number', 'place', 'checkin_date', 'checkout_date', 'adults', 'childrens', 'rooms', 'coupon']
         read_only_fields = ['coupon', 'customer_name', 'phone_number']
 
     def validate(self, data):
@@ -127,8 +198,10 @@ class HotelListSerializer(serializers.ModelSerializer):
 
 #Flight serializer
 
-class FlightSerializer(serializers.ModelSerializer):
+class FlightSerializer(LocationModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
+    from_location = LocationField()
+    to_location = LocationField()
 
     class Meta:
         model = Flight
@@ -136,9 +209,9 @@ class FlightSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'coupon', 'customer_name', 'phone_number']
 
 
-class FlightListSerializer(serializers.ModelSerializer):
-    from_location = serializers.CharField(required=True)
-    to_location = serializers.CharField(required=True)
+class FlightListSerializer(LocationModelSerializer):
+    from_location = LocationField(required=True)
+    to_location = LocationField(required=True)
     departure_date = serializers.DateField(help_text="Format: YYYY-MM-DD", required=False)
     return_date = serializers.DateField(help_text="Format: YYYY-MM-DD", required=False)
     childrens = serializers.IntegerField(source='children', default=0)
@@ -146,7 +219,7 @@ class FlightListSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Flight
-        fields = ['customer_name', 'phone_number', 'from_location', 'to_location', 'round_trip', 'one_way', 'departure_date', 'return_date', 'adults', 'childrens', 'coupon']
+        fields = ['id', 'customer_name', 'phone_number', 'from_location', 'to_location', 'round_trip', 'one_way', 'departure_date', 'return_date', 'adults', 'childrens', 'coupon']
         read_only_fields = ['coupon', 'customer_name', 'phone_number']
 
     def validate(self, data):
@@ -179,8 +252,9 @@ class FlightListSerializer(serializers.ModelSerializer):
 
 #Rental Car serializer
 
-class RentalCarSerializer(serializers.ModelSerializer):
+class RentalCarSerializer(LocationModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
+    location = LocationField()
 
     class Meta:
         model = RentalCar
@@ -188,8 +262,8 @@ class RentalCarSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'coupon', 'customer_name', 'phone_number']
 
 
-class RentalCarListSerializer(serializers.ModelSerializer):
-    location = serializers.CharField(required=True)
+class RentalCarListSerializer(LocationModelSerializer):
+    location = LocationField(required=True)
     pickup_time = serializers.DateTimeField(required=True, help_text="Format: YYYY-MM-DD HH:MM:SS")
     dropoff_time = serializers.DateTimeField(required=True, help_text="Format: YYYY-MM-DD HH:MM:SS")
   
@@ -202,8 +276,10 @@ class RentalCarListSerializer(serializers.ModelSerializer):
 
 #Holiday Package serializer
 
-class HolidayPackageSerializer(serializers.ModelSerializer):
+class HolidayPackageSerializer(LocationModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
+    to_location = LocationField()
+    from_location = LocationField()
 
     class Meta:
         model = HolidayPackage
@@ -211,9 +287,9 @@ class HolidayPackageSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'coupon', 'customer_name', 'phone_number']
 
 
-class HolidayPackageListSerializer(serializers.ModelSerializer):
-    to_location = serializers.CharField(required=True)
-    from_location = serializers.CharField(required=True)
+class HolidayPackageListSerializer(LocationModelSerializer):
+    to_location = LocationField(required=True)
+    from_location = LocationField(required=True)
     duration = serializers.IntegerField(default=0)
     adults = serializers.IntegerField(default=0)
     children = serializers.IntegerField(default=0)
@@ -239,8 +315,10 @@ class HolidayPackageListSerializer(serializers.ModelSerializer):
 
 
 #Cruise serializer
-class CruiseSerializer(serializers.ModelSerializer):
+class CruiseSerializer(LocationModelSerializer):
     user_email = serializers.EmailField(source='user.email', read_only=True)
+    to_location = LocationField()
+    from_location = LocationField()
 
     class Meta:
         model = Cruise
@@ -248,9 +326,9 @@ class CruiseSerializer(serializers.ModelSerializer):
         read_only_fields = ['user', 'coupon', 'customer_name', 'phone_number']
 
 
-class CruiseListSerializer(serializers.ModelSerializer):
-    to_location = serializers.CharField(required=True)
-    from_location = serializers.CharField(required=True)
+class CruiseListSerializer(LocationModelSerializer):
+    to_location = LocationField(required=True)
+    from_location = LocationField(required=True)
     duration = serializers.IntegerField(default=0)
     cabins = serializers.CharField(required=True, allow_blank=False)
     adults = serializers.IntegerField(default=0)
@@ -274,3 +352,33 @@ class CruiseListSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"duration": "Duration must be at least 1 day."})
             
         return data
+
+
+#location serializers
+class LocationAutocompleteQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=100, trim_whitespace=False)
+    scope = serializers.ChoiceField(choices=['all', 'hotel', 'flight', 'cruise', 'package', 'rental_car'], default='all')
+    limit = serializers.IntegerField(min_value=1, max_value=20, default=10)
+
+class RelatedDestinationsQuerySerializer(serializers.Serializer):
+    location = serializers.CharField(max_length=255)
+    limit = serializers.IntegerField(min_value=1, max_value=20, default=10)
+
+class TrendingQuerySerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=['routes', 'hotels', 'cruises'], default='routes')
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+#analytics serializers
+class DemandHeatmapQuerySerializer(serializers.Serializer):
+    kind = serializers.ChoiceField(choices=['routes', 'hotels'], default='routes')
+    start = serializers.DateField(required=False, help_text="Format: YYYY-MM-DD")
+    end = serializers.DateField(required=False, help_text="Format: YYYY-MM-DD")
+    top = serializers.IntegerField(required=False, min_value=1, max_value=1000, default=50)
+
+    def validate(self, data):
+        start = data.get('start')
+        end = data.get('end')
+        if start and end and end < start:
+            raise serializers.ValidationError({"end": "End date must be on or after the start date."})
+        return data
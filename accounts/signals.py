@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+
+from . import metrics, profiles, recommendations, rollups, trending
+
+
+def update_rollups_on_insert(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        rollups.record(instance)
+
+
+def update_recommendations_on_insert(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        recommendations.record(instance)
+
+
+def update_trending_on_insert(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        trending.record(instance)
+
+
+def invalidate_profile_on_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        profiles.invalidate_profile(instance.pk)
+
+
+def connect_signals():
+    if getattr(settings, 'ROLLUP_UPDATE_ON_SAVE', True):
+        for model in rollups.SOURCES_BY_MODEL:
+            post_save.connect(update_rollups_on_insert, sender=model, dispatch_uid=f'rollups:{model._meta.label_lower}')
+    for model in recommendations.RECOMMENDATION_SOURCES:
+        post_save.connect(
+            update_recommendations_on_insert, sender=model,
+            dispatch_uid=f'recommendations:{model._meta.label_lower}',
+        )
+    for model in trending.TRENDING_SOURCES:
+        post_save.connect(update_trending_on_insert, sender=model, dispatch_uid=f'trending:{model._meta.label_lower}')
+    for model in profiles.PROFILE_SOURCES:
+        post_save.connect(invalidate_profile_on_change, sender=model, dispatch_uid=f'profiles:{model._meta.label_lower}')
+        post_delete.connect(
+            invalidate_profile_on_change, sender=model, dispatch_uid=f'profiles-delete:{model._meta.label_lower}',
+        )
+    connection_created.connect(metrics.install_query_wrapper, dispatch_uid='metrics:queries')
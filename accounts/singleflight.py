@@ -0,0 +1,55 @@
+"""
+Single-flight execution: concurrent calls for the same key share one run.
+
+The first caller for a key (the leader) runs the function; callers arriving
+while it runs wait for its result instead of repeating the work. This only
+covers threads of one process; search.py adds a cache lock on top of it to
+coalesce across workers.
+"""
+import threading
+
+
+class CoalesceTimeout(Exception):
+    pass
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, timeout=None):
+        """Returns (result, shared); `shared` is True for callers that waited on a leader."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as error:
+                call.error = error
+                raise
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+            return call.result, False
+
+        if not call.done.wait(timeout):
+            raise CoalesceTimeout(key)
+        if call.error is not None:
+            raise call.error
+        return call.result, True
+
+    def __len__(self):
+        return len(self._calls)
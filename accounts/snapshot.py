@@ -0,0 +1,336 @@
+"""
+Columnar snapshots of the booking tables for offline analytics.
+
+Layout of a snapshot directory:
+
+    manifest.json                       tables, columns, parts and last exported id
+    dict_<name>.npy                     string dictionaries (code -> value)
+    <table>/part-00000/<column>.npy     one typed array per column
+
+Each export run appends one part per table with the rows whose primary key is
+past the manifest's `last_id`. Dates are int32 day numbers since 1970-01-01,
+datetimes int64 epoch seconds, locations their int32 Location id (the
+`location` dictionary is indexed by id) and other strings int32 dictionary codes.
+`load_snapshot` memory-maps every array, so opening a snapshot copies nothing.
+
+Parts become visible only through the manifest, which is written last. A run
+that dies before that leaves part directories the manifest does not list;
+the next export removes them and exports their rows again.
+"""
+import json
+import os
+import shutil
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+from django.db import connections
+
+from .models import Hotel, Flight, RentalCar, HolidayPackage, Cruise, MultiCityFlight, MultiCityFlightLeg, Location
+
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+NULL_ID = -1
+NULL_INT32 = np.iinfo(np.int32).min
+NULL_INT64 = np.iinfo(np.int64).min
+
+# Column kinds: 'id' (int64), 'int' (int32), 'bool', 'day' (int32), 'timestamp' (int64),
+# 'location' (int32 Location id), or the name of a string dictionary.
+SNAPSHOT_TABLES = {
+    'hotel': (Hotel, [
+        ('id', 'id'), ('user', 'id'), ('place', 'location'), ('checkin_date', 'day'), ('checkout_date', 'day'),
+        ('adults', 'int'), ('children', 'int'), ('rooms', 'int'), ('created_at', 'timestamp'),
+    ]),
+    'flight': (Flight, [
+        ('id', 'id'), ('user', 'id'), ('round_trip', 'bool'), ('one_way', 'bool'),
+        ('from_location', 'location'), ('to_location', 'location'), ('departure_date', 'day'), ('return_date', 'day'),
+        ('adults', 'int'), ('children', 'int'), ('created_at', 'timestamp'),
+    ]),
+    'rental_car': (RentalCar, [
+        ('id', 'id'), ('user', 'id'), ('location', 'location'),
+        ('pickup_time', 'timestamp'), ('dropoff_time', 'timestamp'), ('created_at', 'timestamp'),
+    ]),
+    'holiday_package': (HolidayPackage, [
+        ('id', 'id'), ('user', 'id'), ('from_location', 'location'), ('to_location', 'location'),
+        ('duration', 'int'), ('adults', 'int'), ('children', 'int'), ('created_at', 'timestamp'),
+    ]),
+    'cruise': (Cruise, [
+        ('id', 'id'), ('user', 'id'), ('from_location', 'location'), ('to_location', 'location'),
+        ('duration', 'int'), ('cabins', 'cabins'), ('adults', 'int'), ('children', 'int'), ('created_at', 'timestamp'),
+    ]),
+    'multi_city_flight': (MultiCityFlight, [
+        ('id', 'id'), ('user', 'id'), ('adults', 'int'), ('children', 'int'), ('created_at', 'timestamp'),
+    ]),
+    'multi_city_flight_leg': (MultiCityFlightLeg, [
+        ('id', 'id'), ('multi_city_flight', 'id'), ('from_location', 'location'), ('to_location', 'location'),
+        ('departure_date', 'day'),
+    ]),
+}
+
+SCALAR_KINDS = {'id', 'int', 'bool', 'day', 'timestamp', 'location'}
+
+
+# --- Read side ---
+
+def open_readonly_connection(using='default'):
+    """
+    Open the database without taking write locks. SQLite files are opened with
+    `mode=ro`; other backends fall back to Django's connection.
+    """
+    settings_dict = connections[using].settings_dict
+    if settings_dict['ENGINE'] == 'django.db.backends.sqlite3':
+        uri = Path(settings_dict['NAME']).resolve().as_uri() + '?mode=ro'
+        return sqlite3.connect(uri, uri=True)
+    return connections[using]
+
+
+def iter_chunks(conn, model, columns, after_id=0, chunk_size=50000):
+    """Yield lists of row tuples with pk > after_id, using keyset pagination."""
+    table = conn.ops.quote_name(model._meta.db_table) if hasattr(conn, 'ops') else f'"{model._meta.db_table}"'
+    pk_column = model._meta.pk.column
+    db_columns = ', '.join(model._meta.get_field(name).column for name in columns)
+    placeholder = '%s' if hasattr(conn, 'ops') else '?'
+    sql = (
+        f'SELECT {db_columns} FROM {table} WHERE {pk_column} > {placeholder} '
+        f'ORDER BY {pk_column} LIMIT {placeholder}'
+    )
+    last_id = after_id
+    while True:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql, [last_id, chunk_size])
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+# --- Encoding ---
+
+class Dictionary:
+    """Append-only string dictionary; codes stay stable across incremental exports."""
+
+    def __init__(self, values=()):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def encode(self, column):
+        codes = self.codes
+        values = self.values
+
+        def code_for(value):
+            if value is None:
+                return NULL_INT32
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(values)
+                values.append(value)
+            return code
+
+        return np.fromiter((code_for(value) for value in column), dtype=np.int32, count=len(column))
+
+    def to_array(self):
+        return np.array(self.values, dtype=str) if self.values else np.zeros(0, dtype='<U1')
+
+
+def _encode_scalar(kind, column):
+    if kind in ('id', 'int', 'bool', 'location'):
+        null = {'id': NULL_ID, 'int': NULL_INT32, 'bool': False, 'location': NULL_INT32}[kind]
+        dtype = {'id': np.int64, 'int': np.int32, 'bool': np.bool_, 'location': np.int32}[kind]
+        return np.array([null if value is None else value for value in column], dtype=dtype)
+    unit = 'D' if kind == 'day' else 's'
+    # SQLite hands back ISO strings, other backends date/datetime objects; NumPy parses both.
+    values = np.array(column, dtype=f'datetime64[{unit}]').view(np.int64)
+    if kind == 'day':
+        return np.where(values == NULL_INT64, NULL_INT32, values).astype(np.int32)
+    return values
+
+
+def _column_dtype(kind):
+    return {
+        'id': 'int64', 'int': 'int32', 'bool': 'bool', 'day': 'int32', 'timestamp': 'int64', 'location': 'int32',
+    }.get(kind, 'int32')
+
+
+# --- Export ---
+
+def _read_manifest(path):
+    manifest_path = path / 'manifest.json'
+    if manifest_path.exists():
+        return json.loads(manifest_path.read_text())
+    return {'version': SNAPSHOT_FORMAT_VERSION, 'tables': {}, 'dictionaries': []}
+
+
+def _write_manifest(path, manifest):
+    tmp = path / 'manifest.json.tmp'
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    os.replace(tmp, path / 'manifest.json')
+
+
+def _remove_orphans(path, manifest):
+    """Delete part directories (and temporary ones) that the manifest does not list."""
+    for name in SNAPSHOT_TABLES:
+        table_dir = path / name
+        if not table_dir.is_dir():
+            continue
+        listed = set(manifest['tables'].get(name, {}).get('parts', ()))
+        for entry in table_dir.iterdir():
+            if entry.is_dir() and entry.name not in listed:
+                shutil.rmtree(entry)
+
+
+def _load_dictionaries(path, manifest):
+    dictionaries = {}
+    for name in manifest['dictionaries']:
+        if name != 'location':
+            dictionaries[name] = Dictionary(np.load(path / f'dict_{name}.npy').tolist())
+    return dictionaries
+
+
+def _location_dictionary(conn):
+    """Location names laid out by id, so a location column indexes it directly."""
+    rows = list(iter_all(conn, Location, ['id', 'name']))
+    names = [''] * (max((row[0] for row in rows), default=-1) + 1)
+    for location_id, name in rows:
+        names[location_id] = name
+    return Dictionary(names)
+
+
+def iter_all(conn, model, columns, chunk_size=50000):
+    for rows in iter_chunks(conn, model, columns, 0, chunk_size):
+        yield from rows
+
+
+def export_table(conn, path, name, manifest, dictionaries, chunk_size=50000):
+    model, columns = SNAPSHOT_TABLES[name]
+    table_entry = manifest['tables'].setdefault(name, {
+        'columns': {column: _column_dtype(kind) for column, kind in columns},
+        'encodings': {column: kind for column, kind in columns},
+        'parts': [],
+        'rows': 0,
+        'last_id': 0,
+    })
+
+    chunks = {column: [] for column, _ in columns}
+    exported = 0
+    for rows in iter_chunks(conn, model, [column for column, _ in columns], table_entry['last_id'], chunk_size):
+        for index, (column, kind) in enumerate(columns):
+            values = [row[index] for row in rows]
+            if kind in SCALAR_KINDS:
+                chunks[column].append(_encode_scalar(kind, values))
+            else:
+                dictionary = dictionaries.setdefault(kind, Dictionary())
+                chunks[column].append(dictionary.encode(values))
+        exported += len(rows)
+
+    if not exported:
+        return 0
+
+    part = f'part-{len(table_entry["parts"]):05d}'
+    final_dir = path / name / part
+    tmp_dir = path / name / f'.{part}.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    tmp_dir.mkdir(parents=True)
+    for column, arrays in chunks.items():
+        np.save(tmp_dir / f'{column}.npy', np.concatenate(arrays))
+    os.replace(tmp_dir, final_dir)
+
+    table_entry['parts'].append(part)
+    table_entry['rows'] += exported
+    table_entry['last_id'] = int(chunks['id'][-1][-1])
+    return exported
+
+
+def export_snapshot(path, tables=None, chunk_size=50000, using='default'):
+    """
+    Append rows newer than the last export to the snapshot at `path`.
+    Returns {table: rows exported}.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(path)
+    _remove_orphans(path, manifest)
+    dictionaries = _load_dictionaries(path, manifest)
+
+    conn = open_readonly_connection(using)
+    try:
+        results = {}
+        for name in tables or SNAPSHOT_TABLES:
+            results[name] = export_table(conn, path, name, manifest, dictionaries, chunk_size)
+        dictionaries['location'] = _location_dictionary(conn)
+    finally:
+        if isinstance(conn, sqlite3.Connection):
+            conn.close()
+
+    # Dictionaries are written before the manifest that references them.
+    for name, dictionary in dictionaries.items():
+        tmp = path / f'dict_{name}.tmp.npy'
+        np.save(tmp, dictionary.to_array())
+        os.replace(tmp, path / f'dict_{name}.npy')
+    manifest['dictionaries'] = sorted(dictionaries)
+    _write_manifest(path, manifest)
+    return results
+
+
+# --- Load ---
+
+def _open_array(path):
+    try:
+        return np.load(path, mmap_mode='r')
+    except ValueError:
+        # Zero-length arrays cannot be memory-mapped.
+        return np.load(path)
+
+
+class SnapshotTable:
+    def __init__(self, path, name, entry, dictionaries):
+        self.name = name
+        self.rows = entry['rows']
+        self.encodings = entry['encodings']
+        self.dictionaries = dictionaries
+        self.parts = [
+            {column: _open_array(path / name / part / f'{column}.npy') for column in entry['columns']}
+            for part in entry['parts']
+        ]
+
+    def column(self, name):
+        """A single part is returned as its memmap; several parts are concatenated (one copy)."""
+        arrays = [part[name] for part in self.parts]
+        if not arrays:
+            return np.zeros(0, dtype=_column_dtype(self.encodings[name]))
+        return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+    def decode(self, name, codes=None):
+        """Map dictionary codes of a column back to strings."""
+        codes = self.column(name) if codes is None else codes
+        values = self.dictionaries[self.encodings[name]]
+        if not len(values):
+            return np.full(len(codes), '')
+        return np.where(codes == NULL_INT32, '', values[np.clip(codes, 0, None)])
+
+    def __repr__(self):
+        return f'<SnapshotTable {self.name}: {self.rows} rows in {len(self.parts)} parts>'
+
+
+class Snapshot:
+    def __init__(self, path):
+        path = Path(path)
+        manifest = _read_manifest(path)
+        self.dictionaries = {
+            name: _open_array(path / f'dict_{name}.npy') for name in manifest['dictionaries']
+        }
+        self.tables = {
+            name: SnapshotTable(path, name, entry, self.dictionaries)
+            for name, entry in manifest['tables'].items()
+        }
+
+    def __getitem__(self, name):
+        return self.tables[name]
+
+
+def load_snapshot(path):
+    return Snapshot(path)
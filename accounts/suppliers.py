@@ -0,0 +1,125 @@
+"""
+Supplier adapters for live availability.
+
+A supplier answers `asearch(client, kind, query)` with a list of offers, where
+`kind` is one of SEARCH_KINDS, `client` is the shared httpx.AsyncClient and
+`query` is the canonical search payload built in search.py (locations as
+normalized names, dates as ISO strings). Suppliers are configured in
+settings.SEARCH_SUPPLIERS, in the same shape as Django's CACHES/TEMPLATES:
+
+    SEARCH_SUPPLIERS = [
+        {'BACKEND': 'accounts.suppliers.HttpSupplier', 'NAME': 'air-a',
+         'OPTIONS': {'url': 'http://127.0.0.1:8101', 'timeout': 1.5}},
+    ]
+
+StubSupplier returns deterministic fake offers after a configurable delay so
+the search path can be exercised locally and in tests without a real provider;
+`manage.py run_stub_supplier` serves one over HTTP for HttpSupplier.
+"""
+import asyncio
+import hashlib
+import random
+import time
+
+import httpx
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+SEARCH_KINDS = ('flight', 'hotel', 'rental_car', 'cruise')
+
+
+class SupplierError(Exception):
+    pass
+
+
+class Supplier:
+    kinds = SEARCH_KINDS
+
+    def __init__(self, name, timeout=None, kinds=None):
+        self.name = name
+        # Seconds this supplier may take; None falls back to SEARCH_SUPPLIER_TIMEOUT.
+        self.timeout = timeout
+        if kinds is not None:
+            self.kinds = tuple(kinds)
+
+    def supports(self, kind):
+        return kind in self.kinds
+
+    def search(self, kind, query):
+        raise NotImplementedError
+
+    async def asearch(self, client, kind, query):
+        # Blocking adapters run in a thread so they don't stall the other suppliers.
+        return await asyncio.to_thread(self.search, kind, query)
+
+    def __repr__(self):
+        return f'<{type(self).__name__} {self.name}>'
+
+
+class StubSupplier(Supplier):
+    """Fake offers seeded from the query, so the same search always gets the same answer."""
+
+    def __init__(self, name, latency=0.0, offers=5, failure_rate=0.0, currency='USD', **options):
+        super().__init__(name, **options)
+        self.latency = latency
+        self.offers = offers
+        self.failure_rate = failure_rate
+        self.currency = currency
+
+    def _seed(self, kind, query):
+        text = f"{self.name}|{kind}|{sorted(query.items())}"
+        return int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], 'big')
+
+    def _results(self, kind, query):
+        if self.failure_rate and random.random() < self.failure_rate:
+            raise SupplierError(f"{self.name} is unavailable")
+        rng = random.Random(self._seed(kind, query))
+        return [
+            {
+                'supplier': self.name,
+                'offer_id': f"{self.name}-{rng.getrandbits(32):08x}",
+                'price': round(rng.uniform(40, 1500), 2),
+                'currency': self.currency,
+            }
+            for _ in range(self.offers)
+        ]
+
+    def search(self, kind, query):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._results(kind, query)
+
+    async def asearch(self, client, kind, query):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._results(kind, query)
+
+
+class HttpSupplier(Supplier):
+    """A provider reached over HTTP: POST {url}/{kind}/ with the query as JSON, answered with {"offers": [...]}."""
+
+    def __init__(self, name, url, headers=None, **options):
+        super().__init__(name, **options)
+        self.url = url.rstrip('/')
+        self.headers = headers or {}
+
+    def _offers(self, response):
+        response.raise_for_status()
+        return response.json()['offers']
+
+    def search(self, kind, query):
+        response = httpx.post(f'{self.url}/{kind}/', json=query, headers=self.headers, timeout=self.timeout)
+        return self._offers(response)
+
+    async def asearch(self, client, kind, query):
+        response = await client.post(f'{self.url}/{kind}/', json=query, headers=self.headers)
+        return self._offers(response)
+
+
+def load_suppliers(config=None):
+    config = getattr(settings, 'SEARCH_SUPPLIERS', []) if config is None else config
+    return [
+        import_string(entry['BACKEND'])(entry.get('NAME') or entry['BACKEND'], **entry.get('OPTIONS', {}))
+        for entry in config
+    ]
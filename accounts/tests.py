@@ -0,0 +1,356 @@
+import json
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from importlib import import_module
+from io import StringIO
+from itertools import permutations
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+from uuid import UUID
+
+import numpy
+from asgiref.sync import async_to_sync
+
+from django.apps import apps
+from django.contrib.admin import site
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import locations, metrics, rollups
+from .dedup import aexisting_search, existing_search, remember
+from .itinerary import held_karp, optimize_itinerary, stub_fare, tour_cost
+from .locations import intern_location, lookup_location
+from .models import (
+    User, Location, Hotel, DailyBookingStat, DailyRouteStat, RollupCursor, UserDestination, DestinationPair,
+)
+from .projection import Projection, parse_fields
+from .renderers import ORJSONRenderer
+from .resolver import LocationResolver, canonicalize_locations, location_resolver, merge_location
+from .snapshot import export_snapshot, load_snapshot
+
+
+def searched(location, count):
+    DailyRouteStat.objects.create(day=date(2026, 1, 1), booking_type='hotel', destination=location, count=count)
+
+
+class LocationResolverTests(TestCase):
+    def test_exact_and_alias(self):
+        resolver = LocationResolver([('New York', 50)], {'NYC': 'New York'})
+        self.assertEqual(resolver.canonical_name('new  york'), 'New York')
+        self.assertEqual(resolver.canonical_name('NYC'), 'New York')
+
+    def test_long_word_is_corrected(self):
+        resolver = LocationResolver([('Hyderabad', 5)])
+        self.assertEqual(resolver.canonical_name('Hyderbad'), 'Hyderabad')
+
+    def test_close_call_is_only_suggested(self):
+        resolver = LocationResolver([('Jaipur', 10)], counts={'raipur': 4})
+        self.assertIsNone(resolver.canonical_name('Raipur'))
+        self.assertEqual(resolver.suggestion('Raipur'), 'Jaipur')
+        self.assertEqual(resolver.resolve('Raipur'), 'Raipur')
+
+    def test_frequency_margin_corrects_short_words(self):
+        resolver = LocationResolver([('Dubai', 200)], counts={'dubay': 1})
+        self.assertEqual(resolver.canonical_name('Dubay'), 'Dubai')
+
+
+@override_settings(LOCATION_CANONICAL_MIN_SEARCHES=3, LOCATION_ALIASES={'BLR': 'Bengaluru'})
+class CanonicalizeLocationsTests(TestCase):
+    def setUp(self):
+        self.hyderabad = Location.objects.create(key='hyderabad', name='Hyderabad')
+        self.typo = Location.objects.create(key='hyderbad', name='Hyderbad')
+        self.jaipur = Location.objects.create(key='jaipur', name='Jaipur')
+        self.raipur = Location.objects.create(key='raipur', name='Raipur')
+        self.blr = Location.objects.create(key='blr', name='BLR')
+        searched(self.hyderabad, 10)
+        searched(self.typo, 1)
+        searched(self.jaipur, 10)
+        searched(self.raipur, 2)
+        self.booking = Hotel.objects.create(place=self.typo)
+
+    def test_dry_run_changes_nothing(self):
+        merges, suggestions = canonicalize_locations(dry_run=True)
+        self.assertCountEqual(
+            [(source.name, target.name) for source, target in merges],
+            [('Hyderbad', 'Hyderabad'), ('BLR', 'Bengaluru')],
+        )
+        self.assertEqual([(source.name, target.name) for source, target in suggestions], [('Raipur', 'Jaipur')])
+        self.assertFalse(Location.objects.filter(key='bengaluru').exists())
+        self.assertFalse(Location.objects.filter(canonical__isnull=False).exists())
+
+    def test_merges_clear_cases_only(self):
+        canonicalize_locations()
+        self.typo.refresh_from_db()
+        self.raipur.refresh_from_db()
+        self.assertEqual(self.typo.canonical, self.hyderabad)
+        self.assertIsNone(self.raipur.canonical)
+        self.assertEqual(Location.objects.get(key='blr').canonical.name, 'Bengaluru')
+        self.booking.refresh_from_db()
+        self.assertEqual(self.booking.place, self.hyderabad)
+        # The seeded counts plus the booking's own rollup row, all moved over.
+        self.assertEqual(sum(DailyRouteStat.objects.filter(destination=self.hyderabad).values_list('count', flat=True)), 12)
+        self.assertFalse(DailyRouteStat.objects.filter(destination=self.typo).exists())
+
+    def test_command_lists_suggestions(self):
+        out = StringIO()
+        call_command('canonicalize_locations', '--dry-run', stdout=out)
+        self.assertIn('Would merge 2 locations.', out.getvalue())
+        self.assertIn('Raipur -> Jaipur?', out.getvalue())
+
+    def test_admin_merges_suggestion(self):
+        location_resolver.rebuild()
+        admin = User.objects.create(email='staff@example.com', is_staff=True, is_superuser=True)
+        self.client.force_login(admin)
+        url = reverse('admin:accounts_location_changelist')
+        self.assertEqual(site._registry[Location].suggested(self.raipur), 'Jaipur')
+        self.client.post(url, {'action': 'merge_suggested', '_selected_action': [self.raipur.pk]})
+        self.raipur.refresh_from_db()
+        self.assertEqual(self.raipur.canonical, self.jaipur)
+
+
+class LocationCacheTests(TestCase):
+    def test_merge_elsewhere_invalidates_cache(self):
+        source = intern_location('Bombay')
+        target = Location.objects.create(key='mumbai', name='Mumbai')
+        self.assertEqual(lookup_location('bombay').pk, source.pk)
+        # Another worker merges: its own cache is cleared, ours only sees the version move.
+        merge_location(source, target)
+        self.assertEqual(lookup_location('bombay').pk, source.pk)
+        locations._bump_version()
+        self.assertEqual(lookup_location('bombay').pk, target.pk)
+
+
+class MetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token_required(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'worker="{metrics.publisher.worker}"', response.content.decode())
+
+    @override_settings(METRICS_TOKEN=None)
+    def test_staff_only_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        self.client.force_login(User.objects.create(email='user@example.com'))
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+        self.client.force_login(User.objects.create(email='staff@example.com', is_staff=True))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_workers_keep_their_own_slots(self):
+        other = metrics.MetricsPublisher()
+        other.worker = 'elsewhere:1'
+        other.publish()
+        metrics.publisher.publish()
+        self.assertNotEqual(other.slot, metrics.publisher.slot)
+        workers = metrics.publisher.collect()
+        self.assertEqual(set(workers), {'elsewhere:1', metrics.publisher.worker})
+        text = metrics.prometheus_text(workers)
+        self.assertIn('worker="elsewhere:1"', text)
+
+
+class ProjectionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='me@example.com', first_name='Ada', is_onboarding_completed=True)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+
+    def test_parse_and_apply(self):
+        projection = Projection(parse_fields(['message', 'data.place', 'data.coupon']))
+        body = {'message': 'ok', 'data': {'place': 'Goa', 'coupon': None, 'adults': 2}, 'extra': 1}
+        self.assertEqual(projection.apply(body), {'message': 'ok', 'data': {'place': 'Goa', 'coupon': None}})
+        self.assertEqual(projection.fields('data'), {'place', 'coupon'})
+        self.assertFalse(projection.wants('extra'))
+        self.assertTrue(Projection().wants('extra'))
+        self.assertFalse(Projection().asks_for('availability'))
+
+    def test_me_fields(self):
+        response = self.client.get('/api/accounts/me/?fields=first_name', **self.auth)
+        self.assertEqual(response.json(), {'first_name': 'Ada'})
+        full = self.client.get('/api/accounts/me/', **self.auth)
+        self.assertNotEqual(response['ETag'], full['ETag'])
+        again = self.client.get('/api/accounts/me/?fields=first_name', HTTP_IF_NONE_MATCH=response['ETag'], **self.auth)
+        self.assertEqual(again.status_code, 304)
+
+    def test_me_minimal(self):
+        response = self.client.get('/api/accounts/me/', HTTP_PREFER='return=minimal', **self.auth)
+        self.assertEqual(response.json(), {'email': 'me@example.com'})
+        self.assertEqual(response['Preference-Applied'], 'return=minimal')
+        self.assertIn('Prefer', response['Vary'])
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.goa = Location.objects.create(key='goa', name='Goa')
+        # bulk_create skips the post_save signals, so only the delta job counts these.
+        Hotel.objects.bulk_create([Hotel(place=self.goa) for _ in range(3)])
+        Hotel.objects.filter(pk=Hotel.objects.order_by('pk').first().pk).update(created_at=None)
+
+    def stats(self):
+        return (
+            sorted(DailyBookingStat.objects.values_list('day', 'booking_type', 'count')),
+            sorted(DailyRouteStat.objects.values_list('day', 'booking_type', 'origin_id', 'destination_id', 'count')),
+        )
+
+    def test_delta_advances_cursor(self):
+        self.assertEqual(rollups.update_rollups(chunk_size=2)['hotel'], 3)
+        self.assertEqual(RollupCursor.objects.get(source='hotel').last_id, Hotel.objects.latest('pk').pk)
+        # The row without created_at is passed over, not counted on today.
+        self.assertEqual(DailyBookingStat.objects.get(booking_type='hotel').count, 2)
+
+        Hotel.objects.bulk_create([Hotel(place=self.goa)])
+        self.assertEqual(rollups.update_rollups()['hotel'], 1)
+        self.assertEqual(rollups.update_rollups()['hotel'], 0)
+        self.assertEqual(DailyBookingStat.objects.get(booking_type='hotel').count, 3)
+        self.assertEqual(DailyRouteStat.objects.get(destination=self.goa).count, 3)
+
+    def test_backfill_matches_rebuild(self):
+        rollups.rebuild_rollups()
+        rebuilt = self.stats()
+        import_module('accounts.migrations.0035_backfill_rollups').backfill_rollups(apps, None)
+        self.assertEqual(self.stats(), rebuilt)
+        self.assertEqual(RollupCursor.objects.get(source='hotel').last_id, Hotel.objects.latest('pk').pk)
+
+
+class RecommendationBackfillTests(TestCase):
+    def test_backfill_counts_history(self):
+        goa, pune, agra = (Location.objects.create(key=name.lower(), name=name) for name in ('Goa', 'Pune', 'Agra'))
+        first, second = User.objects.create(email='one@example.com'), User.objects.create(email='two@example.com')
+        # Searches from before the signals existed, so nothing is counted yet.
+        Hotel.objects.bulk_create([
+            Hotel(user=first, place=goa), Hotel(user=first, place=pune), Hotel(user=first, place=goa),
+            Hotel(user=second, place=goa), Hotel(user=second, place=pune), Hotel(user=second, place=agra),
+        ])
+        self.assertFalse(DestinationPair.objects.exists())
+        import_module('accounts.migrations.0036_backfill_recommendations').backfill_recommendations(apps, None)
+        pairs = {(pair.location_id, pair.related_id): pair.count for pair in DestinationPair.objects.all()}
+        self.assertEqual(pairs[goa.pk, pune.pk], 2)
+        self.assertEqual(pairs[pune.pk, goa.pk], 2)
+        self.assertEqual(pairs[agra.pk, goa.pk], 1)
+        self.assertEqual(UserDestination.objects.count(), 5)
+
+
+class RendererTests(SimpleTestCase):
+    def test_matches_json_renderer(self):
+        data = {
+            'name': 'Goa', 'when': datetime(2026, 1, 2, 3, 4, 5, tzinfo=dt_timezone.utc), 'day': date(2026, 1, 2),
+            'price': Decimal('12.50'), 'label': gettext_lazy('Hotel'), 'nights': [1, 2.5, None],
+            'id': UUID(int=1), 'scores': numpy.array([1.5, 2.0]), 'line': 'a b',
+        }
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), json.loads(JSONRenderer().render(data)))
+        self.assertIn(b'\\u2028', ORJSONRenderer().render(data))
+
+    def test_rejects_nan_and_infinity(self):
+        for bad in ({'x': float('nan')}, [1, {'y': float('inf')}], {'z': numpy.array([1.0, numpy.nan])}):
+            with self.assertRaises(ValueError):
+                ORJSONRenderer().render(bad)
+        self.assertEqual(ORJSONRenderer().render({'coupon': None}), b'{"coupon":null}')
+
+
+class ItineraryTests(TestCase):
+    def leg(self, origin, destination, day):
+        return {
+            'from_location': Location(key=origin.lower(), name=origin),
+            'to_location': Location(key=destination.lower(), name=destination),
+            'departure_date': date(2026, 3, day),
+        }
+
+    def test_open_jaw_is_left_alone(self):
+        legs = [self.leg('Delhi', 'Goa', 1), self.leg('Mumbai', 'Pune', 4), self.leg('Pune', 'Delhi', 6)]
+        result = optimize_itinerary(legs)
+        self.assertEqual(result['method'], 'unchanged')
+        self.assertEqual(
+            [(leg['from_location'], leg['to_location'], leg['departure_date'].day) for leg in result['legs']],
+            [('Delhi', 'Goa', 1), ('Mumbai', 'Pune', 4), ('Pune', 'Delhi', 6)],
+        )
+        self.assertEqual(result['estimated_cost'], result['original_cost'])
+
+    def test_round_trip_keeps_home_and_dates(self):
+        cities = ['Delhi', 'Goa', 'Agra', 'Pune', 'Kochi', 'Delhi']
+        legs = [self.leg(a, b, day) for day, (a, b) in enumerate(zip(cities, cities[1:]), start=1)]
+        result = optimize_itinerary(legs)
+        self.assertEqual(result['method'], 'exact')
+        self.assertEqual(result['legs'][0]['from_location'], 'Delhi')
+        self.assertEqual(result['legs'][-1]['to_location'], 'Delhi')
+        self.assertEqual({leg['to_location'] for leg in result['legs']}, set(cities))
+        self.assertEqual([leg['departure_date'].day for leg in result['legs']], [1, 2, 3, 4, 5])
+        self.assertLessEqual(result['estimated_cost'], result['original_cost'])
+
+    def test_held_karp_is_optimal(self):
+        cost = [[0 if a == b else stub_fare(a, b) for b in range(6)] for a in range(6)]
+        for round_trip in (True, False):
+            best = min(tour_cost(cost, [0, *rest], round_trip) for rest in permutations(range(1, 6)))
+            self.assertAlmostEqual(tour_cost(cost, held_karp(cost, round_trip), round_trip), best)
+
+
+class SnapshotTests(TestCase):
+    def export(self, path):
+        # The read-only SQLite URI cannot reach the in-memory test database.
+        with mock.patch('accounts.snapshot.open_readonly_connection', return_value=connection):
+            return export_snapshot(path, ['hotel'])
+
+    def test_orphaned_part_is_replaced(self):
+        goa = Location.objects.create(key='goa', name='Goa')
+        Hotel.objects.bulk_create([Hotel(place=goa), Hotel(place=goa)])
+        with TemporaryDirectory() as path:
+            self.assertEqual(self.export(path), {'hotel': 2})
+            # A run that died between renaming its part and writing the manifest.
+            orphan = Path(path, 'hotel', 'part-00001')
+            orphan.mkdir()
+            (orphan / 'id.npy').write_bytes(b'partial')
+
+            latest = Hotel.objects.create(place=goa)
+            self.assertEqual(self.export(path), {'hotel': 1})
+            snapshot = load_snapshot(path)
+            self.assertEqual(snapshot['hotel'].rows, 3)
+            self.assertEqual(snapshot['hotel'].column('id')[-1], latest.pk)
+            self.assertEqual(snapshot.dictionaries['location'][snapshot['hotel'].column('place')[-1]], 'Goa')
+
+
+class SearchDedupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # Interned ids from earlier tests point at rolled-back rows.
+        locations.clear_location_cache()
+        self.user = User.objects.create(email='dedup@example.com', is_onboarding_completed=True)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(self.user).access_token}'}
+        self.search = {'place': 'Goa', 'checkin_date': '2026-11-01', 'checkout_date': '2026-11-03', 'adults': 2, 'rooms': 1}
+
+    def post(self, body, auth=None):
+        return self.client.post('/api/accounts/hotel/', body, content_type='application/json', **(auth or self.auth))
+
+    def test_repeat_returns_first_row(self):
+        first = self.post(self.search)
+        self.assertEqual(first.status_code, 201)
+        # Same search, spelled differently.
+        again = self.post(dict(self.search, place='  goa '))
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json()['data'], first.json()['data'])
+        self.assertEqual(Hotel.objects.count(), 1)
+
+    def test_different_search_or_user_saves(self):
+        self.post(self.search)
+        self.assertEqual(self.post(dict(self.search, adults=3)).status_code, 201)
+        other = User.objects.create(email='other@example.com', is_onboarding_completed=True)
+        self.assertEqual(self.post(self.search, {'HTTP_AUTHORIZATION': f'Bearer {RefreshToken.for_user(other).access_token}'}).status_code, 201)
+        self.assertEqual(Hotel.objects.count(), 3)
+
+    @override_settings(SEARCH_DEDUP_WAIT=0.1)
+    def test_pending_search_times_out(self):
+        key, row = existing_search(Hotel, self.user, {'place': 'Goa'})
+        self.assertIsNone(row)
+        # The first request never finished saving: the second gives up and saves its own.
+        self.assertEqual(async_to_sync(aexisting_search)(Hotel, self.user, {'place': 'Goa'}), (key, None))
+        hotel = Hotel.objects.create(user=self.user, place=Location.objects.create(key='goa', name='Goa'))
+        remember(key, hotel)
+        self.assertEqual(async_to_sync(aexisting_search)(Hotel, self.user, {'place': 'Goa'}), (key, hotel))
@@ -0,0 +1,157 @@
+"""
+"Trending now" routes, hotel places and cruise destinations.
+
+Each worker keeps one Space-Saving summary per list: at most TRENDING_CAPACITY
+counters, where a new item evicts the smallest counter and inherits its count
+(recorded as the item's possible overcount). Counts decay exponentially with a
+half-life of TRENDING_HALF_LIFE_HOURS; new hits are weighted up instead of old
+ones being scaled down, so an update touches a single counter.
+
+Every TRENDING_SYNC_SECONDS a worker publishes its summaries to the shared
+cache (see CACHES in settings) and readers merge the summaries of all workers
+that published recently. The worker registry is a plain read-modify-write, so a
+worker dropped by a concurrent publish is back on its next one. Reading never
+queries the booking tables, only the cache, once per TRENDING_SYNC_SECONDS.
+"""
+import math
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Flight, MultiCityFlightLeg, Hotel, Cruise
+
+
+TRENDING_KINDS = ('routes', 'hotels', 'cruises')
+TRENDING_SOURCES = (Flight, MultiCityFlightLeg, Hotel, Cruise)
+WORKERS_KEY = 'trending:workers'
+
+
+def _decay_rate():
+    return math.log(2) / (getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 6) * 3600)
+
+
+class SpaceSaving:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}  # item -> [weighted count, overcount]
+        self.landmark = time.time()
+
+    def _weight(self, now):
+        return math.exp(_decay_rate() * (now - self.landmark))
+
+    def _rescale(self, now):
+        # Keep weighted counts from overflowing by moving the landmark forward.
+        factor = self._weight(now)
+        for counter in self.counts.values():
+            counter[0] /= factor
+            counter[1] /= factor
+        self.landmark = now
+
+    def add(self, item, now=None):
+        now = now or time.time()
+        weight = self._weight(now)
+        if weight > 1e12:
+            self._rescale(now)
+            weight = 1.0
+
+        counter = self.counts.get(item)
+        if counter is not None:
+            counter[0] += weight
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = [weight, 0.0]
+        else:
+            smallest = min(self.counts, key=lambda key: self.counts[key][0])
+            floor = self.counts.pop(smallest)[0]
+            self.counts[item] = [floor + weight, floor]
+
+    def snapshot(self, now=None):
+        """{item: decayed count} as of `now`."""
+        now = now or time.time()
+        scale = math.exp(-_decay_rate() * (now - self.landmark))
+        return {item: count * scale for item, (count, _) in self.counts.items()}
+
+
+class TrendingTracker:
+    def __init__(self):
+        self.worker = f'{socket.gethostname()}:{os.getpid()}'
+        self._summaries = {}
+        self._lock = threading.Lock()
+        self._published_at = 0.0
+        self._merged = {}
+
+    def _summary(self, kind):
+        summary = self._summaries.get(kind)
+        if summary is None:
+            summary = self._summaries[kind] = SpaceSaving(getattr(settings, 'TRENDING_CAPACITY', 200))
+        return summary
+
+    def add(self, kind, item):
+        with self._lock:
+            self._summary(kind).add(item)
+        self._maybe_publish()
+
+    def _sync_seconds(self):
+        return getattr(settings, 'TRENDING_SYNC_SECONDS', 10)
+
+    def _maybe_publish(self):
+        now = time.time()
+        if now - self._published_at >= self._sync_seconds():
+            self.publish(now)
+
+    def publish(self, now=None):
+        now = now or time.time()
+        self._published_at = now
+        with self._lock:
+            snapshots = {kind: summary.snapshot(now) for kind, summary in self._summaries.items()}
+        ttl = self._sync_seconds() * 6
+        cache.set(f'trending:{self.worker}', {'at': now, 'kinds': snapshots}, ttl)
+        # Best-effort registry; every worker re-adds itself on each publish.
+        workers = cache.get(WORKERS_KEY) or {}
+        workers = {worker: seen for worker, seen in workers.items() if now - seen < ttl}
+        workers[self.worker] = now
+        cache.set(WORKERS_KEY, workers, None)
+
+    def merged(self, kind):
+        """{item: decayed count} summed over every worker that published recently."""
+        now = time.time()
+        cached = self._merged.get(kind)
+        if cached and now - cached[0] < self._sync_seconds():
+            return cached[1]
+
+        self.publish(now)
+        workers = cache.get(WORKERS_KEY) or {}
+        published = cache.get_many([f'trending:{worker}' for worker in workers])
+        rate = _decay_rate()
+        totals = {}
+        for entry in published.values():
+            scale = math.exp(-rate * (now - entry['at']))
+            for item, count in entry['kinds'].get(kind, {}).items():
+                totals[item] = totals.get(item, 0.0) + count * scale
+        self._merged[kind] = (now, totals)
+        return totals
+
+    def top(self, kind, limit=10):
+        totals = self.merged(kind)
+        best = sorted(totals.items(), key=lambda entry: entry[1], reverse=True)[:limit]
+        return [{'name': item, 'score': round(score, 2)} for item, score in best]
+
+
+tracker = TrendingTracker()
+
+
+def record(instance):
+    """Feed a freshly saved booking row into the trending lists."""
+    if isinstance(instance, (Flight, MultiCityFlightLeg)):
+        tracker.add('routes', f"{instance.from_location.name} - {instance.to_location.name}")
+    elif isinstance(instance, Hotel):
+        tracker.add('hotels', instance.place.name)
+    elif isinstance(instance, Cruise):
+        tracker.add('cruises', instance.to_location.name)
+
+
+def trending(kind, limit=10):
+    return tracker.top(kind, limit)
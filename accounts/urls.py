@@ -1,24 +1,45 @@
+from django.conf import settings
 from django.urls import path
 from .views import (
-    SendOTPView, VerifyOTPView, CompleteOnboardingView, ForgotPasswordView,
+    SendOTPView, VerifyOTPView, CompleteOnboardingView, MeView, ForgotPasswordView,
     HotelListView, FlightListView, RentalCarListView, HolidayPackageListView, CruiseListView, MultiCityFlightListView,
-    ContactSupportView
+    ItineraryOptimizeView, SearchWatchView,
+    ContactSupportView, DemandHeatmapView, LocationAutocompleteView, RelatedDestinationsView, TrendingView,
+    SearchMetricsView
 )
 
 
+if settings.API_ASYNC_VIEWS:
+    from .async_views import (
+        AsyncSendOTPView as SendOTPView, AsyncVerifyOTPView as VerifyOTPView,
+        AsyncCompleteOnboardingView as CompleteOnboardingView,
+        AsyncHotelListView as HotelListView, AsyncFlightListView as FlightListView,
+        AsyncRentalCarListView as RentalCarListView, AsyncHolidayPackageListView as HolidayPackageListView,
+        AsyncCruiseListView as CruiseListView, AsyncMultiCityFlightListView as MultiCityFlightListView,
+    )
+
+
 urlpatterns = [
     path('send-otp/', SendOTPView.as_view(), name='send-otp'),
     path('verify-otp/', VerifyOTPView.as_view(), name='verify-otp'),
     path('onboarding/', CompleteOnboardingView.as_view(), name='onboarding'),
+    path('me/', MeView.as_view(), name='me'),
     # path('forgot-password/', ForgotPasswordView.as_view(), name='forgot-password'),
     # path('complete-onboarding/', CompleteOnboardingView.as_view(), name='complete-onboarding'),
     path('hotel/', HotelListView.as_view(), name='hotel'),
     path('flight/', FlightListView.as_view(), name='flight'),
     path('multi-city-flight/', MultiCityFlightListView.as_view(), name='multi-city-flight'),
+    path('multi-city-flight/optimize/', ItineraryOptimizeView.as_view(), name='multi-city-flight-optimize'),
+    path('searches/watch/', SearchWatchView.as_view(), name='search-watch'),
     path('rentalcar/', RentalCarListView.as_view(), name='rentalcar'),
     path('holidaypackage/', HolidayPackageListView.as_view(), name='holidaypackage'),
     path('cruise/', CruiseListView.as_view(), name='cruise'),
     path('contact-support/', ContactSupportView.as_view(), name='contact-support'),
+    path('locations/autocomplete/', LocationAutocompleteView.as_view(), name='location-autocomplete'),
+    path('locations/related/', RelatedDestinationsView.as_view(), name='location-related'),
+    path('trending/', TrendingView.as_view(), name='trending'),
+    path('analytics/demand/', DemandHeatmapView.as_view(), name='analytics-demand'),
+    path('analytics/search/', SearchMetricsView.as_view(), name='analytics-search'),
 ]
 
 
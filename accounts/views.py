@@ -1,19 +1,38 @@
+import hashlib
 import random
 from rest_framework import status, views, permissions
 from rest_framework.response import Response
+from rest_framework.authentication import SessionAuthentication
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from datetime import timedelta
 from drf_spectacular.utils import extend_schema
-from .models import Hotel, Flight, OTPLog, MultiCityFlight
+from .analytics import demand_heatmap, heatmap_as_json
+from .autocomplete import autocomplete
+from .dedup import existing_search, remember
+from .itinerary import optimize_itinerary
+from .models import Hotel, Flight, RentalCar, HolidayPackage, Cruise, OTPLog, MultiCityFlight
+from .notifications import send_booking_confirmation
+from .profiles import profile_entry
+from .projection import ProjectionMixin, project_queryset
+from .recommendations import related_destinations
+from .representations import represent
+from .scheduler import watch_search
+from .search import has_suppliers, search_offers, search_legs, search_stats
+from .trending import trending
 from .serializers import (
     UserProfileSerializer, VerifyOTPSerializer, 
     ResetPasswordSerializer, OTPSerializer,
     HotelListSerializer, FlightListSerializer, RentalCarListSerializer, HolidayPackageListSerializer, CruiseListSerializer,
-    MultiCityFlightSerializer, ContactSupportSerializer
+    MultiCityFlightSerializer, ContactSupportSerializer, DemandHeatmapQuerySerializer,
+    LocationAutocompleteQuerySerializer, ItineraryOptimizeSerializer, RelatedDestinationsQuerySerializer,
+    TrendingQuerySerializer, SearchWatchSerializer
 )
 
 
@@ -44,10 +63,15 @@ def get_tokens_for_user(user):
         'access': str(refresh.access_token),
     }
 
+def wants_availability(projection, kind):
+    # Live supplier search is opt-in (`?fields=...,availability`) and skipped
+    # outright when no configured supplier serves this kind.
+    return projection.asks_for('availability') and has_suppliers(kind)
+
 # --- Authentication Views ---
 
 # 1. Send OTP
-class SendOTPView(views.APIView):
+class SendOTPView(ProjectionMixin, views.APIView):
     permission_classes = [permissions.AllowAny]
 
     @extend_schema(request=OTPSerializer, responses={200: dict})
@@ -81,8 +105,9 @@ class SendOTPView(views.APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # 2. Verify OTP (Unified Login/Signup)
-class VerifyOTPView(views.APIView):
+class VerifyOTPView(ProjectionMixin, views.APIView):
     permission_classes = [permissions.AllowAny]
+    minimal_fields = ('message', 'tokens', 'is_onboarding_completed')
 
     @extend_schema(request=VerifyOTPSerializer, responses={200: dict})
     def post(self, request):
@@ -119,13 +144,14 @@ class VerifyOTPView(views.APIView):
                 }
 
                 if user.is_onboarding_completed:
-                    response_data['user_details'] = {
-                        'first_name': user.first_name,
-                        'last_name': user.last_name,
-                        'phone_number': user.phone_number,
-                        'address': user.address,
-                        'email': user.email
-                    }
+                    if self.projection.wants('user_details'):
+                        response_data['user_details'] = {
+                            'first_name': user.first_name,
+                            'last_name': user.last_name,
+                            'phone_number': user.phone_number,
+                            'address': user.address,
+                            'email': user.email
+                        }
                 else:
                     response_data['message'] = 'OTP verified. Please complete onboarding to gain full access.'
 
@@ -135,9 +161,10 @@ class VerifyOTPView(views.APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 # 3. Complete Onboarding
-class CompleteOnboardingView(views.APIView):
+class CompleteOnboardingView(ProjectionMixin, views.APIView):
     # Requires tokens from VerifyOTPView
     permission_classes = [permissions.IsAuthenticated]
+    minimal_fields = ('message',)
 
     @extend_schema(request=UserProfileSerializer, responses={200: dict})
     def post(self, request):
@@ -167,8 +194,39 @@ class CompleteOnboardingView(views.APIView):
             }, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+# 4. Current user profile
+class MeView(ProjectionMixin, views.APIView):
+    # The user id comes from the token alone, so a cache hit never reads the users table.
+    authentication_classes = [JWTStatelessUserAuthentication, SessionAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    minimal_fields = ('email',)
+
+    def etag(self, entry):
+        # Each projection is its own representation, so it gets its own validator.
+        if self.projection.tree is None:
+            return entry['etag']
+        shape = 'minimal' if self.projection.minimal else self.request.query_params['fields']
+        digest = hashlib.md5(shape.encode()).hexdigest()[:8]
+        return f'{entry["etag"][:-1]}-{digest}"'  # inside the quotes of the strong tag
+
+    @extend_schema(responses={200: dict, 304: None})
+    def get(self, request):
+        entry = profile_entry(request.user.id)
+        if entry is None:
+            return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = self.etag(entry)
+        etags = parse_etags(request.headers.get('If-None-Match', ''))
+        if etag in etags or '*' in etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(entry['data'], status=status.HTTP_200_OK)
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
 # Forgot Password
-class ForgotPasswordView(views.APIView):
+class ForgotPasswordView(ProjectionMixin, views.APIView):
     permission_classes = [permissions.AllowAny]
 
     @extend_schema(request=ResetPasswordSerializer, responses={200: dict})
@@ -197,186 +255,215 @@ class ForgotPasswordView(views.APIView):
 
 # --- Booking APIs (Gated by Onboarding) ---
 
-class HotelListView(views.APIView):
+class HotelListView(ProjectionMixin, views.APIView):
     permission_classes = [permissions.IsAuthenticated, IsOnboardingCompletedPermission]
+    minimal_fields = ('message', 'data.coupon')
 
     @extend_schema(request=HotelListSerializer, responses={201: dict})
     def post(self, request):
         serializer = HotelListSerializer(data=request.data)
         if serializer.is_valid():
+            dedup_key, duplicate = existing_search(
+                Hotel, request.user, serializer.validated_data,
+                project_queryset(Hotel.objects.all(), HotelListSerializer, self.projection.fields('data')),
+            )
+            if duplicate is not None:
+                body = {'message': 'Hotel search already saved', 'data': represent(HotelListSerializer, duplicate, self.projection.fields('data'))}
+                if wants_availability(self.projection, 'hotel'):
+                    body['availability'] = search_offers('hotel', serializer.validated_data)
+                return Response(body, status=status.HTTP_200_OK)
+
             instance = serializer.save(user=request.user)
+            remember(dedup_key, instance)
             
-            # --- Email Notification ---
-            subject = 'Hotel Search Confirmation'
-            message = f"Hello {instance.customer_name},\n\nYour hotel search at {instance.place} has been saved.\nCheck-in: {instance.checkin_date}\nCheck-out: {instance.checkout_date}\n\nCoupon Code: {instance.coupon}\n\nThank you for choosing CheapTicket!"
-            
-            try:
-                send_mail(
-                    subject,
-                    message,
-                    settings.EMAIL_HOST_USER,
-                    ['support@cheaptickethub.com'],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
+            send_booking_confirmation(instance)
 
-            response_serializer = HotelListSerializer(instance)
-            return Response({'message': 'Hotel search saved successfully', 'data': response_serializer.data}, status=status.HTTP_201_CREATED)
+            body = {'message': 'Hotel search saved successfully', 'data': represent(HotelListSerializer, instance, self.projection.fields('data'))}
+            if wants_availability(self.projection, 'hotel'):
+                body['availability'] = search_offers('hotel', serializer.validated_data)
+            return Response(body, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class FlightListView(views.APIView):
+class FlightListView(ProjectionMixin, views.APIView):
     permission_classes = [permissions.IsAuthenticated, IsOnboardingCompletedPermission]
+    minimal_fields = ('message', 'data.coupon')
 
     @extend_schema(request=FlightListSerializer, responses={201: dict})
     def post(self, request):
         serializer = FlightListSerializer(data=request.data)
         if serializer.is_valid():
+            dedup_key, duplicate = existing_search(
+                Flight, request.user, serializer.validated_data,
+                project_queryset(Flight.objects.all(), FlightListSerializer, self.projection.fields('data')),
+            )
+            if duplicate is not None:
+                body = {'message': 'Flight search already saved', 'data': represent(FlightListSerializer, duplicate, self.projection.fields('data'))}
+                if wants_availability(self.projection, 'flight'):
+                    body['availability'] = search_offers('flight', serializer.validated_data)
+                return Response(body, status=status.HTTP_200_OK)
+
             instance = serializer.save(user=request.user)
+            remember(dedup_key, instance)
             
-            # --- Email Notification ---
-            subject = 'Flight Search Confirmation'
-            trip_type = "Round Trip" if instance.round_trip else "One Way"
-            message = f"Hello {instance.customer_name},\n\nYour flight search has been saved.\n\nFlight Details:\n{instance.from_location} to {instance.to_location}\nDeparture: {instance.departure_date}\nType: {trip_type}\n\nCoupon Code: {instance.coupon}\n\nThank you for choosing CheapTicket!"
-            
-            try:
-                send_mail(
-                    subject,
-                    message,
-                    settings.EMAIL_HOST_USER,
-                    ['support@cheaptickethub.com'],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
+            send_booking_confirmation(instance)
 
-            response_serializer = FlightListSerializer(instance)
-            return Response({'message': 'Flight search saved successfully', 'data': response_serializer.data}, status=status.HTTP_201_CREATED)
+            body = {'message': 'Flight search saved successfully', 'data': represent(FlightListSerializer, instance, self.projection.fields('data'))}
+            if wants_availability(self.projection, 'flight'):
+                body['availability'] = search_offers('flight', serializer.validated_data)
+            return Response(body, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class RentalCarListView(views.APIView):
+class RentalCarListView(ProjectionMixin, views.APIView):
     permission_classes = [permissions.IsAuthenticated, IsOnboardingCompletedPermission]
+    minimal_fields = ('message', 'data.coupon')
 
     @extend_schema(request=RentalCarListSerializer, responses={201: dict})
     def post(self, request):
         serializer = RentalCarListSerializer(data=request.data)
         if serializer.is_valid():
+            dedup_key, duplicate = existing_search(
+                RentalCar, request.user, serializer.validated_data,
+                project_queryset(RentalCar.objects.all(), RentalCarListSerializer, self.projection.fields('data')),
+            )
+            if duplicate is not None:
+                body = {'message': 'Rental Car search already saved', 'data': represent(RentalCarListSerializer, duplicate, self.projection.fields('data'))}
+                if wants_availability(self.projection, 'rental_car'):
+                    body['availability'] = search_offers('rental_car', serializer.validated_data)
+                return Response(body, status=status.HTTP_200_OK)
+
             instance = serializer.save(user=request.user)
+            remember(dedup_key, instance)
             
-            # --- Email Notification ---
-            subject = 'Rental Car Search Confirmation'
-            message = f"Hello {instance.customer_name},\n\nYour rental car search at {instance.location} has been saved.\nPickup: {instance.pickup_time}\nDrop-off: {instance.dropoff_time}\n\nCoupon Code: {instance.coupon}\n\nThank you for choosing CheapTicket!"
-            
-            try:
-                send_mail(
-                    subject,
-                    message,
-                    settings.EMAIL_HOST_USER,
-                    ['support@cheaptickethub.com'],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
+            send_booking_confirmation(instance)
 
-            response_serializer = RentalCarListSerializer(instance)
-            return Response({'message': 'Rental Car search saved successfully', 'data': response_serializer.data}, status=status.HTTP_201_CREATED)
+            body = {'message': 'Rental Car search saved successfully', 'data': represent(RentalCarListSerializer, instance, self.projection.fields('data'))}
+            if wants_availability(self.projection, 'rental_car'):
+                body['availability'] = search_offers('rental_car', serializer.validated_data)
+            return Response(body, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class HolidayPackageListView(views.APIView):
+class HolidayPackageListView(ProjectionMixin, views.APIView):
     permission_classes = [permissions.IsAuthenticated, IsOnboardingCompletedPermission]
+    minimal_fields = ('message', 'data.coupon')
 
     @extend_schema(request=HolidayPackageListSerializer, responses={201: dict})
     def post(self, request):
         serializer = HolidayPackageListSerializer(data=request.data)
         if serializer.is_valid():
+            dedup_key, duplicate = existing_search(
+                HolidayPackage, request.user, serializer.validated_data,
+                project_queryset(HolidayPackage.objects.all(), HolidayPackageListSerializer, self.projection.fields('data')),
+            )
+            if duplicate is not None:
+                return Response({'message': 'Holiday Package search already saved', 'data': represent(HolidayPackageListSerializer, duplicate, self.projection.fields('data'))}, status=status.HTTP_200_OK)
+
             instance = serializer.save(user=request.user)
+            remember(dedup_key, instance)
             
-            # --- Email Notification ---
-            subject = 'Holiday Package Search Confirmation'
-            message = f"Hello {instance.customer_name},\n\nYour holiday package search for {instance.to_location} has been saved.\nDuration: {instance.duration} days\n\nCoupon Code: {instance.coupon}\n\nThank you for choosing CheapTicket!"
-            
-            try:
-                send_mail(
-                    subject,
-                    message,
-                    settings.EMAIL_HOST_USER,
-                    ['support@cheaptickethub.com'],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
+            send_booking_confirmation(instance)
 
-            response_serializer = HolidayPackageListSerializer(instance)
-            return Response({'message': 'Holiday Package search saved successfully', 'data': response_serializer.data}, status=status.HTTP_201_CREATED)
+            return Response({'message': 'Holiday Package search saved successfully', 'data': represent(HolidayPackageListSerializer, instance, self.projection.fields('data'))}, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class CruiseListView(views.APIView):
+class CruiseListView(ProjectionMixin, views.APIView):
     permission_classes = [permissions.IsAuthenticated, IsOnboardingCompletedPermission]
+    minimal_fields = ('message', 'data.coupon')
 
     @extend_schema(request=CruiseListSerializer, responses={201: dict})
     def post(self, request):
         serializer = CruiseListSerializer(data=request.data)
         if serializer.is_valid():
+            dedup_key, duplicate = existing_search(
+                Cruise, request.user, serializer.validated_data,
+                project_queryset(Cruise.objects.all(), CruiseListSerializer, self.projection.fields('data')),
+            )
+            if duplicate is not None:
+                body = {'message': 'Cruise search already saved', 'data': represent(CruiseListSerializer, duplicate, self.projection.fields('data'))}
+                if wants_availability(self.projection, 'cruise'):
+                    body['availability'] = search_offers('cruise', serializer.validated_data)
+                return Response(body, status=status.HTTP_200_OK)
+
             instance = serializer.save(user=request.user)
+            remember(dedup_key, instance)
             
-            # --- Email Notification ---
-            subject = 'Cruise Search Confirmation'
-            message = f"Hello {instance.customer_name},\n\nYour cruise search for {instance.to_location} has been saved.\nDuration: {instance.duration} days\nCabins: {instance.cabins}\n\nCoupon Code: {instance.coupon}\n\nThank you for choosing CheapTicket!"
-            
-            try:
-                send_mail(
-                    subject,
-                    message,
-                    settings.EMAIL_HOST_USER,
-                    ['support@cheaptickethub.com'],
-                    fail_silently=True,
-                )
-            except Exception:
-                pass
+            send_booking_confirmation(instance)
 
-            response_serializer = CruiseListSerializer(instance)
-            return Response({'message': 'Cruise search saved successfully', 'data': response_serializer.data}, status=status.HTTP_201_CREATED)
+            body = {'message': 'Cruise search saved successfully', 'data': represent(CruiseListSerializer, instance, self.projection.fields('data'))}
+            if wants_availability(self.projection, 'cruise'):
+                body['availability'] = search_offers('cruise', serializer.validated_data)
+            return Response(body, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class MultiCityFlightListView(views.APIView):
+class MultiCityFlightListView(ProjectionMixin, views.APIView):
     permission_classes = [permissions.IsAuthenticated, IsOnboardingCompletedPermission]
+    minimal_fields = ('message', 'data.coupon')
 
     @extend_schema(request=MultiCityFlightSerializer, responses={201: dict})
     def post(self, request):
         serializer = MultiCityFlightSerializer(data=request.data)
         if serializer.is_valid():
+            dedup_key, duplicate = existing_search(
+                MultiCityFlight, request.user, serializer.validated_data,
+                project_queryset(MultiCityFlight.objects.all(), MultiCityFlightSerializer, self.projection.fields('data')),
+            )
+            if duplicate is not None:
+                data = serializer.validated_data
+                body = {'message': 'Multi-city flight search already saved', 'data': represent(MultiCityFlightSerializer, duplicate, self.projection.fields('data'))}
+                if wants_availability(self.projection, 'flight'):
+                    body['availability'] = search_legs(data['legs'], {'adults': data.get('adults', 0), 'children': data.get('children', 0)})
+                return Response(body, status=status.HTTP_200_OK)
+
             # Save the multi-city flight and its legs
             instance = serializer.save(user=request.user)
+            remember(dedup_key, instance)
             
-            # --- Email Notification (Like Nodemailer in Node.js) ---
-            # We can use Django's send_mail function
-            subject = 'Multi-City Flight Search Confirmation'
-            legs_info = "\n".join([f"- {leg.from_location} to {leg.to_location} on {leg.departure_date}" for leg in instance.legs.all()])
-            message = f"Hello {instance.customer_name},\n\nYour multi-city flight search has been saved.\n\nFlight Details:\n{legs_info}\n\nCoupon Code: {instance.coupon}\n\nThank you for choosing CheapTicket!"
-            
-            try:
-                send_mail(
-                    subject,
-                    message,
-                    settings.EMAIL_HOST_USER,
-                    ['support@cheaptickethub.com'],
-                    fail_silently=True,
-                )
-            except Exception as e:
-                # Log error or handle it (optional)
-                pass
+            send_booking_confirmation(instance)
+
+            data = serializer.validated_data
+            body = {'message': 'Multi-city flight search saved successfully', 'data': represent(MultiCityFlightSerializer, instance, self.projection.fields('data'))}
+            if wants_availability(self.projection, 'flight'):
+                body['availability'] = search_legs(data['legs'], {'adults': data.get('adults', 0), 'children': data.get('children', 0)})
+            return Response(body, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ItineraryOptimizeView(ProjectionMixin, views.APIView):
+    permission_classes = [permissions.IsAuthenticated, IsOnboardingCompletedPermission]
+
+    @extend_schema(request=ItineraryOptimizeSerializer, responses={200: dict})
+    def post(self, request):
+        serializer = ItineraryOptimizeSerializer(data=request.data)
+        if serializer.is_valid():
+            suggestion = optimize_itinerary(serializer.validated_data['legs'])
+            return Response(suggestion, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
 
-            response_serializer = MultiCityFlightSerializer(instance)
-            return Response({'message': 'Multi-city flight search saved successfully', 'data': response_serializer.data}, status=status.HTTP_201_CREATED)
+class SearchWatchView(ProjectionMixin, views.APIView):
+    permission_classes = [permissions.IsAuthenticated, IsOnboardingCompletedPermission]
+
+    @extend_schema(request=SearchWatchSerializer, responses={201: dict})
+    def post(self, request):
+        serializer = SearchWatchSerializer(data=request.data)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            try:
+                watch, created = watch_search(request.user, data['kind'], data['id'])
+            except (Hotel.DoesNotExist, Flight.DoesNotExist):
+                return Response({'error': 'Saved search not found'}, status=status.HTTP_404_NOT_FOUND)
+            return Response(
+                {'message': 'You will be notified when the results for this search change.', 'watch': watch.pk},
+                status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+            )
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class ContactSupportView(views.APIView):
+class ContactSupportView(ProjectionMixin, views.APIView):
     permission_classes = [permissions.AllowAny]
 
     @extend_schema(request=ContactSupportSerializer, responses={200: dict})
@@ -403,3 +490,65 @@ class ContactSupportView(views.APIView):
                 return Response({'error': 'Failed to send message. Please try again later.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# --- Location APIs ---
+
+class LocationAutocompleteView(ProjectionMixin, views.APIView):
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(parameters=[LocationAutocompleteQuerySerializer], responses={200: dict})
+    def get(self, request):
+        serializer = LocationAutocompleteQuerySerializer(data=request.query_params)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            results = autocomplete(data['q'], data['scope'], data['limit'])
+            return Response({'results': results}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class RelatedDestinationsView(ProjectionMixin, views.APIView):
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(parameters=[RelatedDestinationsQuerySerializer], responses={200: dict})
+    def get(self, request):
+        serializer = RelatedDestinationsQuerySerializer(data=request.query_params)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            results = related_destinations(data['location'], data['limit'])
+            return Response({'results': results}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class TrendingView(ProjectionMixin, views.APIView):
+    permission_classes = [permissions.AllowAny]
+
+    @extend_schema(parameters=[TrendingQuerySerializer], responses={200: dict})
+    def get(self, request):
+        serializer = TrendingQuerySerializer(data=request.query_params)
+        if serializer.is_valid():
+            data = serializer.validated_data
+            return Response({'kind': data['kind'], 'results': trending(data['kind'], data['limit'])}, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+# --- Analytics APIs (Staff only) ---
+
+class DemandHeatmapView(ProjectionMixin, views.APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(parameters=[DemandHeatmapQuerySerializer], responses={200: dict})
+    def get(self, request):
+        serializer = DemandHeatmapQuerySerializer(data=request.query_params)
+        if serializer.is_valid():
+            heatmap = demand_heatmap(**serializer.validated_data)
+            return Response(heatmap_as_json(heatmap), status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class SearchMetricsView(ProjectionMixin, views.APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    @extend_schema(responses={200: dict})
+    def get(self, request):
+        return Response(search_stats(), status=status.HTTP_200_OK)
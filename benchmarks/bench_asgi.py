@@ -0,0 +1,140 @@
+"""
+Concurrent-connection capacity: gunicorn (WSGI, sync views) vs uvicorn (ASGI, async views).
+
+    python benchmarks/bench_asgi.py [--workers 2] [--concurrency 10,50,200] [--duration 10]
+
+Starts each server on a local port with the same number of worker processes,
+then keeps N connections busy posting hotel searches (a new date each time,
+so every request saves a row and waits on the stub suppliers, which it
+turns on with SEARCH_STUB_SUPPLIERS=1) and
+reports throughput, latency percentiles and failures per level of
+concurrency. Needs gunicorn and uvicorn installed and a migrated database;
+it adds a benchmark user and its searches to that database, so point it at
+a development one.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from datetime import date, timedelta
+from itertools import count
+from pathlib import Path
+
+import httpx
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'traveling.settings')
+# Inherited by the servers started below.
+os.environ.setdefault('SEARCH_STUB_SUPPLIERS', '1')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.contrib.auth import get_user_model  # noqa: E402
+
+from accounts.views import get_tokens_for_user  # noqa: E402
+
+
+SERVERS = {
+    'gunicorn': lambda port, workers: [
+        'gunicorn', 'traveling.wsgi:application', '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+    ],
+    'uvicorn': lambda port, workers: [
+        'uvicorn', 'traveling.asgi:application', '--host', '127.0.0.1', '--port', str(port),
+        '--workers', str(workers), '--no-access-log',
+    ],
+}
+
+
+def start(name, port, workers):
+    process = subprocess.Popen(
+        SERVERS[name](port, workers), cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f'http://127.0.0.1:{port}/', timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    stop(process)
+    raise RuntimeError(f'{name} did not start on port {port}')
+
+
+def stop(process):
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait(timeout=30)
+
+
+async def load(base_url, token, concurrency, duration, days):
+    latencies, failures = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    headers = {'Authorization': f'Bearer {token}'}
+
+    async def client_loop(client, stop_at):
+        nonlocal failures
+        while time.monotonic() < stop_at:
+            day = date(2030, 1, 1) + timedelta(days=next(days))
+            body = {
+                'place': 'Dubai', 'checkin_date': day.isoformat(),
+                'checkout_date': (day + timedelta(days=2)).isoformat(), 'adults': 2, 'children': 0, 'rooms': 1,
+            }
+            started = time.monotonic()
+            try:
+                response = await client.post('/api/accounts/hotel/', json=body, headers=headers)
+                ok = response.status_code in (200, 201)
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.monotonic() - started)
+            else:
+                failures += 1
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+        stop_at = time.monotonic() + duration
+        await asyncio.gather(*(client_loop(client, stop_at) for _ in range(concurrency)))
+    return latencies, failures
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--concurrency', default='10,50,200')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--port', type=int, default=8701)
+    args = parser.parse_args()
+
+    user, _ = get_user_model().objects.get_or_create(
+        email='bench@example.com', defaults={'is_onboarding_completed': True, 'first_name': 'Bench'},
+    )
+    token = get_tokens_for_user(user)['access']
+    days = count()
+
+    print(f"{'server':<10}{'conns':>7}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'failed':>8}")
+    for offset, name in enumerate(SERVERS):
+        port = args.port + offset
+        process = start(name, port, args.workers)
+        try:
+            for concurrency in (int(level) for level in args.concurrency.split(',')):
+                latencies, failures = asyncio.run(load(f'http://127.0.0.1:{port}', token, concurrency, args.duration, days))
+                print(
+                    f'{name:<10}{concurrency:>7}{len(latencies) / args.duration:>10.1f}'
+                    f'{percentile(latencies, 0.5) * 1e3:>10.0f}{percentile(latencies, 0.99) * 1e3:>10.0f}{failures:>8}'
+                )
+        finally:
+            stop(process)
+
+
+if __name__ == '__main__':
+    main()
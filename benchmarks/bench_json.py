@@ -0,0 +1,116 @@
+"""
+Share of request time spent encoding and decoding JSON, DRF's codec vs orjson.
+
+    python benchmarks/bench_json.py [--requests 300]
+
+Posts hotel and flight searches (with stub supplier offers in the response)
+through the full Django stack on a throwaway in-memory database, once with
+DRF's JSONRenderer/JSONParser and once with the orjson pair, timing the
+renderer and parser inside each request. Also times rendering the OpenAPI
+schema with both.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'traveling.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from drf_spectacular.generators import SchemaGenerator  # noqa: E402
+from drf_spectacular.renderers import OpenApiJsonRenderer  # noqa: E402
+from rest_framework.parsers import JSONParser  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from accounts import views  # noqa: E402
+from accounts.parsers import ORJSONParser  # noqa: E402
+from accounts.renderers import ORJSONRenderer, OpenApiORJSONRenderer  # noqa: E402
+
+
+BOOKING_VIEWS = (views.HotelListView, views.FlightListView)
+
+
+def timed(codec, spent):
+    """Subclass of a renderer or parser that adds its time to spent[0]."""
+    method = 'render' if hasattr(codec, 'render') else 'parse'
+
+    def wrapper(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return getattr(super(subclass, self), method)(*args, **kwargs)
+        finally:
+            spent[0] += time.perf_counter() - started
+
+    subclass = type(f'Timed{codec.__name__}', (codec,), {method: wrapper})
+    return subclass
+
+
+def run(label, renderer, parser, client, count):
+    spent = [0.0]
+    for view in BOOKING_VIEWS:
+        view.renderer_classes = [timed(renderer, spent)]
+        view.parser_classes = [timed(parser, spent)]
+
+    started = time.perf_counter()
+    for n in range(count):
+        # A new date each time, so neither the search cache nor dedup short-circuits.
+        day = date(2027, 1, 1) + timedelta(days=n)
+        client.post('/api/accounts/hotel/', {
+            'place': 'Dubai', 'checkin_date': day.isoformat(), 'checkout_date': (day + timedelta(days=3)).isoformat(),
+            'adults': 2, 'children': 1, 'rooms': 1,
+        }, format='json')
+        client.post('/api/accounts/flight/', {
+            'from_location': 'Dubai', 'to_location': 'Paris', 'round_trip': False, 'one_way': True,
+            'departure_date': day.isoformat(), 'adults': 1, 'children': 0,
+        }, format='json')
+    total = time.perf_counter() - started
+    requests = count * 2
+    if label:
+        print(f'{label:<8}{total / requests * 1e3:>12.3f}{spent[0] / requests * 1e3:>12.3f}{spent[0] / total:>10.1%}')
+
+
+def bench_schema(repeat):
+    schema = SchemaGenerator().get_schema(request=None, public=True)
+    for label, renderer in (('drf', OpenApiJsonRenderer()), ('orjson', OpenApiORJSONRenderer())):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            renderer.render(schema, renderer.media_type, {})
+        print(f'schema {label:<8}{(time.perf_counter() - started) / repeat * 1e3:>10.3f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=300)
+    args = parser.parse_args()
+
+    settings.ALLOWED_HOSTS = ['*']
+    settings.EMAIL_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+    settings.SEARCH_SUPPLIERS = [
+        {'BACKEND': 'accounts.suppliers.StubSupplier', 'NAME': f'stub-{n}', 'OPTIONS': {'offers': 25}}
+        for n in range(4)
+    ]
+    connection.creation.create_test_db(verbosity=0)
+    user = get_user_model().objects.create(email='bench@example.com', is_onboarding_completed=True)
+    client = APIClient()
+    client.force_authenticate(user)
+
+    # Warm up interning, the fan-out loop and the HTTP client.
+    run(None, JSONRenderer, JSONParser, client, 5)
+    print(f"{'codec':<8}{'ms/request':>12}{'ms codec':>12}{'share':>10}")
+    run('drf', JSONRenderer, JSONParser, client, args.requests)
+    run('orjson', ORJSONRenderer, ORJSONParser, client, args.requests)
+    bench_schema(20)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Cost of the request metrics (RequestMetricsMiddleware and the query wrapper).
+
+    python benchmarks/bench_metrics.py [--requests 2000]
+
+Sends token-authenticated requests through the full WSGI handler on a
+throwaway in-memory database, with and without RequestMetricsMiddleware: a
+revalidated GET /api/accounts/me/ (no queries) and GET /api/accounts/trending/
+(one query for the token's user, through the execute wrapper). Also times
+observe_request on its own and a /metrics scrape.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'traveling.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+from accounts import metrics  # noqa: E402
+
+
+def run(label, token, n):
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+    etag = client.get('/api/accounts/me/')['ETag']
+    for path, extra, expected in (
+        ('/api/accounts/me/', {'HTTP_IF_NONE_MATCH': etag}, 304),
+        ('/api/accounts/trending/', {}, 200),
+    ):
+        assert client.get(path, **extra).status_code == expected
+        started = time.perf_counter()
+        for _ in range(n):
+            client.get(path, **extra)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<10}{path:<28}{elapsed / n * 1e6:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    settings.ALLOWED_HOSTS = ['*']
+    connection.creation.create_test_db(verbosity=0)
+    user = get_user_model().objects.create(email='bench@example.com', is_onboarding_completed=True)
+    token = str(RefreshToken.for_user(user).access_token)
+
+    print(f"{'metrics':<10}{'path':<28}{'us/request':>12}")
+    without = [name for name in settings.MIDDLEWARE if name != 'accounts.middleware.RequestMetricsMiddleware']
+    with override_settings(MIDDLEWARE=without):
+        run('off', token, args.requests)
+    run('on', token, args.requests)
+
+    stats = metrics.RequestStats()
+    stats.queries, stats.db_seconds = 3, 0.002
+    started = time.perf_counter()
+    for _ in range(100000):
+        metrics.observe_request('hotel', 201, 0.05, stats)
+    print(f"observe_request: {(time.perf_counter() - started) * 10:.2f} us")
+
+    settings.METRICS_TOKEN = 'bench'
+    client = Client(HTTP_AUTHORIZATION='Bearer bench')
+    started = time.perf_counter()
+    for _ in range(100):
+        body = client.get('/metrics').content
+    print(f"/metrics scrape: {(time.perf_counter() - started) * 10:.2f} ms, {len(body)} bytes")
+
+
+if __name__ == '__main__':
+    main()
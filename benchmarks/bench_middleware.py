@@ -0,0 +1,86 @@
+"""
+Per-request overhead of the middleware and authentication chain on API calls.
+
+    python benchmarks/bench_middleware.py [--requests 2000]
+
+Sends token-authenticated requests to two cheap endpoints, a revalidated
+GET /api/accounts/me/ (304 from the profile cache) and GET trending/, through
+the full WSGI handler on a throwaway in-memory database. "before" is the
+previous setup, every middleware on every request and SessionAuthentication
+tried before JWT; "after" is the current settings, where APIRouteMiddleware
+skips the session/CSRF/messages stack for these routes.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'traveling.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from rest_framework import views  # noqa: E402
+from rest_framework.authentication import SessionAuthentication  # noqa: E402
+from rest_framework_simplejwt.authentication import JWTAuthentication  # noqa: E402
+from rest_framework_simplejwt.tokens import RefreshToken  # noqa: E402
+
+
+BEFORE_MIDDLEWARE = [
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'accounts.middleware.WhiteNoiseMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+
+def run(label, token, n):
+    client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+    etag = client.get('/api/accounts/me/')['ETag']
+    for path, extra, expected in (
+        ('/api/accounts/me/', {'HTTP_IF_NONE_MATCH': etag}, 304),
+        ('/api/accounts/trending/', {}, 200),
+    ):
+        assert client.get(path, **extra).status_code == expected
+        started = time.perf_counter()
+        for _ in range(n):
+            client.get(path, **extra)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<8}{path:<28}{elapsed / n * 1e6:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    settings.ALLOWED_HOSTS = ['*']
+    connection.creation.create_test_db(verbosity=0)
+    user = get_user_model().objects.create(email='bench@example.com', is_onboarding_completed=True)
+    token = str(RefreshToken.for_user(user).access_token)
+
+    print(f"{'chain':<8}{'path':<28}{'us/request':>12}")
+    default_authentication = views.APIView.authentication_classes
+    with override_settings(MIDDLEWARE=BEFORE_MIDDLEWARE):
+        views.APIView.authentication_classes = [SessionAuthentication, JWTAuthentication]
+        try:
+            run('before', token, args.requests)
+        finally:
+            views.APIView.authentication_classes = default_authentication
+    run('after', token, args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Compare DRF serializer output with the precompiled representations.
+
+    python benchmarks/bench_representations.py [--number 20000]
+
+Builds one unsaved instance per booking type, checks that both paths produce
+the same dict and prints the time per response body for each.
+"""
+import argparse
+import os
+import sys
+import timeit
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'traveling.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from accounts.models import (  # noqa: E402
+    Location, Hotel, Flight, RentalCar, HolidayPackage, Cruise, MultiCityFlight, MultiCityFlightLeg,
+)
+from accounts.representations import represent  # noqa: E402
+from accounts.serializers import (  # noqa: E402
+    HotelListSerializer, FlightListSerializer, RentalCarListSerializer,
+    HolidayPackageListSerializer, CruiseListSerializer, MultiCityFlightSerializer,
+)
+
+
+def location(pk, name):
+    return Location(pk=pk, name=name, key=name.lower())
+
+
+def instances():
+    dubai, paris, rome, oslo = (location(1, 'Dubai'), location(2, 'Paris'), location(3, 'Rome'), location(4, 'Oslo'))
+    customer = {'customer_name': 'Jane Doe', 'phone_number': '+15550100', 'coupon': 'CHEAP10'}
+
+    multi_city = MultiCityFlight(pk=1, adults=2, children=1, **customer)
+    legs = [
+        MultiCityFlightLeg(pk=n, multi_city_flight=multi_city, from_location=a, to_location=b, departure_date=date(2026, 11, n))
+        for n, (a, b) in enumerate([(dubai, paris), (paris, rome), (rome, oslo)], start=1)
+    ]
+    multi_city._prefetched_objects_cache = {'legs': legs}
+
+    return [
+        ('hotel', HotelListSerializer, Hotel(
+            pk=1, place=dubai, checkin_date=date(2026, 11, 1), checkout_date=date(2026, 11, 5),
+            adults=2, children=1, rooms=1, **customer,
+        )),
+        ('flight', FlightListSerializer, Flight(
+            pk=1, from_location=dubai, to_location=paris, round_trip=True, one_way=False,
+            departure_date=date(2026, 11, 1), return_date=None, adults=2, children=0, **customer,
+        )),
+        ('rental car', RentalCarListSerializer, RentalCar(
+            pk=1, location=rome, pickup_time=datetime(2026, 11, 1, 9, tzinfo=timezone.utc),
+            dropoff_time=datetime(2026, 11, 4, 18, tzinfo=timezone.utc), **customer,
+        )),
+        ('holiday package', HolidayPackageListSerializer, HolidayPackage(
+            pk=1, from_location=oslo, to_location=dubai, duration=7, adults=2, children=2, **customer,
+        )),
+        ('cruise', CruiseListSerializer, Cruise(
+            pk=1, from_location=rome, to_location=paris, duration=5, cabins='2', adults=2, children=0, **customer,
+        )),
+        ('multi-city flight', MultiCityFlightSerializer, multi_city),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'booking':<20}{'drf µs':>10}{'compiled µs':>14}{'speedup':>10}")
+    for name, serializer_class, instance in instances():
+        expected = serializer_class(instance).data
+        actual = represent(serializer_class, instance)
+        assert actual == expected, f'{name}: {actual!r} != {expected!r}'
+
+        drf = timeit.timeit(lambda: serializer_class(instance).data, number=args.number)
+        compiled = timeit.timeit(lambda: represent(serializer_class, instance), number=args.number)
+        per_call = 1e6 / args.number
+        print(f'{name:<20}{drf * per_call:>10.2f}{compiled * per_call:>14.2f}{drf / compiled:>9.1f}x')
+
+
+if __name__ == '__main__':
+    main()
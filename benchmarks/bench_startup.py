@@ -0,0 +1,77 @@
+"""
+Worker startup time and memory, full settings vs the API-only profile.
+
+    python benchmarks/bench_startup.py [--runs 7]
+
+Starts a fresh interpreter per run, as a new worker would, loads the WSGI
+application, serves one request to /api/accounts/me/ (which imports the
+URLconf and the views) and reports the time taken, the modules loaded and the
+peak RSS. Medians over the runs.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+WORKER = r'''
+import json, os, resource, sys, time
+from wsgiref.util import setup_testing_defaults
+
+sys.path.insert(0, sys.argv[1])
+os.environ['DJANGO_SETTINGS_MODULE'] = sys.argv[2]
+start = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+loaded = time.perf_counter()
+environ = {'PATH_INFO': '/api/accounts/me/', 'HTTP_HOST': 'localhost'}
+setup_testing_defaults(environ)
+status = []
+b''.join(application(environ, lambda s, headers: status.append(s)))
+served = time.perf_counter()
+print(json.dumps({
+    'status': status[0],
+    'load_ms': (loaded - start) * 1000,
+    'first_request_ms': (served - start) * 1000,
+    'modules': len(sys.modules),
+    'rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+}))
+'''
+
+
+def measure(settings_module, runs):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, '-c', WORKER, str(ROOT), settings_module],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        samples.append(json.loads(out.strip().splitlines()[-1]))
+    return {key: statistics.median(sample[key] for sample in samples) for key in samples[0] if key != 'status'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"{'settings':<26}{'load ms':>10}{'1st req ms':>12}{'modules':>10}{'RSS MB':>10}")
+    results = {}
+    for settings_module in ('traveling.settings', 'traveling.settings_api'):
+        result = results[settings_module] = measure(settings_module, args.runs)
+        print(
+            f"{settings_module:<26}{result['load_ms']:>10.1f}{result['first_request_ms']:>12.1f}"
+            f"{result['modules']:>10.0f}{result['rss_mb']:>10.1f}"
+        )
+    full, lean = results['traveling.settings'], results['traveling.settings_api']
+    print(
+        f"API-only saves {full['first_request_ms'] - lean['first_request_ms']:.1f} ms to the first request "
+        f"and {full['rss_mb'] - lean['rss_mb']:.1f} MB RSS per worker"
+    )
+
+
+if __name__ == '__main__':
+    main()
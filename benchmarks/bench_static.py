@@ -0,0 +1,96 @@
+"""
+What an admin page load transfers, and whether it needs anything off-site.
+
+    python benchmarks/bench_static.py
+
+Runs collectstatic into a temporary STATIC_ROOT, renders the admin dashboard
+as a staff user with DEBUG off, then fetches every stylesheet, script and font
+the page and its stylesheets reference through WhiteNoise: once uncompressed
+(the previous setup) and once with `Accept-Encoding: br, gzip`. Reports bytes
+transferred, off-site URLs and the Cache-Control on the hashed assets. Brotli
+is only used when the `brotli` package is installed.
+"""
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'traveling.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+
+
+ASSET_ATTRIBUTE = re.compile(r'''(?:href|src)=["']([^"']+)["']''')
+CSS_URL = re.compile(r'''url\(["']?([^"')]+)["']?\)''')
+
+
+def assets(client, html):
+    """Static URLs the page loads, following url() in its stylesheets; plus off-site URLs."""
+    pending = [url for url in ASSET_ATTRIBUTE.findall(html) if url.startswith(('/static/', 'http'))]
+    seen, offsite = [], []
+    while pending:
+        url = pending.pop()
+        if url in seen or url in offsite:
+            continue
+        if not url.startswith('/static/'):
+            offsite.append(url)
+            continue
+        seen.append(url)
+        if url.endswith('.css'):
+            css = b''.join(client.get(url, HTTP_ACCEPT_ENCODING='identity').streaming_content).decode()
+            base = url.rsplit('/', 1)[0]
+            for ref in CSS_URL.findall(css):
+                if ref.startswith('data:'):
+                    continue
+                pending.append(ref if ref.startswith(('/', 'http')) else os.path.normpath(f'{base}/{ref}'))
+    return seen, offsite
+
+
+def transfer(client, urls, encoding):
+    total, cache_control = 0, set()
+    for url in urls:
+        response = client.get(url, HTTP_ACCEPT_ENCODING=encoding)
+        total += sum(len(chunk) for chunk in response.streaming_content)
+        cache_control.add(response['Cache-Control'])
+    return total, cache_control
+
+
+def main():
+    settings.ALLOWED_HOSTS = ['*']
+    settings.DEBUG = False
+    settings.STATIC_ROOT = tempfile.mkdtemp(prefix='static-')
+    started = time.perf_counter()
+    call_command('collectstatic', interactive=False, verbosity=0)
+    print(f"collectstatic: {time.perf_counter() - started:.2f}s into {settings.STATIC_ROOT}")
+
+    connection.creation.create_test_db(verbosity=0)
+    user = get_user_model().objects.create(
+        email='staff@example.com', is_staff=True, is_superuser=True, is_onboarding_completed=True,
+    )
+    client = Client()
+    client.force_login(user)
+    page = client.get('/admin/')
+    assert page.status_code == 200, page.status_code
+
+    urls, offsite = assets(client, page.content.decode())
+    print(f"assets: {len(urls)} local, {len(offsite)} off-site {offsite}")
+    for label, encoding in (('identity', 'identity'), ('br/gzip', 'br, gzip')):
+        total, cache_control = transfer(client, urls, encoding)
+        print(f"{label:<10}{total / 1024:>10.1f} KiB   Cache-Control: {sorted(cache_control)}")
+    shutil.rmtree(settings.STATIC_ROOT)
+
+
+if __name__ == '__main__':
+    main()
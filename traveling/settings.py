@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -51,11 +52,14 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    'accounts.middleware.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
+    # Token-authenticated API calls skip everything below (API_ROUTE_PREFIXES).
+    'accounts.middleware.APIRouteMiddleware',
+    'accounts.middleware.WhiteNoiseMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
@@ -93,6 +97,29 @@ DATABASES = {
     }
 }
 
+# Cache shared by every worker process: the search cache and its fetch locks,
+# search dedup, /me/ profiles and the trending and /metrics snapshots all
+# depend on workers seeing each other's entries, so production sets REDIS_URL.
+# Without it each process gets its own local-memory cache, which is fine for
+# development; `manage.py check --deploy` warns about it. The cache never
+# lives in the booking database: every hit would be a query and every set a
+# write competing with bookings.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'OPTIONS': {'MAX_ENTRIES': 100000},
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -130,6 +157,14 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+# collectstatic writes content-hashed copies of every asset with .gz (and, with
+# Brotli installed, .br) versions next to them. WhiteNoise serves the hashed
+# names with a far-future immutable Cache-Control and picks the precompressed
+# file matching Accept-Encoding.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -139,11 +174,22 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'accounts.User'
 
 REST_FRAMEWORK = {
+    # JWT first: API clients send a token; browser sessions are the fallback.
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.SessionAuthentication',
         'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'rest_framework.authentication.SessionAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # orjson-backed JSON; both fall back to DRF's own when orjson is missing.
+    'DEFAULT_RENDERER_CLASSES': (
+        'accounts.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'accounts.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
 }
 
 SPECTACULAR_SETTINGS = {
@@ -164,7 +210,8 @@ SIMPLE_JWT = {
 CORS_ALLOW_ALL_ORIGINS = True
 
 
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Django's SMTP backend, timed for /metrics.
+EMAIL_BACKEND = 'accounts.mail.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -176,6 +223,134 @@ DEFAULT_FROM_EMAIL = 'support@cheaptickethub.com'
 
 GLOBAL_AUTH_REQUIRED = True
 
+# Dashboard rollups: count bookings as they are saved, or leave this off and
+# run `manage.py update_rollups` periodically as a delta job.
+ROLLUP_UPDATE_ON_SAVE = True
+ROLLUP_CHUNK_SIZE = 5000
+DASHBOARD_CACHE_TIMEOUT = 30  # seconds
+
+# Demand heatmaps never span more days than this, and read their rows from the
+# database this many at a time.
+ANALYTICS_MAX_DAYS = 366
+ANALYTICS_FETCH_SIZE = 10000
+
+# Where `manage.py export_snapshot` writes the columnar analytics snapshot.
+SNAPSHOT_DIR = BASE_DIR / 'snapshots'
+
+# Per-process cache of interned location names (see accounts/locations.py),
+# dropped in every worker when a merge bumps its version in the shared cache.
+LOCATION_CACHE_SIZE = 100000
+
+# How often each worker rebuilds its in-memory location autocomplete index.
+AUTOCOMPLETE_REFRESH_SECONDS = 300
+
+# Typo correction for location input (see accounts/resolver.py). A location
+# becomes a correction target once it has been searched this many times.
+LOCATION_CANONICAL_MIN_SEARCHES = 3
+# A near miss is corrected (and merged by canonicalize_locations) only when the
+# word has this many characters per edit, or its match was searched this many
+# times as often; closer calls are left as suggestions in the Location admin.
+LOCATION_AUTOCORRECT_CHARS_PER_EDIT = 8
+LOCATION_AUTOCORRECT_MIN_RATIO = 20
+LOCATION_RESOLVER_REFRESH_SECONDS = 300
+LOCATION_RESOLVER_CACHE_SIZE = 50000
+LOCATION_ALIASES = {
+    'NYC': 'New York',
+    'LA': 'Los Angeles',
+    'SF': 'San Francisco',
+    'DXB': 'Dubai',
+    'HYD': 'Hyderabad',
+    'BLR': 'Bengaluru',
+    'Bangalore': 'Bengaluru',
+    'Bombay': 'Mumbai',
+}
+
+# Live availability suppliers (see accounts/suppliers.py), queried concurrently
+# when a booking request opts in with `?fields=...,availability`. None are configured by default. The stub suppliers return
+# fake offers and are only for local development: set SEARCH_STUB_SUPPLIERS=1
+# to enable them (never on a deployed server, where DEBUG is no guide). To
+# exercise the HTTP path, run `manage.py run_stub_supplier --port 8101` and add
+#   {'BACKEND': 'accounts.suppliers.HttpSupplier', 'NAME': 'air-http', 'OPTIONS': {'url': 'http://127.0.0.1:8101'}}
+STUB_SEARCH_SUPPLIERS = [
+    {'BACKEND': 'accounts.suppliers.StubSupplier', 'NAME': 'stub-air', 'OPTIONS': {'latency': 0.2, 'kinds': ['flight']}},
+    {'BACKEND': 'accounts.suppliers.StubSupplier', 'NAME': 'stub-jet', 'OPTIONS': {'latency': 0.4, 'kinds': ['flight']}},
+    {'BACKEND': 'accounts.suppliers.StubSupplier', 'NAME': 'stub-stays', 'OPTIONS': {'latency': 0.3, 'kinds': ['hotel']}},
+    {'BACKEND': 'accounts.suppliers.StubSupplier', 'NAME': 'stub-rooms', 'OPTIONS': {'latency': 0.2, 'kinds': ['hotel']}},
+    {'BACKEND': 'accounts.suppliers.StubSupplier', 'NAME': 'stub-wheels', 'OPTIONS': {'latency': 0.1, 'kinds': ['rental_car']}},
+    {'BACKEND': 'accounts.suppliers.StubSupplier', 'NAME': 'stub-sea', 'OPTIONS': {'latency': 0.3, 'kinds': ['cruise']}},
+]
+SEARCH_SUPPLIERS = STUB_SEARCH_SUPPLIERS if os.environ.get('SEARCH_STUB_SUPPLIERS') == '1' else []
+# Each supplier gets SEARCH_SUPPLIER_TIMEOUT seconds (or its own 'timeout'
+# option) and a search returns whatever arrived within SEARCH_DEADLINE.
+SEARCH_SUPPLIER_TIMEOUT = 1.5
+SEARCH_DEADLINE = 2.0
+SEARCH_HTTP_MAX_CONNECTIONS = 100
+# A supplier failing this many times in a row is skipped for the reset period.
+SEARCH_BREAKER_FAILURES = 5
+SEARCH_BREAKER_RESET_SECONDS = 30
+# Search results are fresh for SEARCH_CACHE_TTL seconds, then served stale for
+# up to SEARCH_CACHE_STALE_TTL more while a background refresh runs.
+SEARCH_CACHE_TTL = 300
+SEARCH_CACHE_STALE_TTL = 600
+# Identical searches that miss the cache at the same time share one fetch;
+# the others wait this many seconds for it before fetching on their own.
+SEARCH_COALESCE_TIMEOUT = 10
+SEARCH_COALESCE_POLL_INTERVAL = 0.05
+# Multi-city legs are searched in parallel on this many threads per worker,
+# and the whole itinerary answers within MULTI_CITY_DEADLINE seconds.
+MULTI_CITY_MAX_WORKERS = 8
+MULTI_CITY_DEADLINE = 3.0
+# The same search re-submitted by the same user within this many seconds
+# returns the row (and coupon) saved the first time. 0 turns this off.
+SEARCH_DEDUP_WINDOW = 60
+SEARCH_DEDUP_WAIT = 2.0
+# Watched searches (`manage.py run_saved_searches`) re-run every
+# SAVED_SEARCH_INTERVAL seconds, or SAVED_SEARCH_URGENT_INTERVAL within
+# SAVED_SEARCH_URGENT_DAYS of travel.
+SAVED_SEARCH_INTERVAL = 6 * 3600
+SAVED_SEARCH_URGENT_INTERVAL = 3600
+SAVED_SEARCH_URGENT_DAYS = 7
+SAVED_SEARCH_WORKERS = 8
+SAVED_SEARCH_CYCLE_TIMEOUT = 60
+# GET /api/accounts/me/ is served from a per-user cache entry, dropped on every
+# save of the user (in every worker only when the cache is Redis) and
+# otherwise kept this many seconds.
+PROFILE_CACHE_TTL = 3600
+# api/schema/ serves the schema generated by `manage.py generate_schema` into
+# SCHEMA_DIR for this CODE_VERSION (a digest of the source when unset).
+CODE_VERSION = os.environ.get('CODE_VERSION')
+SCHEMA_DIR = BASE_DIR / 'openapi'
+SCHEMA_CACHE_MAX_AGE = 24 * 3600
+# Request histograms served at /metrics (see accounts/metrics.py). Each worker
+# publishes its numbers to the cache this often, from a background thread. Scrapers send METRICS_TOKEN
+# as a bearer token; while it is unset, only logged-in staff can read /metrics.
+METRICS_SYNC_SECONDS = 10
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+# Requests under these prefixes that carry no session cookie take the slim
+# middleware chain (see accounts/middleware.py).
+API_ROUTE_PREFIXES = ('/api/accounts/',)
+# Route the auth and booking endpoints to their async views (async_views.py).
+# traveling/asgi.py turns this on; WSGI servers keep the sync views.
+API_ASYNC_VIEWS = os.environ.get('API_ASYNC_VIEWS') == '1'
+
+# Itinerary optimizer (see accounts/itinerary.py): trips of up to
+# ITINERARY_EXACT_MAX_CITIES cities are solved exactly, longer ones get a
+# heuristic limited to ITINERARY_HEURISTIC_BUDGET_MS.
+ITINERARY_EXACT_MAX_CITIES = 10
+ITINERARY_HEURISTIC_BUDGET_MS = 30
+ITINERARY_MAX_LEGS = 30
+ROUTE_GRAPH_REFRESH_SECONDS = 60
+
+# "Also searched" recommendations (see accounts/recommendations.py).
+RECOMMENDATION_TOP_K = 20
+RECOMMENDATION_REFRESH_SECONDS = 300
+
+# "Trending now" lists (see accounts/trending.py). Workers share their counts
+# through the cache every TRENDING_SYNC_SECONDS.
+TRENDING_CAPACITY = 200
+TRENDING_HALF_LIFE_HOURS = 6
+TRENDING_SYNC_SECONDS = 10
+
 
 
 
@@ -185,39 +360,13 @@ from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 
 def dashboard_callback(request, context):
+    from accounts.rollups import dashboard_kpis
+
     context.update({
         "subtitle": "Overview",
         "description": "Welcome to CheapTicket Portal. Here is your daily activity overview.",
         "custom_style": True,
-        "kpi": [
-            {
-                "title": "Arrivals",
-                "icon": "flight_land",
-                "metric": "54",
-                "footer": "This week",
-                "chart": [10, 20, 15, 30, 20, 54],
-            },
-            {
-                "title": "Departures",
-                "icon": "flight_takeoff",
-                "metric": "12",
-                "footer": "This week",
-                "chart": [5, 5, 10, 8, 12, 12],
-            },
-            {
-                "title": "Total Bookings",
-                "icon": "airplane_ticket",
-                "metric": "1,245",
-                "footer": "+12% Growth",
-            },
-            {
-                "title": "Multi-City Flights",
-                "icon": "vibration",
-                "metric": "18",
-                "footer": "This month",
-            },
-
-        ],
+        "kpi": dashboard_kpis(),
     })
     return context
 
@@ -228,12 +377,12 @@ UNFOLD = {
     "DASHBOARD_CALLBACK": "traveling.settings.dashboard_callback",
     "SHOW_HISTORY": True,  # Enable Recent actions widget
     "STYLES": [
-        lambda request: "https://fonts.googleapis.com/css2?family=Outfit:wght@300;400;500;600;700&display=swap",
-        lambda request: "https://fonts.googleapis.com/css2?family=Material+Symbols+Outlined:opsz,wght,FILL,GRAD@24,400,0,0",
+        # Unfold's layout already links its self-hosted Inter and Material
+        # Symbols from static files; Outfit is used where installed locally.
         lambda request: """
             <style>
                 :root {
-                    --font-family-sans: 'Outfit', sans-serif;
+                    --font-family-sans: 'Outfit', 'Inter', sans-serif;
                 }
                 body {
                     font-family: var(--font-family-sans);
@@ -390,15 +539,6 @@ UNFOLD = {
                     
                     // Password toggle logic
                     function setupPasswordToggle() {
-                        // Ensure font is loaded
-                        if (!document.getElementById('material-symbols-font')) {
-                            const fontLink = document.createElement('link');
-                            fontLink.id = 'material-symbols-font';
-                            fontLink.rel = 'stylesheet';
-                            fontLink.href = 'https://fonts.googleapis.com/css2?family=Material+Symbols+Outlined:opsz,wght,FILL,GRAD@24,400,0,0';
-                            document.head.appendChild(fontLink);
-                        }
-
                         const passwordInputs = document.querySelectorAll('input[type="password"]');
                         passwordInputs.forEach(passwordInput => {
                             if (passwordInput.dataset.toggleSetup === 'true') return;
@@ -0,0 +1,61 @@
+"""
+Settings for the API-only process group.
+
+Customer traffic only reaches api/accounts/, so these workers leave out
+everything that serves the admin and the API docs: Unfold and the admin, the
+session and message stacks, drf-spectacular, static files and the browsable
+API. Authentication is by JWT alone. admin/ and api/schema|docs|redoc/ are
+served by a separate process group running the default traveling.settings,
+with the proxy routing those prefixes (and static/) to it.
+
+    DJANGO_SETTINGS_MODULE=traveling.settings_api gunicorn traveling.wsgi
+"""
+from .settings import *  # noqa: F401,F403
+
+ADMIN_ONLY_APPS = [
+    'unfold',
+    'django.contrib.admin',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'drf_spectacular',
+]
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ADMIN_ONLY_APPS]
+
+MIDDLEWARE = [
+    'accounts.middleware.RequestMetricsMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'traveling.urls_api'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+            ],
+        },
+    },
+]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_AUTHENTICATION_CLASSES': (
+        'rest_framework_simplejwt.authentication.JWTAuthentication',
+    ),
+    # @extend_schema still subclasses the schema class when the views are
+    # imported; these workers never generate a schema, so the base will do.
+    'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.inspectors.ViewInspector',
+    'DEFAULT_RENDERER_CLASSES': (
+        'accounts.renderers.ORJSONRenderer',
+    ),
+}
+
+del SPECTACULAR_SETTINGS, UNFOLD
@@ -16,27 +16,33 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.http import JsonResponse
+
+from accounts.metrics import metrics_view
+
+from .urls_api import home
 
 admin.site.site_header = "CheapTicket API"
 admin.site.site_title = "CheapTicket Portal"
 admin.site.index_title = "Welcome to CheapTicket Portal"
 
-def home(request):
-    return JsonResponse({"message": "Welcome to Traveling App Backend API", "status": "Running"})
-
-from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+from drf_spectacular.renderers import OpenApiYamlRenderer, OpenApiYamlRenderer2
+from drf_spectacular.views import SpectacularRedocView, SpectacularSwaggerView
+from accounts.openapi import CachedSchemaView
+from accounts.renderers import OpenApiORJSONRenderer, OpenApiORJSONRenderer2
 
 from django.contrib.admin.views.decorators import staff_member_required
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/accounts/', include('accounts.urls')),
-    path('', home),
+    path('metrics', metrics_view, name='metrics'),
+    path('', home, name='home'),
 
 
     # Swagger UI URLs (Protected for Staff only):
-    path('api/schema/', staff_member_required(SpectacularAPIView.as_view()), name='schema'),
+    path('api/schema/', staff_member_required(CachedSchemaView.as_view(renderer_classes=[
+        OpenApiYamlRenderer, OpenApiYamlRenderer2, OpenApiORJSONRenderer, OpenApiORJSONRenderer2,
+    ])), name='schema'),
     path('api/docs/', staff_member_required(SpectacularSwaggerView.as_view(url_name='schema')), name='swagger-ui'),
     path('api/redoc/', staff_member_required(SpectacularRedocView.as_view(url_name='schema')), name='redoc'),
 ]
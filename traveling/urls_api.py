@@ -0,0 +1,21 @@
+"""
+URL configuration for the API-only process group (traveling.settings_api).
+
+Only the accounts API is routed here; admin/ and the API docs are served by
+the process group running traveling.urls.
+"""
+from django.http import JsonResponse
+from django.urls import path, include
+
+from accounts.metrics import metrics_view
+
+
+def home(request):
+    return JsonResponse({"message": "Welcome to Traveling App Backend API", "status": "Running"})
+
+
+urlpatterns = [
+    path('api/accounts/', include('accounts.urls')),
+    path('metrics', metrics_view, name='metrics'),
+    path('', home, name='home'),
+]